@@ -0,0 +1,105 @@
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from parliament_gap import data_clean
+
+# The original per-row helpers, kept here as the baseline the vectorized
+# cleaning in data_clean.py is measured against.
+
+def legacy_clean_capitalized_data(data):
+    if pd.isna(data):
+        return None
+    return data.title()
+
+def legacy_clean_genere(genere):
+    if genere == 'male':
+        return 'M'
+    elif genere == 'female':
+        return 'F'
+    else:
+        return genere
+
+def legacy_wrangle_data_nascita(data_nascita):
+    if pd.isna(data_nascita):
+        return None
+    if isinstance(data_nascita, int):
+        data_nascita = str(data_nascita)
+    if isinstance(data_nascita, str) and re.match(r'^\d{4}-\d{2}-\d{2}$', data_nascita):
+        return data_nascita
+    if isinstance(data_nascita, str) and len(data_nascita) == 8:
+        return f"{data_nascita[:4]}-{data_nascita[4:6]}-{data_nascita[6:8]}"
+    return data_nascita
+
+def legacy_extract_titolo_professione(descrizione):
+    if pd.isna(descrizione):
+        return None, None
+    parts = descrizione.split(';', 1)
+    if len(parts) == 2:
+        return parts[0].strip(), parts[1].strip()
+    return parts[0].strip(), None
+
+def legacy_wrangle_provincia_nascita(nato):
+    if pd.isna(nato):
+        return None
+    return nato.split(',')[1].strip().title()
+
+def legacy_clean_camera(camera_df):
+    camera_df = camera_df.rename(columns={
+        'persona': 'url',
+        'dataNascita': 'data_nascita',
+        'luogoNascita': 'citta_nascita',
+        'descrizione': 'professione',
+    })
+    camera_df['id'] = camera_df['url'].apply(lambda url: url.split('/')[-1])
+    camera_df['nome'] = camera_df['nome'].apply(legacy_clean_capitalized_data)
+    camera_df['cognome'] = camera_df['cognome'].apply(legacy_clean_capitalized_data)
+    camera_df['citta_nascita'] = camera_df['citta_nascita'].apply(legacy_clean_capitalized_data)
+    camera_df['provincia_nascita'] = camera_df['nato'].apply(legacy_wrangle_provincia_nascita)
+    camera_df['titolo_studio'], camera_df['professione'] = zip(*camera_df['professione'].apply(legacy_extract_titolo_professione))
+    camera_df['titolo_studio'] = camera_df['titolo_studio'].apply(legacy_clean_capitalized_data)
+    camera_df['professione'] = camera_df['professione'].apply(legacy_clean_capitalized_data)
+    camera_df['genere'] = camera_df['genere'].apply(legacy_clean_genere)
+    camera_df['data_nascita'] = camera_df['data_nascita'].apply(legacy_wrangle_data_nascita)
+    camera_df['tipo_mandato'] = 'elettivo'
+    return camera_df
+
+def make_camera_export(n_rows, seed=0):
+    """Builds a synthetic Camera-shaped export by resampling the real one."""
+    camera_df = pd.read_csv('data/Camera_Leg19.csv')
+    rng = np.random.default_rng(seed)
+    sample = camera_df.iloc[rng.integers(0, len(camera_df), n_rows)].reset_index(drop=True)
+    sample['persona'] = sample['persona'] + '_' + pd.Series(np.arange(n_rows) // 3).astype(str)
+    return sample
+
+def time_it(func, camera_df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(camera_df.copy())
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark row-wise vs vectorized Camera cleaning.')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    camera_df = make_camera_export(args.rows)
+    print(f"Synthetic Camera export: {len(camera_df):,} rows")
+
+    legacy_time, legacy_df = time_it(legacy_clean_camera, camera_df, args.repeat)
+    print(f"Row-wise .apply cleaning: {legacy_time:.2f}s")
+
+    vectorized_time, vectorized_df = time_it(data_clean.clean_camera, camera_df, args.repeat)
+    print(f"Vectorized cleaning:      {vectorized_time:.2f}s")
+
+    pd.testing.assert_frame_equal(legacy_df, vectorized_df[legacy_df.columns])
+    print(f"Outputs identical, speedup {legacy_time / vectorized_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
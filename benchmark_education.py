@@ -0,0 +1,96 @@
+import argparse
+import os
+import random
+import re
+import sqlite3
+import time
+
+from parliament_gap.wikipedia_education import EDUCATION_PATTERNS, extract_education_from_text
+
+def legacy_extract_education_from_text(text):
+    """The original extractor: every pattern string scanned over the whole text."""
+    education = set()
+    text = text.lower()
+    for pattern, _ in EDUCATION_PATTERNS:
+        for match in re.finditer(pattern, text):
+            if len(match.groups()) > 1:
+                edu = ' '.join(group for group in match.groups() if group)
+            else:
+                edu = match.group(1)
+            if edu is None:
+                continue
+            edu = edu.strip()
+            if len(edu) < 4 or any(c.isdigit() for c in edu):
+                continue
+            if edu.startswith(('il ', 'la ', 'lo ', 'the ', 'a ', 'an ', 'di ', 'del ', 'della ')):
+                continue
+            education.add(edu)
+    return education
+
+def load_saved_pages(cache_path):
+    """Reads the page texts saved by wikipedia_education.py's page cache."""
+    db = sqlite3.connect(cache_path)
+    try:
+        return [text for (text,) in db.execute('SELECT text FROM pages')]
+    finally:
+        db.close()
+
+def make_synthetic_pages(n_pages, seed=0):
+    """Biography-like filler text with a few education sentences mixed in."""
+    rng = random.Random(seed)
+    filler = [
+        "Nel 2013 è stato eletto alla Camera dei deputati nella circoscrizione Lombardia 1.",
+        "È membro della commissione Affari costituzionali (2018-2022).",
+        "Ha ricoperto l'incarico di sindaco del comune per due mandati consecutivi.",
+        "In the 2022 general election he was re-elected to the Senate of the Republic.",
+        "Dal 2008 al 2013 è stato consigliere regionale, poi assessore al bilancio.",
+    ]
+    education = [
+        "Si è laureato in giurisprudenza presso l'Università di Bologna.",
+        "Ha conseguito un dottorato di ricerca in scienze politiche presso la Sapienza.",
+        "Diplomata in ragioneria, ha lavorato come impiegata.",
+        "He graduated in economics from Bocconi University in Milan.",
+        "Laureata in lettere classiche, è insegnante di liceo.",
+    ]
+    pages = []
+    for _ in range(n_pages):
+        sentences = [rng.choice(filler) for _ in range(rng.randint(40, 400))]
+        for _ in range(rng.randint(0, 3)):
+            sentences.insert(rng.randrange(len(sentences)), rng.choice(education))
+        pages.append(' '.join(sentences))
+    return pages
+
+def time_it(func, pages, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [func(text) for text in pages]
+        timings.append(time.perf_counter() - start)
+    return min(timings), results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark education extraction over saved Wikipedia pages.')
+    parser.add_argument('--cache', default='data/wikipedia_cache.sqlite', help='page cache written by wikipedia_education.py')
+    parser.add_argument('--synthetic', type=int, default=500, help='synthetic pages to use when no cache is available')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if os.path.exists(args.cache):
+        pages = load_saved_pages(args.cache)
+        print(f"Loaded {len(pages)} saved pages from {args.cache}")
+    else:
+        pages = make_synthetic_pages(args.synthetic)
+        print(f"No page cache at {args.cache}, using {len(pages)} synthetic pages")
+    print(f"Corpus size: {sum(len(text) for text in pages) / 1e6:.1f}M characters")
+
+    legacy_time, legacy_results = time_it(legacy_extract_education_from_text, pages, args.repeat)
+    print(f"Per-pattern extraction: {legacy_time:.3f}s")
+
+    extractor_time, extractor_results = time_it(extract_education_from_text, pages, args.repeat)
+    print(f"Keyword-indexed extractor: {extractor_time:.3f}s")
+
+    assert legacy_results == extractor_results, 'extractors disagree'
+    print(f"Identical results, speedup {legacy_time / extractor_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from parliament_gap import add_region
+from parliament_gap import age_analysis
+from parliament_gap import data_clean
+from parliament_gap import education
+from parliament_gap import education_analysis
+from parliament_gap import gender_analysis
+from parliament_gap import missing_profession
+from parliament_gap import pop_analysis
+from parliament_gap import profession_analysis
+from parliament_gap import region_analysis
+from parliament_gap import store
+from benchmark_clean import make_camera_export
+from benchmark_education import make_synthetic_pages
+from parliament_gap.datasets import SOURCES, Datasets
+from parliament_gap.wikipedia_education import extract_education_from_text
+
+# End-to-end benchmark of the pipeline at synthetic scale. The generated
+# exports are written as legislature 19 into a scratch data directory, so
+# every stage runs exactly as it does on the real files.
+
+LEGISLATURE = 19
+
+# Senato rows per Camera row in the real leg 19 exports (342 / 1,154)
+SENATO_RATIO = 342 / 1154
+
+def make_senato_export(n_rows, seed=0):
+    """Builds a synthetic Senato-shaped export by resampling the real one."""
+    senato_df = pd.read_csv(data_clean.senato_export_path(LEGISLATURE))
+    rng = np.random.default_rng(seed)
+    sample = senato_df.iloc[rng.integers(0, len(senato_df), n_rows)].reset_index(drop=True)
+    sample['senatore'] = sample['senatore'] + '_' + pd.Series(np.arange(n_rows)).astype(str)
+    return sample
+
+def generate_inputs(camera_rows, data_dir, seed=0):
+    """Writes Camera and Senato exports of the given scale plus the population tables to data_dir.
+
+    The population tables have a fixed shape (ages, regions, countries), so
+    they are copied as they are.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    make_camera_export(camera_rows, seed).to_csv(data_clean.camera_export_path(LEGISLATURE, data_dir), index=False)
+    make_senato_export(int(camera_rows * SENATO_RATIO), seed).to_csv(data_clean.senato_export_path(LEGISLATURE, data_dir), index=False)
+    for filename, _ in SOURCES.values():
+        shutil.copy(os.path.join(store.DATA_DIR, filename), data_dir)
+
+def git_commit():
+    """The checked-out commit and whether the working tree has local changes."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+def measure(name, rows, func, memory=True):
+    """Times one stage, then reruns it under tracemalloc for its peak memory."""
+    # The stages print progress meant for interactive runs
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+
+        peak = None
+        if memory:
+            tracemalloc.start()
+            try:
+                func()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    result = {
+        'stage': name,
+        'rows': rows,
+        'seconds': round(seconds, 4),
+        'rows_per_second': round(rows / seconds) if seconds else None,
+        'peak_memory_mb': round(peak / 2**20, 1) if peak is not None else None,
+    }
+    memory_text = f", peak {result['peak_memory_mb']} MB" if memory else ''
+    print(f"{name:50} {rows:>12,} rows {seconds:9.3f}s {result['rows_per_second'] or 0:>14,} rows/s{memory_text}")
+    return result
+
+def run_suite(camera_rows, pages, data_dir, results_dir, memory=True, seed=0):
+    """Generates inputs at the given scale and benchmarks every stage on them."""
+    print(f"Generating {camera_rows:,} Camera rows into {data_dir}")
+    generate_inputs(camera_rows, data_dir, seed)
+    os.makedirs(results_dir, exist_ok=True)
+
+    def output(filename):
+        return os.path.join(results_dir, filename)
+
+    stages = []
+    input_rows = camera_rows + int(camera_rows * SENATO_RATIO)
+    stages.append(measure('data_clean.clean_legislature', input_rows,
+                          lambda: data_clean.clean_legislature(LEGISLATURE, data_dir), memory))
+
+    # The cleaned table stands in for the hand-updated one
+    mp_df = store.read_table(f'leg{LEGISLATURE}_clean', data_dir=data_dir)
+    store.write_table(mp_df, f'leg{LEGISLATURE}_clean_updated', data_dir)
+    stages.append(measure('education.add_education_columns', len(mp_df),
+                          lambda: education.add_education_columns(mp_df.drop(columns=[education.LEVEL_COLUMN, education.GROUP_COLUMN])),
+                          memory))
+    stages.append(measure('add_region.add_regions', len(mp_df),
+                          lambda: add_region.add_regions(mp_df.copy()), memory))
+    with contextlib.redirect_stdout(io.StringIO()):
+        store.write_table(add_region.add_regions(mp_df.copy()), f'leg{LEGISLATURE}_clean_with_regions', data_dir)
+
+    texts = make_synthetic_pages(pages, seed)
+    stages.append(measure('extract_education_from_text', len(texts),
+                          lambda: [extract_education_from_text(text) for text in texts], memory))
+
+    professions = pd.Series([prof for profs in mp_df['professione'] for prof in profs], dtype=object)
+    # A fresh categorizer each time, so memoized strings from a previous run don't count
+    stages.append(measure('categorize_profession', len(professions),
+                          lambda: profession_analysis.ProfessionCategorizer().categorize(professions), memory))
+
+    datasets = Datasets(data_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        general_education = education_analysis.analyze_general_education(
+            datasets['mp_regions'], datasets['population_education'], output('general_education_analysis.csv'))
+    # analyze_foreign_comparison reads the 'regione' column added by analyze_region_comparison
+    mp_regions = datasets['mp_regions']
+    mp_regions['regione'] = mp_regions['regione_nascita'].apply(region_analysis.clean_region_name)
+    analyses = [
+        ('age_analysis.analyze_age', 'mp_updated',
+         lambda: age_analysis.analyze_age(datasets['mp_updated'], output('age_analysis_summary.csv'))),
+        ('age_analysis.analyze_age_comparison', 'mp_updated',
+         lambda: age_analysis.analyze_age_comparison(datasets['mp_updated'], datasets['population'], output('age_comparison_analysis.csv'))),
+        ('gender_analysis.analyze_gender', 'mp_updated',
+         lambda: gender_analysis.analyze_gender(datasets['mp_updated'], output('gender_analysis_summary.csv'))),
+        ('gender_analysis.analyze_gender_comparison', 'mp_updated',
+         lambda: gender_analysis.analyze_gender_comparison(datasets['mp_updated'], datasets['population'], output('gender_comparison_analysis.csv'))),
+        ('education_analysis.analyze_general_education', 'mp_regions',
+         lambda: education_analysis.analyze_general_education(datasets['mp_regions'], datasets['population_education'], output('general_education_analysis.csv'))),
+        ('education_analysis.analyze_university_education', 'mp_regions',
+         lambda: education_analysis.analyze_university_education(
+             datasets['mp_regions'], general_education,
+             datasets['population_graduates'], output('university_education_analysis.csv'))),
+        ('region_analysis.analyze_regions', 'mp_regions',
+         lambda: region_analysis.analyze_regions(datasets['mp_regions'], output('region_analysis_summary.csv'))),
+        ('region_analysis.analyze_region_comparison', 'mp_regions',
+         lambda: region_analysis.analyze_region_comparison(datasets['mp_regions'], datasets['population_regions'], datasets['population_birth_countries'], output('region_comparison_analysis.csv'))),
+        ('region_analysis.analyze_foreign_comparison', 'mp_regions',
+         lambda: region_analysis.analyze_foreign_comparison(mp_regions.copy(), datasets['population_birth_countries'], output('foreign_comparison_analysis.csv'))),
+        ('pop_analysis.analyze_gender', 'population',
+         lambda: pop_analysis.analyze_gender(datasets['population'], output('population_gender_analysis_summary.csv'))),
+        ('pop_analysis.analyze_age', 'population',
+         lambda: pop_analysis.analyze_age(datasets['population'], output('population_age_analysis_summary.csv'))),
+        ('pop_analysis.analyze_regions', 'population_regions',
+         lambda: pop_analysis.analyze_regions(datasets['population_regions'], output('population_regions_analysis_summary.csv'))),
+        ('pop_analysis.analyze_birth_place', 'population_birth_countries',
+         lambda: pop_analysis.analyze_birth_place(datasets['population_birth_countries'], output('population_birth_place_analysis_summary.csv'))),
+        ('profession_analysis.analyze_professions', 'mp_clean',
+         lambda: profession_analysis.analyze_professions(datasets['mp_clean'], output('profession_analysis.csv'))),
+        ('profession_analysis.analyze_profession_categories', 'mp_clean',
+         lambda: profession_analysis.analyze_profession_categories(datasets['mp_clean'], output('profession_category_analysis.csv'))),
+        ('missing_profession.analyze_missing_profession', 'mp_clean',
+         lambda: missing_profession.analyze_missing_profession(datasets['mp_clean'], output('missing_profession_mp.csv'))),
+    ]
+    for name, dataset, func in analyses:
+        stages.append(measure(name, len(datasets.load(dataset)), func, memory))
+    return stages
+
+def compare(stages, baseline_path):
+    """Prints each stage's throughput relative to a previous benchmark file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    baseline_stages = {stage['stage']: stage for stage in baseline['stages']}
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}, {baseline['camera_rows']:,} Camera rows):")
+    for stage in stages:
+        before = baseline_stages.get(stage['stage'])
+        if before and before['rows_per_second'] and stage['rows_per_second']:
+            print(f"{stage['stage']:50} {stage['rows_per_second'] / before['rows_per_second']:6.2f}x the baseline throughput")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every pipeline stage on synthetic inputs.')
+    parser.add_argument('--rows', type=int, default=10_000, help='Camera rows to generate (Senato rows scale with them)')
+    parser.add_argument('--pages', type=int, default=200, help='synthetic Wikipedia pages for the education extractor')
+    parser.add_argument('--data-dir', default=None, help='where to write the generated inputs (default: a temporary directory)')
+    parser.add_argument('--output', default=None, help='JSON file for the results (default: benchmarks/<commit>_<rows>.json)')
+    parser.add_argument('--baseline', default=None, help='a previous results file to compare against')
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass that measures peak memory")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    commit, dirty = git_commit()
+    with tempfile.TemporaryDirectory() as scratch:
+        data_dir = args.data_dir or os.path.join(scratch, 'data')
+        stages = run_suite(args.rows, args.pages, data_dir, os.path.join(scratch, 'results'),
+                           memory=not args.no_memory, seed=args.seed)
+
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'camera_rows': args.rows,
+        'pages': args.pages,
+        'stages': stages,
+    }
+    output_path = args.output or os.path.join('benchmarks', f"{(commit or 'unknown')[:10]}_{args.rows}.json")
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nBenchmark results saved to '{output_path}'")
+
+    if args.baseline:
+        compare(stages, args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+# Representation gap of the Italian parliament against the resident
+# population. Every stage is a module of this package with a main(), run as
+# python -m parliament_gap.<module>, or through the parliament-gap command.
@@ -0,0 +1,60 @@
+import argparse
+
+from . import education
+from . import gazetteer
+from . import instrument
+from . import store
+
+@instrument.stage
+def add_regions(df, data_dir=store.DATA_DIR):
+    """Adds regione_nascita to an MP table based on provincia_nascita."""
+    # First, let's check the unique province values in the dataset
+    unique_provinces = df['provincia_nascita'].dropna().unique()
+    print(f"Found {len(unique_provinces)} unique province values")
+    print(f"Sample of provinces: {sorted(unique_provinces)[:10]}")
+    
+    # Add regione_nascita column from the place gazetteer
+    df['regione_nascita'] = gazetteer.region_of(df['provincia_nascita'], data_dir=data_dir)
+    
+    # Places the gazetteer doesn't know are left empty rather than assumed foreign
+    unmatched = df[df['regione_nascita'].isna()]['provincia_nascita'].dropna().unique()
+    print(f"\nFound {len(unmatched)} province values not in the gazetteer: {unmatched}")
+    
+    # Count values
+    print("\nRegion distribution:")
+    print(df['regione_nascita'].value_counts())
+    
+    # Count null values
+    null_regions = df['regione_nascita'].isna().sum()
+    print(f"\nRecords with null regione_nascita: {null_regions}")
+
+    return df
+
+def source_table(legislature, data_dir=store.DATA_DIR):
+    """The hand-completed leg<N>_clean_updated table when there is one, else leg<N>_clean."""
+    updated = f'leg{legislature}_clean_updated'
+    return updated if store.table_exists(updated, data_dir) else f'leg{legislature}_clean'
+
+def enrich_table(legislature, data_dir=store.DATA_DIR, export_csv=False):
+    """Writes leg<N>_clean_with_regions: the source table with education columns and birth regions."""
+    # Classify the (possibly hand-completed) education titles again
+    df = store.read_table(source_table(legislature, data_dir), data_dir=data_dir)
+    df = education.add_education_columns(df, data_dir)
+    df = add_regions(df, data_dir)
+
+    output_table = f'leg{legislature}_clean_with_regions'
+    store.write_table(df, output_table, data_dir, csv=export_csv)
+    print(f"\nUpdated dataset saved to '{store.table_path(output_table, data_dir)}'")
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description='Add the birth region to the cleaned MP table.')
+    parser.add_argument('--legislature', type=int, default=19)
+    parser.add_argument('--csv', action='store_true', help='also export leg<N>_clean_with_regions.csv')
+    store.add_directory_arguments(parser, results=False)
+    args = parser.parse_args()
+
+    enrich_table(args.legislature, args.data_dir, export_csv=args.csv)
+
+if __name__ == "__main__":
+    main()
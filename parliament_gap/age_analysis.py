@@ -0,0 +1,105 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import ages
+from . import instrument
+from . import store
+from .population import PopulationTable
+
+# The legislature of the MP tables the report reads. Ages are taken on its
+# election day unless a reference date is given, as in the cube and the API.
+LEGISLATURE = 19
+
+@instrument.stage
+def analyze_age(df, output_csv_path, reference_date=None, legislature=LEGISLATURE):
+    """Calculates counts and percentages of MPs under 35 and over 70 years old and saves to CSV.
+
+    Ages are exact calendar ages on reference_date (default: the legislature's election day).
+    """
+    if reference_date is None:
+        reference_date = ages.ELECTION_DATES.get(legislature)
+    index = ages.BirthdateIndex(df['data_nascita'])
+    (under_35_count, over_70_count), = index.band_counts(reference_date, [0, 35, 70, np.inf])[:, [0, 2]]
+
+    under_35_percentage = (under_35_count / len(df))
+    over_70_percentage = (over_70_count / len(df)) 
+
+    age_summary = pd.DataFrame({
+        'age_group': ['Under 35', 'Over 70'],
+        'absolute_count': [under_35_count, over_70_count],
+        'percentage': [under_35_percentage, over_70_percentage]
+    })
+
+    print("Age Analysis Summary:")
+    print(age_summary)
+
+    age_summary.to_csv(output_csv_path, index=False)
+    print(f"Age analysis saved to {output_csv_path}")
+    return age_summary
+
+# Age groups over whole years of age: (0, 25], (25, 35], ... (65, 100]
+AGE_BINS = [0, 25, 35, 45, 55, 65, 100]
+AGE_LABELS = ['18-25', '26-35', '36-45', '46-55', '56-65', '65+']
+
+@instrument.stage
+def analyze_age_comparison(mp_df, pop_df, output_csv_path, legislature=None, reference_date=None):
+    """Compares age distribution between MPs and general population.
+
+    MP ages are exact calendar ages on reference_date (default: the election
+    day of the legislature, or of LEGISLATURE when none is given).
+    """
+    if reference_date is None:
+        reference_date = ages.ELECTION_DATES.get(LEGISLATURE if legislature is None else legislature)
+    # An age in (lower, upper] is at least lower + 1 and less than upper + 1,
+    # for the MPs and the population alike
+    index = ages.BirthdateIndex(mp_df['data_nascita'])
+    mp_age = pd.DataFrame({
+        'age_group': pd.Categorical(AGE_LABELS, categories=AGE_LABELS, ordered=True),
+        'mp_count': index.band_counts(reference_date, np.add(AGE_BINS, 1))[0],
+    })
+    total_mps = mp_age['mp_count'].sum()
+    mp_age['mp_percentage'] = mp_age['mp_count'] / total_mps
+    
+    # Process population data
+    population = PopulationTable.of(pop_df)
+    pop_age = pd.DataFrame({
+        'age_group': mp_age['age_group'],
+        'pop_count': population.band_counts(np.add(AGE_BINS, 1)),
+    })
+    pop_age['pop_percentage'] = pop_age['pop_count'] / pop_age['pop_count'].sum()
+    
+    comparison = pd.merge(mp_age, pop_age, on='age_group', how='outer')
+    
+    comparison['representation_index'] = comparison['mp_percentage'] / comparison['pop_percentage']
+    
+    comparison = comparison.sort_values('age_group')
+    
+    if legislature is not None:
+        comparison.insert(0, 'legislature', legislature)
+
+    comparison.to_csv(output_csv_path, index=False)
+    print(f"Age comparison analysis saved to {output_csv_path}")
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze MP ages against the population.')
+    parser.add_argument('--reference-date', default=None,
+                        help=f'date the ages are computed at (default: {ages.ELECTION_DATES[LEGISLATURE]}, election day)')
+    store.add_directory_arguments(parser)
+    args = parser.parse_args()
+
+    df = store.read_table('leg19_clean_updated', columns=['data_nascita'], data_dir=args.data_dir)
+    pop_df = pd.read_csv(os.path.join(args.data_dir, 'pop_residente_1gen2025.csv'))
+
+    os.makedirs(args.results_dir, exist_ok=True)
+
+    analyze_age(df, os.path.join(args.results_dir, 'age_analysis_summary.csv'), args.reference_date)
+    analyze_age_comparison(df, pop_df, os.path.join(args.results_dir, 'age_comparison_analysis.csv'),
+                           reference_date=args.reference_date)
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+# Exact calendar ages from a sorted index of birth dates. Dates are kept as
+# YYYYMMDD integers, whose order is the chronological one, so "aged at least
+# a on date D" is just "born on or before (D.year - a, D.month, D.day)" and
+# a single searchsorted answers it for any number of dates and ages at once.
+
+# Election day of each legislature of the Republic
+ELECTION_DATES = {
+    1: '1948-04-18', 2: '1953-06-07', 3: '1958-05-25', 4: '1963-04-28', 5: '1968-05-19',
+    6: '1972-05-07', 7: '1976-06-20', 8: '1979-06-03', 9: '1983-06-26', 10: '1987-06-14',
+    11: '1992-04-05', 12: '1994-03-27', 13: '1996-04-21', 14: '2001-05-13', 15: '2006-04-09',
+    16: '2008-04-13', 17: '2013-02-24', 18: '2018-03-04', 19: '2022-09-25',
+}
+
+def date_keys(dates):
+    """YYYYMMDD integer keys for an array-like of dates; missing dates are dropped."""
+    dates = pd.DatetimeIndex(pd.to_datetime(pd.Series(dates), errors='coerce').dropna())
+    return (dates.year * 10000 + dates.month * 100 + dates.day).to_numpy(dtype=np.int64)
+
+def reference_dates(dates=None):
+    """Normalizes one date, a list of dates or None (today) to a DatetimeIndex."""
+    if dates is None:
+        dates = [pd.Timestamp.now()]
+    elif isinstance(dates, (str, pd.Timestamp)) or not np.iterable(dates):
+        dates = [dates]
+    return pd.DatetimeIndex(pd.to_datetime(list(dates))).normalize()
+
+def calendar_age(birthdates, reference_date=None):
+    """Completed years of age on the reference date for each birth date (NaN where unknown)."""
+    reference = reference_dates(reference_date)[0]
+    birthdates = pd.to_datetime(birthdates, errors='coerce')
+    had_birthday = (birthdates.dt.month < reference.month) | (
+        (birthdates.dt.month == reference.month) & (birthdates.dt.day <= reference.day))
+    age = reference.year - birthdates.dt.year - (~had_birthday).astype(int)
+    return age.where(birthdates.notna())
+
+class BirthdateIndex:
+    """Sorted birth dates of a population, answering age-band counts for many reference dates."""
+
+    def __init__(self, birthdates):
+        birthdates = pd.Series(birthdates)
+        self.keys = np.sort(date_keys(birthdates))
+        self.missing = len(birthdates) - len(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def count_at_least(self, dates, ages):
+        """Number of people aged at least each age on each date, as a (dates x ages) array."""
+        dates = reference_dates(dates)
+        ages = np.asarray(ages, dtype=float)
+        month_day = (dates.month * 100 + dates.day).to_numpy(dtype=np.int64)[:, None]
+
+        # Born on or before this key means aged at least `age`; an infinite age matches nobody
+        finite = np.isfinite(ages)
+        years = dates.year.to_numpy(dtype=np.int64)[:, None] - np.where(finite, ages, 0).astype(np.int64)
+        thresholds = np.where(finite, years * 10000 + month_day, np.iinfo(np.int64).min)
+        return np.searchsorted(self.keys, thresholds, side='right')
+
+    def band_counts(self, dates, edges):
+        """People with edges[i] <= age < edges[i + 1] on each date, as a (dates x bands) array.
+
+        Use np.inf as the last edge for an open-ended band.
+        """
+        at_least = self.count_at_least(dates, edges)
+        return at_least[:, :-1] - at_least[:, 1:]
+
+    def band_table(self, dates, schemes):
+        """Long table of band counts for several band schemes and dates in one searchsorted.
+
+        schemes maps a scheme name to (edges, labels), with one label per band.
+        """
+        dates = reference_dates(dates)
+        all_edges = np.concatenate([np.asarray(edges, dtype=float) for edges, _ in schemes.values()])
+        at_least = self.count_at_least(dates, all_edges)
+
+        tables = []
+        start = 0
+        for name, (edges, labels) in schemes.items():
+            scheme = at_least[:, start:start + len(edges)]
+            start += len(edges)
+            counts = scheme[:, :-1] - scheme[:, 1:]
+            tables.append(pd.DataFrame({
+                'reference_date': np.repeat(dates, len(labels)),
+                'scheme': name,
+                'band': np.tile(labels, len(dates)),
+                'count': counts.ravel(),
+            }))
+        return pd.concat(tables, ignore_index=True)
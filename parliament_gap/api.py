@@ -0,0 +1,290 @@
+import argparse
+import functools
+import glob
+import hashlib
+import json
+import os
+import re
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from . import store
+from .age_analysis import AGE_BINS, AGE_LABELS
+from .cube import CHAMBERS, EDUCATION_LEVELS, GENDERS, mp_dimensions
+from .population import PopulationTable
+from .region_analysis import clean_region_name
+
+# Local read-only JSON API for the front end. The MP tables of every
+# legislature and the population tables are loaded once into memory; each
+# distinct query is computed once and kept in an LRU cache together with its
+# ETag, so repeated requests are answered from memory, or with a bare 304
+# when the client already has the response.
+
+DIMENSIONS = ['gender', 'age', 'region', 'education']
+FILTERS = ['legislature', 'chamber', 'gender', 'age_band', 'region']
+
+# The MP column each dimension and filter is about
+COLUMNS = {
+    'gender': 'genere',
+    'age': 'age_band',
+    'age_band': 'age_band',
+    'region': 'regione',
+    'education': 'livello_istruzione',
+    'chamber': 'ramo',
+    'legislature': 'legislatura',
+}
+
+# Population columns for each gender filter value
+POPULATION_SEX = {None: 'total', 'M': 'M', 'F': 'F'}
+REGION_SEX_COLUMNS = {'total': 'Totale', 'M': 'Totale maschi', 'F': 'Totale femmine'}
+
+CACHE_SIZE = 1024
+_TABLE_NAME = re.compile(r'^leg(\d+)_clean_with_regions\.(?:parquet|csv)$')
+
+class QueryError(ValueError):
+    """A request with unknown parameters or values; answered with 400."""
+
+def available_tables(data_dir=store.DATA_DIR):
+    """Legislature -> leg<N>_clean_with_regions table name, for the tables in data_dir."""
+    tables = {}
+    for path in glob.glob(os.path.join(data_dir, 'leg*_clean_with_regions.*')):
+        match = _TABLE_NAME.match(os.path.basename(path))
+        if match:
+            tables[int(match.group(1))] = f'leg{match.group(1)}_clean_with_regions'
+    return dict(sorted(tables.items()))
+
+def load_mps(legislature, table, data_dir=store.DATA_DIR):
+    """One legislature's MPs with the columns the queries filter and group on."""
+    mps = mp_dimensions(store.read_table(table, data_dir=data_dir), legislature)
+    mps.insert(0, 'legislatura', legislature)
+    return mps
+
+def representation_rows(categories, mp_counts, pop_counts, mp_total=None):
+    """Rows of category, counts, shares and representation index; mp_total defaults to the sum of mp_counts."""
+    mp_counts = np.asarray(mp_counts, dtype=float)
+    pop_counts = np.asarray(pop_counts, dtype=float)
+    mp_total = mp_counts.sum() if mp_total is None else mp_total
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mp_percentage = mp_counts / mp_total
+        pop_percentage = pop_counts / pop_counts.sum()
+        index = mp_percentage / pop_percentage
+
+    def number(value):
+        return float(value) if np.isfinite(value) else None
+
+    return [{
+        'category': category,
+        'mp_count': int(mp_count),
+        'mp_percentage': number(mp_share),
+        'pop_percentage': number(pop_share),
+        'representation_index': number(ratio),
+    } for category, mp_count, mp_share, pop_share, ratio in zip(categories, mp_counts, mp_percentage, pop_percentage, index)]
+
+class RepresentationData:
+    """In-memory MP and population data answering representation queries, with an LRU of responses."""
+
+    def __init__(self, data_dir=store.DATA_DIR, cache_size=CACHE_SIZE):
+        tables = available_tables(data_dir)
+        if not tables:
+            raise FileNotFoundError(f"No leg<N>_clean_with_regions table in {data_dir}; run python -m parliament_gap.add_region first")
+        self.legislatures = list(tables)
+        self.mps = pd.concat([load_mps(legislature, table, data_dir) for legislature, table in tables.items()],
+                             ignore_index=True)
+
+        self.population = PopulationTable.from_csv(os.path.join(data_dir, 'pop_residente_1gen2025.csv'))
+        regions = pd.read_csv(os.path.join(data_dir, 'pop_residente_1gen2025_regioni.csv'), dtype={'Codice regione': str})
+        regions['regione'] = regions['Regione'].map(clean_region_name)
+        self.regions = regions.groupby('regione', sort=False)[list(REGION_SEX_COLUMNS.values())].sum()
+        self.education = pd.read_csv(os.path.join(data_dir, 'pop_general_education.csv')).set_index('massimo_titolo_studio')
+
+        self.response = functools.lru_cache(maxsize=cache_size)(self._response)
+
+    def options(self):
+        """The dimensions and the accepted values of each filter."""
+        return {
+            'dimensions': DIMENSIONS,
+            'filters': {
+                'legislature': self.legislatures,
+                'chamber': CHAMBERS,
+                'gender': GENDERS,
+                'age_band': AGE_LABELS,
+                'region': list(self.regions.index),
+            },
+        }
+
+    def normalize(self, params):
+        """Validated (dimension, filters) key for a parse_qs dict; equivalent queries get equal keys."""
+        unknown = set(params) - {'dimension', *FILTERS}
+        if unknown:
+            raise QueryError(f"Unknown parameters: {sorted(unknown)}")
+        values = {}
+        for name, given in params.items():
+            if len(given) != 1:
+                raise QueryError(f"Parameter '{name}' must be given once")
+            values[name] = given[0]
+
+        dimension = values.pop('dimension', None)
+        if dimension not in DIMENSIONS:
+            raise QueryError(f"'dimension' must be one of {DIMENSIONS}")
+        if dimension in values:
+            raise QueryError(f"Can't filter on '{dimension}' while grouping by it")
+        if dimension == 'age' and 'age_band' in values:
+            raise QueryError("Can't filter on 'age_band' while grouping by age")
+
+        allowed = self.options()['filters']
+        try:
+            values['legislature'] = int(values.get('legislature', self.legislatures[-1]))
+        except ValueError:
+            raise QueryError("'legislature' must be a number") from None
+        for name, value in values.items():
+            if value not in allowed[name]:
+                raise QueryError(f"Unknown {name} {value!r}")
+        return dimension, tuple(sorted(values.items()))
+
+    def representation(self, dimension, filters):
+        """The representation rows of a dimension among the MPs matching the filters.
+
+        The population side is restricted by the filters it has data for,
+        which are listed under population_filters: gender everywhere, age
+        band for the national population and region for the regional one.
+        """
+        filters = dict(filters)
+        mask = np.ones(len(self.mps), dtype=bool)
+        for name, value in filters.items():
+            mask &= (self.mps[COLUMNS[name]] == value).to_numpy()
+        mps = self.mps.loc[mask, COLUMNS[dimension]]
+
+        sex = POPULATION_SEX[filters.get('gender')]
+        population_filters = ['gender'] if 'gender' in filters else []
+
+        if dimension == 'gender':
+            categories = GENDERS
+            if 'region' in filters:
+                region = self.regions.loc[filters['region']]
+                pop_counts = [region[REGION_SEX_COLUMNS[gender]] for gender in GENDERS]
+                population_filters.append('region')
+            elif 'age_band' in filters:
+                position = AGE_LABELS.index(filters['age_band'])
+                lower, upper = AGE_BINS[position] + 1, AGE_BINS[position + 1] + 1
+                pop_counts = [self.population.count(lower, upper, gender) for gender in GENDERS]
+                population_filters.append('age_band')
+            else:
+                pop_counts = [self.population.total(gender) for gender in GENDERS]
+            mp_total = None
+        elif dimension == 'age':
+            categories = AGE_LABELS
+            pop_counts = self.population.band_counts(np.add(AGE_BINS, 1), sex)
+            mp_total = None
+        elif dimension == 'region':
+            # MPs born abroad count towards the total, as in analyze_region_comparison
+            categories = list(self.regions.index)
+            pop_counts = self.regions[REGION_SEX_COLUMNS[sex]].to_numpy()
+            mp_total = mps.notna().sum()
+        else:
+            categories = EDUCATION_LEVELS
+            pop_counts = self.education.loc[EDUCATION_LEVELS, 'pop_percentage'].to_numpy()
+            population_filters = []
+            mp_total = None
+
+        mp_counts = mps.value_counts().reindex(categories, fill_value=0).to_numpy()
+        return {
+            'dimension': dimension,
+            'filters': filters,
+            'population_filters': population_filters,
+            'mp_total': int(mps.notna().sum()),
+            'rows': representation_rows(categories, mp_counts, pop_counts, mp_total),
+        }
+
+    def _response(self, dimension, filters):
+        body = json.dumps(self.representation(dimension, filters), ensure_ascii=False).encode()
+        return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(header, etag):
+    """Whether an If-None-Match header matches the ETag (weak comparison)."""
+    if header is None:
+        return False
+    tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    return '*' in tags or etag in tags
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """GET /api/representation?dimension=...&<filters> and GET /api/options."""
+
+    server_version = 'RepresentationAPI/1.0'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        data = self.server.data
+        if url.path == '/api/options':
+            body = json.dumps(data.options(), ensure_ascii=False).encode()
+            self.send_body(HTTPStatus.OK, body)
+        elif url.path == '/api/representation':
+            try:
+                key = data.normalize(parse_qs(url.query, keep_blank_values=True))
+            except QueryError as e:
+                self.send_body(HTTPStatus.BAD_REQUEST, json.dumps({'error': str(e)}).encode())
+                return
+            body, etag = data.response(*key)
+            if etag_matches(self.headers.get('If-None-Match'), etag):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_common_headers(etag)
+                self.end_headers()
+            else:
+                self.send_body(HTTPStatus.OK, body, etag)
+        else:
+            self.send_body(HTTPStatus.NOT_FOUND, json.dumps({'error': f"No such endpoint: {url.path}"}).encode())
+
+    def send_common_headers(self, etag=None):
+        # The front end's dev server runs on another port
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if etag is not None:
+            self.send_header('ETag', etag)
+            # Let clients keep responses, but revalidate them with If-None-Match
+            self.send_header('Cache-Control', 'no-cache')
+
+    def send_body(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_common_headers(etag)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+def make_server(data, host='127.0.0.1', port=8000, quiet=False):
+    """A threading HTTP server answering from data, a RepresentationData."""
+    server = ThreadingHTTPServer((host, port), RequestHandler)
+    server.daemon_threads = True
+    server.data = data
+    server.quiet = quiet
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the representation indexes as a local read-only JSON API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--data-dir', default=store.DATA_DIR)
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help='distinct queries kept in memory')
+    parser.add_argument('--quiet', action='store_true', help="don't log every request")
+    args = parser.parse_args()
+
+    data = RepresentationData(args.data_dir, args.cache_size)
+    print(f"Loaded {len(data.mps):,} MPs from legislatures {data.legislatures}")
+
+    server = make_server(data, args.host, args.port, args.quiet)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}/api/representation")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import contextlib
+import glob
+import io
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from . import add_region
+from . import age_analysis
+from . import ages
+from . import data_clean
+from . import education_analysis
+from . import gender_analysis
+from . import instrument
+from . import region_analysis
+from . import store
+from .datasets import Datasets
+from .legislatures import parse_legislatures
+
+# The comparison analyses that make up the long-format trends table
+DIMENSIONS = ['gender', 'age', 'region', 'education']
+
+def available_legislatures(data_dir=store.DATA_DIR):
+    """Legislatures for which both a Camera and a Senato export are present."""
+    camera = {int(re.search(r'Leg(\d+)', path).group(1)) for path in glob.glob(os.path.join(data_dir, 'Camera_Leg*.csv'))}
+    senato = {int(re.search(r'Leg(\d+)', path).group(1)) for path in glob.glob(os.path.join(data_dir, 'Senato_Leg*.csv'))}
+    return sorted(camera & senato)
+
+@instrument.stage
+def analyze_legislature(legislature, data_dir=store.DATA_DIR, results_dir=store.RESULTS_DIR):
+    """Cleans, enriches and compares one legislature; returns its rows of the trends table."""
+    output_dir = os.path.join(results_dir, f'leg{legislature}')
+    os.makedirs(output_dir, exist_ok=True)
+
+    # The stages print progress meant for interactive runs; keep worker output quiet
+    with contextlib.redirect_stdout(io.StringIO()):
+        data_clean.clean_legislature(legislature, data_dir)
+        mp_df = add_region.enrich_table(legislature, data_dir)
+
+        datasets = Datasets(data_dir)
+        comparisons = {
+            'gender': gender_analysis.analyze_gender_comparison(
+                mp_df.copy(), datasets['population'],
+                os.path.join(output_dir, 'gender_comparison_analysis.csv'), legislature),
+            'age': age_analysis.analyze_age_comparison(
+                mp_df.copy(), datasets['population'],
+                os.path.join(output_dir, 'age_comparison_analysis.csv'), legislature,
+                reference_date=ages.ELECTION_DATES.get(legislature)),
+            'region': region_analysis.analyze_region_comparison(
+                mp_df.copy(), datasets['population_regions'], datasets['population_birth_countries'],
+                os.path.join(output_dir, 'region_comparison_analysis.csv'), legislature),
+            'education': education_analysis.analyze_general_education(
+                mp_df.copy(), datasets['population_education'],
+                os.path.join(output_dir, 'general_education_analysis.csv'), legislature),
+        }
+
+    rows = []
+    for dimension in DIMENSIONS:
+        comparison = comparisons[dimension]
+        # The column right after 'legislature' holds the category (gender, age_group, ...)
+        comparison = comparison.rename(columns={comparison.columns[1]: 'category'})
+        comparison.insert(1, 'dimension', dimension)
+        rows.append(comparison)
+    return pd.concat(rows, ignore_index=True)
+
+def run_batch(legislatures, workers=None, data_dir=store.DATA_DIR, results_dir=store.RESULTS_DIR):
+    """Fans the legislatures out over a process pool and stacks their results."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(analyze_legislature, legislature, data_dir, results_dir) for legislature in legislatures]
+        trends = [future.result() for future in futures]
+    return pd.concat(trends, ignore_index=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute representation gaps for many legislatures in parallel.')
+    parser.add_argument('--legislatures', default=None,
+                        help="e.g. '1-19' or '17,18,19' (default: every legislature with exports in the data directory)")
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--output', help='trends table (default: <results-dir>/legislature_trends.csv)')
+    store.add_directory_arguments(parser)
+    args = parser.parse_args()
+    output = args.output or os.path.join(args.results_dir, 'legislature_trends.csv')
+
+    available = available_legislatures(args.data_dir)
+    legislatures = parse_legislatures(args.legislatures) if args.legislatures else available
+    missing = [legislature for legislature in legislatures if legislature not in available]
+    if missing:
+        print(f"Skipping legislatures without exports in {args.data_dir}: {missing}")
+    legislatures = [legislature for legislature in legislatures if legislature not in missing]
+
+    start = time.perf_counter()
+    trends = run_batch(legislatures, args.workers, args.data_dir, args.results_dir)
+    trends.to_csv(output, index=False)
+    print(f"{len(legislatures)} legislature(s) analysed in {time.perf_counter() - start:.2f}s")
+    print(f"Trends table saved to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+from . import store
+
+# Bootstrap confidence intervals for the representation indexes. Resampling
+# the n MPs of a dimension makes each category count binomial(n, share), so
+# all resamples of all categories of all dimensions are drawn as one batched
+# NumPy array instead of looping over resamples. Categories are drawn
+# marginally rather than from one multinomial: each index only depends on
+# its own category's count, whose marginal is the same binomial either way,
+# so the intervals are the same. Population shares come from census totals
+# and are treated as exact.
+
+# The comparison tables in the results directory the intervals are computed
+# for, and their category column
+COMPARISONS = {
+    'gender': ('gender_comparison_analysis.csv', 'gender'),
+    'age': ('age_comparison_analysis.csv', 'age_group'),
+    'region': ('region_comparison_analysis.csv', 'regione'),
+    'education': ('general_education_analysis.csv', 'massimo_titolo_studio'),
+}
+
+def sample_size(comparison):
+    """Number of MPs the percentages are relative to, recovered from any non-empty row."""
+    rows = comparison[comparison['mp_count'] > 0]
+    if rows.empty:
+        return 0
+    return int(round((rows['mp_count'] / rows['mp_percentage']).median()))
+
+def bootstrap_indexes(counts, sizes, pop_percentages, n_resamples=10_000, level=0.95, seed=0, batch_size=10_000):
+    """Percentile intervals of count / size / pop_percentage for several dimensions at once.
+
+    counts and pop_percentages are (dimensions x categories) arrays, padded
+    where a dimension has fewer categories. Returns the lower and upper
+    bounds with the same shape as counts.
+    """
+    counts = np.asarray(counts, dtype=float)
+    sizes = np.asarray(sizes, dtype=np.int64)[:, None]
+    pop_percentages = np.asarray(pop_percentages, dtype=float)
+    shares = np.clip(counts / np.maximum(sizes, 1), 0, 1)
+
+    rng = np.random.default_rng(seed)
+    indexes = np.empty((n_resamples, *counts.shape))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start in range(0, n_resamples, batch_size):
+            stop = min(start + batch_size, n_resamples)
+            draws = rng.binomial(sizes, shares, size=(stop - start, *counts.shape))
+            indexes[start:stop] = draws / sizes / pop_percentages
+
+    alpha = (1 - level) / 2
+    with warnings.catch_warnings():
+        # Padding and categories without a population share are all-NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        low, high = np.nanquantile(indexes, [alpha, 1 - alpha], axis=0)
+    return low, high
+
+@instrument.stage
+def representation_intervals(comparisons, n_resamples=10_000, level=0.95, seed=0):
+    """Adds representation_index_low/high to each comparison table, all bootstrapped in one batch.
+
+    comparisons maps a dimension name to its comparison table, which needs
+    mp_count, mp_percentage and pop_percentage columns.
+    """
+    comparisons = {name: comparison.reset_index(drop=True) for name, comparison in comparisons.items()}
+    width = max(len(comparison) for comparison in comparisons.values())
+
+    counts = np.zeros((len(comparisons), width))
+    pop_percentages = np.full((len(comparisons), width), np.nan)
+    sizes = []
+    for i, comparison in enumerate(comparisons.values()):
+        counts[i, :len(comparison)] = comparison['mp_count'].fillna(0)
+        pop_percentages[i, :len(comparison)] = comparison['pop_percentage']
+        sizes.append(sample_size(comparison))
+
+    low, high = bootstrap_indexes(counts, sizes, pop_percentages, n_resamples, level, seed)
+
+    results = {}
+    for i, (name, comparison) in enumerate(comparisons.items()):
+        comparison = comparison.copy()
+        comparison['representation_index_low'] = low[i, :len(comparison)]
+        comparison['representation_index_high'] = high[i, :len(comparison)]
+        results[name] = comparison
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Bootstrap confidence intervals for every representation index.')
+    parser.add_argument('--resamples', type=int, default=10_000)
+    parser.add_argument('--level', type=float, default=0.95)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--results-dir', default=store.RESULTS_DIR, help='where the comparison tables are read and written')
+    args = parser.parse_args()
+
+    comparisons = {name: pd.read_csv(os.path.join(args.results_dir, filename)) for name, (filename, _) in COMPARISONS.items()}
+
+    start = time.perf_counter()
+    intervals = representation_intervals(comparisons, args.resamples, args.level, args.seed)
+    print(f"Drew {args.resamples:,} resamples for {len(intervals)} dimensions in {time.perf_counter() - start:.2f}s")
+
+    rows = []
+    for name, comparison in intervals.items():
+        category = COMPARISONS[name][1]
+        comparison = comparison.rename(columns={category: 'category'})
+        comparison.insert(0, 'dimension', name)
+        rows.append(comparison[['dimension', 'category', 'mp_count', 'mp_percentage', 'pop_percentage',
+                                'representation_index', 'representation_index_low', 'representation_index_high']])
+    result = pd.concat(rows, ignore_index=True)
+    print(result.to_string(index=False))
+
+    output_path = os.path.join(args.results_dir, 'representation_index_intervals.csv')
+    result.to_csv(output_path, index=False)
+    print(f"\nConfidence intervals saved to {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import os
+
+import brotli
+import pandas as pd
+
+from . import store
+from .pipeline import file_digest
+
+# Per-chart data bundles for the front end. Each chart's result tables go into
+# one compact JSON file: column-major, numbers rounded to a few significant
+# digits and text columns dictionary-encoded. Files are named after a hash of
+# their content, so they can be cached forever, and are written with
+# precompressed gzip and brotli variants next to them. manifest.json maps
+# chart names to the current files; a chart is only rebuilt when its source
+# results change.
+
+OUTPUT_DIR = 'public/data'
+MANIFEST = 'manifest.json'
+BUNDLE_FORMAT = 1
+SIGNIFICANT_DIGITS = 4
+
+# Chart -> {table name: (file in the results directory, columns or None for
+# all)}. The overview is the small bundle the page needs for its first paint.
+CHARTS = {
+    'overview': {
+        'gender': ('gender_comparison_analysis.csv', ['gender', 'representation_index']),
+        'age': ('age_comparison_analysis.csv', ['age_group', 'representation_index']),
+        'region': ('region_comparison_analysis.csv', ['regione', 'representation_index']),
+        'education': ('general_education_analysis.csv', ['massimo_titolo_studio', 'representation_index']),
+    },
+    'gender': {
+        'comparison': ('gender_comparison_analysis.csv', None),
+        'summary': ('gender_analysis_summary.csv', None),
+        'population': ('population_gender_analysis_summary.csv', None),
+    },
+    'age': {
+        'comparison': ('age_comparison_analysis.csv', None),
+        'summary': ('age_analysis_summary.csv', None),
+        'population': ('population_age_analysis_summary.csv', None),
+    },
+    'region': {
+        'comparison': ('region_comparison_analysis.csv', None),
+        'foreign': ('foreign_comparison_analysis.csv', None),
+        'summary': ('region_analysis_summary.csv', None),
+        'population': ('population_regions_analysis_summary.csv', None),
+        'birth_place': ('population_birth_place_analysis_summary.csv', None),
+    },
+    'education': {
+        'general': ('general_education_analysis.csv', None),
+        'university': ('university_education_analysis.csv', None),
+    },
+    'profession': {
+        'categories': ('profession_category_analysis.csv', None),
+        'professions': ('profession_analysis.csv', None),
+    },
+    'intervals': {
+        'intervals': ('representation_index_intervals.csv', None),
+    },
+}
+
+def round_significant(value, digits=SIGNIFICANT_DIGITS):
+    """A float rounded to a number of significant digits; None for NaN."""
+    if value is None or not math.isfinite(value):
+        return None
+    return float(f'{value:.{digits}g}')
+
+def encode_table(df, digits=SIGNIFICANT_DIGITS):
+    """Column-major compact form of a table; text columns become codes into a label list."""
+    table = {'columns': list(df.columns), 'labels': {}, 'values': []}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+            values = series.astype(int).tolist()
+        elif pd.api.types.is_float_dtype(series):
+            # Whole-number columns with gaps (counts after an outer merge) stay whole
+            whole = series.dropna().mod(1).eq(0).all() and series.abs().max() < 2**53
+            values = [None if pd.isna(value) else int(value) if whole else round_significant(value, digits)
+                      for value in series]
+        else:
+            codes, labels = pd.factorize(series)
+            table['labels'][column] = labels.astype(str).tolist()
+            values = [None if code < 0 else int(code) for code in codes]
+        table['values'].append(values)
+    return table
+
+def build_bundle(chart, tables, digits=SIGNIFICANT_DIGITS, results_dir=store.RESULTS_DIR):
+    """The JSON bytes of one chart's bundle."""
+    bundle = {'chart': chart, 'format': BUNDLE_FORMAT, 'tables': {}}
+    for name, (filename, columns) in tables.items():
+        df = pd.read_csv(os.path.join(results_dir, filename), usecols=columns)
+        bundle['tables'][name] = encode_table(df[columns] if columns else df, digits)
+    return json.dumps(bundle, ensure_ascii=False, separators=(',', ':')).encode()
+
+def source_digest(tables, digits=SIGNIFICANT_DIGITS, results_dir=store.RESULTS_DIR):
+    """Hash of everything a bundle depends on: its sources' content and how they're encoded."""
+    digest = hashlib.sha256(json.dumps([BUNDLE_FORMAT, digits, tables], sort_keys=True).encode())
+    for filename, _ in tables.values():
+        digest.update(file_digest(os.path.join(results_dir, filename)).encode())
+    return digest.hexdigest()
+
+def write_variants(body, stem, output_dir):
+    """Writes <stem>.<hash>.json with its compressed variants; returns the manifest entry."""
+    filename = f'{stem}.{hashlib.sha256(body).hexdigest()[:12]}.json'
+    variants = {
+        'json': (filename, body),
+        'gzip': (filename + '.gz', gzip.compress(body, 9, mtime=0)),
+        'br': (filename + '.br', brotli.compress(body, quality=11)),
+    }
+
+    for name, content in variants.values():
+        with open(os.path.join(output_dir, name), 'wb') as f:
+            f.write(content)
+    return {
+        'files': {encoding: name for encoding, (name, _) in variants.items()},
+        'bytes': {encoding: len(content) for encoding, (_, content) in variants.items()},
+    }
+
+def load_manifest(output_dir=OUTPUT_DIR):
+    path = os.path.join(output_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def up_to_date(entry, digest, output_dir):
+    return (entry is not None and entry.get('source_digest') == digest
+            and 'br' in entry['files']
+            and all(os.path.exists(os.path.join(output_dir, name)) for name in entry['files'].values()))
+
+def remove_files(entry, output_dir, keep=()):
+    for name in entry['files'].values():
+        path = os.path.join(output_dir, name)
+        if name not in keep and os.path.exists(path):
+            os.remove(path)
+
+def export_bundles(charts=CHARTS, output_dir=OUTPUT_DIR, digits=SIGNIFICANT_DIGITS, force=False,
+                   results_dir=store.RESULTS_DIR):
+    """Writes the bundle of every chart whose sources exist and have changed; returns the new manifest."""
+    os.makedirs(output_dir, exist_ok=True)
+    previous = load_manifest(output_dir)
+    manifest = {}
+
+    for chart, tables in charts.items():
+        missing = [filename for filename, _ in tables.values() if not os.path.exists(os.path.join(results_dir, filename))]
+        if missing:
+            print(f"Skipping {chart}: missing {', '.join(missing)}")
+            continue
+
+        digest = source_digest(tables, digits, results_dir)
+        entry = previous.get(chart)
+        if not force and up_to_date(entry, digest, output_dir):
+            manifest[chart] = entry
+            continue
+
+        manifest[chart] = {**write_variants(build_bundle(chart, tables, digits, results_dir), chart, output_dir), 'source_digest': digest}
+        if entry is not None:
+            remove_files(entry, output_dir, keep=manifest[chart]['files'].values())
+        sizes = manifest[chart]['bytes']
+        print(f"Wrote {manifest[chart]['files']['json']} ({', '.join(f'{k} {v:,} B' for k, v in sizes.items())})")
+
+    # Charts that are gone, or whose sources are, leave no files behind
+    for chart, entry in previous.items():
+        if chart not in manifest:
+            remove_files(entry, output_dir)
+
+    with open(os.path.join(output_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the results as compact, precompressed per-chart bundles.')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--results-dir', default=store.RESULTS_DIR, help='where the result tables are read')
+    parser.add_argument('--digits', type=int, default=SIGNIFICANT_DIGITS, help='significant digits kept in numbers')
+    parser.add_argument('--force', action='store_true', help='rebuild every bundle')
+    args = parser.parse_args()
+
+    manifest = export_bundles(output_dir=args.output_dir, digits=args.digits, force=args.force, results_dir=args.results_dir)
+    total = sum(entry['bytes']['gzip'] for entry in manifest.values())
+    print(f"\n{len(manifest)} bundles, {total:,} bytes gzipped in all; manifest saved to {os.path.join(args.output_dir, MANIFEST)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import csv
+import os
+import sys
+
+from .legislatures import parse_legislatures
+
+# One command line for the whole pipeline: parliament-gap <subcommand>. Each
+# subcommand imports the modules it needs when it runs, so --help and the
+# report start without loading pandas, and the same functions can be called
+# in-process from a scheduler.
+
+# The same defaults as store.DATA_DIR and store.RESULTS_DIR, without importing pandas
+DATA_DIR = 'data'
+RESULTS_DIR = 'results'
+
+# The comparison tables the report prints, and their category column
+REPORT_TABLES = {
+    'gender': ('gender_comparison_analysis.csv', 'gender'),
+    'age': ('age_comparison_analysis.csv', 'age_group'),
+    'region': ('region_comparison_analysis.csv', 'regione'),
+    'education': ('general_education_analysis.csv', 'massimo_titolo_studio'),
+}
+INTERVALS_FILE = 'representation_index_intervals.csv'
+
+def clean(args):
+    from . import data_clean
+
+    for legislature in args.legislatures:
+        df = data_clean.clean_legislature(legislature, args.data_dir, export_csv=args.csv)
+        print(f"Legislature {legislature}: {len(df)} MPs cleaned")
+
+def regions(args):
+    from . import add_region
+
+    for legislature in args.legislatures:
+        add_region.enrich_table(legislature, args.data_dir, export_csv=args.csv)
+
+def enrich(args):
+    from . import wikipedia_education
+
+    wikipedia_education.enrich_education(args.legislature, args.data_dir, args.results_dir, workers=args.workers,
+                                         cache_path=args.cache, api_url=args.api_url or wikipedia_education.WIKIPEDIA_API_URL,
+                                         wikidata_url=args.wikidata_url or wikipedia_education.WIKIDATA_SPARQL_URL)
+
+def refresh(args):
+    from . import refresh
+
+    for legislature in args.legislatures:
+        _, columns, _ = refresh.refresh_legislature(legislature, args.data_dir, export_csv=args.csv)
+        print(f"Legislature {legislature}: changed columns: {', '.join(sorted(columns)) or 'none'}")
+
+def analyze(args):
+    from . import run_all
+    from .datasets import Datasets
+
+    run_all.run_all(Datasets(args.data_dir), args.results_dir)
+    print(f"Results saved to '{args.results_dir}'")
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def report(args):
+    """Prints the representation indexes from the results, with their intervals if bootstrap.py has run."""
+    intervals = {}
+    intervals_path = os.path.join(args.results_dir, INTERVALS_FILE)
+    if os.path.exists(intervals_path):
+        intervals = {(row['dimension'], row['category']): row for row in read_rows(intervals_path)}
+
+    found = False
+    for dimension, (filename, category) in REPORT_TABLES.items():
+        path = os.path.join(args.results_dir, filename)
+        if args.dimension and dimension not in args.dimension or not os.path.exists(path):
+            continue
+        found = True
+        print(f"\n{dimension.capitalize()}")
+        for row in read_rows(path):
+            line = f"  {row[category]:<45} {float(row['representation_index']):8.3f}"
+            interval = intervals.get((dimension, row[category]))
+            if interval and interval['representation_index_low']:
+                line += f"  [{float(interval['representation_index_low']):.3f}, {float(interval['representation_index_high']):.3f}]"
+            print(line)
+
+    if not found:
+        print(f"No comparison results in '{args.results_dir}'; run the analyze subcommand first", file=sys.stderr)
+        return 1
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='parliament-gap', description='Representation gap of the Italian parliament.')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='input tables and population data')
+    parser.add_argument('--results-dir', default=RESULTS_DIR, help='where the analyses write their results')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparser = subparsers.add_parser('clean', help='clean the Camera and Senato exports into leg<N>_clean')
+    subparser.add_argument('--legislatures', type=parse_legislatures, default=[19], help="e.g. '19', '17-19' or '17,19'")
+    subparser.add_argument('--csv', action='store_true', help='also export the tables as CSV')
+    subparser.set_defaults(handler=clean)
+
+    subparser = subparsers.add_parser('regions', help='add birth regions and education levels into leg<N>_clean_with_regions')
+    subparser.add_argument('--legislatures', type=parse_legislatures, default=[19], help="e.g. '19', '17-19' or '17,19'")
+    subparser.add_argument('--csv', action='store_true', help='also export the tables as CSV')
+    subparser.set_defaults(handler=regions)
+
+    subparser = subparsers.add_parser('refresh', help='upsert the MPs changed since the last refresh into leg<N>_clean')
+    subparser.add_argument('--legislatures', type=parse_legislatures, default=[19], help="e.g. '19', '17-19' or '17,19'")
+    subparser.add_argument('--csv', action='store_true', help='also export the tables as CSV')
+    subparser.set_defaults(handler=refresh)
+
+    subparser = subparsers.add_parser('enrich', help='look up missing education on Wikipedia')
+    subparser.add_argument('--legislature', type=int, default=19)
+    subparser.add_argument('--workers', type=int, default=8, help='number of concurrent lookups')
+    subparser.add_argument('--cache', help='on-disk page cache (default: <data-dir>/wikipedia_cache.sqlite)')
+    subparser.add_argument('--api-url', help='MediaWiki API URL template, e.g. a local stub')
+    subparser.add_argument('--wikidata-url', help='Wikidata SPARQL endpoint, e.g. a local stub')
+    subparser.set_defaults(handler=enrich)
+
+    subparser = subparsers.add_parser('analyze', help='run every report analysis in-process')
+    subparser.set_defaults(handler=analyze)
+
+    subparser = subparsers.add_parser('report', help='print the representation indexes from the results')
+    subparser.add_argument('--dimension', action='append', choices=list(REPORT_TABLES), help='dimension to print (default: all)')
+    subparser.set_defaults(handler=report)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
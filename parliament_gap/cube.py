@@ -0,0 +1,279 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import ages
+from . import data_clean
+from . import education
+from . import store
+from .age_analysis import AGE_BINS, AGE_LABELS
+from .population import PopulationTable
+from .region_analysis import clean_region_name
+
+# Intersectional counts as dense NumPy arrays. One pass over the MP table
+# turns every MP into a cell of a chamber x gender x age band x region x
+# education cube (np.bincount over the flattened cell index); any slice or
+# roll-up is then a sum over array axes. The population is only known
+# jointly by sex and age, by sex and region and by education alone, so it is
+# kept as one small cube per such combination (plus sex alone, over all
+# ages), and a population share is available for any selection that one of
+# them covers.
+
+AXES = ['chamber', 'gender', 'age_band', 'region', 'education']
+
+CHAMBERS = ['camera', 'senato']
+GENDERS = ['M', 'F']
+EDUCATION_LEVELS = ['Licenza Media', 'Diploma', 'Laurea']
+FOREIGN = 'Estero'
+
+# ISTAT geographic areas, by region code
+AREA_CODES = {
+    'Nord-ovest': ['01', '02', '03', '07'],
+    'Nord-est': ['04', '05', '06', '08'],
+    'Centro': ['09', '10', '11', '12'],
+    'Sud': ['13', '14', '15', '16', '17', '18'],
+    'Isole': ['19', '20'],
+}
+
+CUBE_FILE = 'leg{legislature}_cube.npz'
+
+class Cube:
+    """Counts over named axes with labelled positions.
+
+    The MP cube has a trailing 'unknown' position on every axis for missing
+    values, so totals stay complete; selecting labels leaves it out.
+    """
+
+    def __init__(self, axes, labels, counts):
+        self.axes = list(axes)
+        self.labels = {axis: list(labels[axis]) for axis in self.axes}
+        self.counts = np.asarray(counts)
+        self._positions = {axis: {label: i for i, label in enumerate(self.labels[axis])} for axis in self.axes}
+
+    def positions(self, axis, values):
+        """Positions of a label or a list of labels on an axis."""
+        values = [values] if isinstance(values, str) else list(values)
+        try:
+            return [self._positions[axis][value] for value in values]
+        except KeyError as e:
+            raise KeyError(f"Unknown {axis} {e.args[0]!r}; expected one of {self.labels[axis]}") from None
+
+    def covers(self, axes):
+        return set(axes) <= set(self.axes)
+
+    def count(self, **selection):
+        """Number of people matching the selection; axes that aren't selected are summed over."""
+        unknown = set(selection) - set(self.axes)
+        if unknown:
+            raise KeyError(f"Cube has no axes {sorted(unknown)}")
+        index = [self.positions(axis, selection[axis]) if axis in selection else range(self.counts.shape[i])
+                 for i, axis in enumerate(self.axes)]
+        return self.counts[np.ix_(*index)].sum()
+
+    def rollup(self, *axes, **selection):
+        """Counts over the given axes for the selection, as a Series indexed by their labels."""
+        index = []
+        for i, axis in enumerate(self.axes):
+            if axis in selection:
+                index.append(self.positions(axis, selection[axis]))
+            elif axis in axes:
+                index.append(range(len(self.labels[axis])))
+            else:
+                index.append(range(self.counts.shape[i]))
+        sliced = self.counts[np.ix_(*index)]
+        summed = tuple(i for i, axis in enumerate(self.axes) if axis not in axes)
+        kept = [axis for axis in self.axes if axis in axes]
+        values = sliced.sum(axis=summed)
+        return pd.Series(values.ravel(), index=pd.MultiIndex.from_product([self.labels[axis] for axis in kept], names=kept)
+                         if len(kept) > 1 else pd.Index(self.labels[kept[0]], name=kept[0]), name='count')
+
+    def share(self, within=None, **selection):
+        """Share of the people matching within that also match the selection.
+
+        Only people whose value is known on every selected axis count
+        towards the denominator.
+        """
+        within = dict(within or {})
+        overlap = set(within) & set(selection)
+        if overlap:
+            raise ValueError(f"Axes {sorted(overlap)} are both selected and conditioned on")
+        known = {axis: self.labels[axis] for axis in selection}
+        total = self.count(**known, **within)
+        return self.count(**selection, **within) / total if total else np.nan
+
+def region_labels(regions):
+    """Birth region labels: the regions of the regional population table, then abroad."""
+    return [clean_region_name(region) for region in regions['Regione']] + [FOREIGN]
+
+def areas(regions):
+    """ISTAT geographic area -> its regions' labels, for selecting e.g. region=areas['Sud']."""
+    names = dict(zip(regions['Codice regione'], region_labels(regions)))
+    return {area: [names[code] for code in codes] for area, codes in AREA_CODES.items()}
+
+def mp_dimensions(df, legislature=None):
+    """The MP columns the cube and the API group on: ramo, genere, age_band, regione, livello_istruzione.
+
+    Ages are taken on the legislature's election date (today if unknown).
+    """
+    if education.LEVEL_COLUMN not in df.columns:
+        df = education.add_education_columns(df)
+    age = ages.calendar_age(df['data_nascita'], ages.ELECTION_DATES.get(legislature))
+    # Licenza elementare is counted with licenza media, as in analyze_general_education
+    level = df[education.LEVEL_COLUMN].astype(object).replace({'Licenza Elementare': 'Licenza Media'})
+    return pd.DataFrame({
+        'ramo': data_clean.chamber_of(df['id']),
+        'genere': df['genere'].astype(object),
+        'age_band': pd.cut(age, AGE_BINS, labels=AGE_LABELS).astype(object),
+        'regione': df['regione_nascita'].astype(object).map(clean_region_name, na_action='ignore'),
+        'livello_istruzione': level,
+    })
+
+# The mp_dimensions column behind each axis
+AXIS_COLUMNS = {
+    'chamber': 'ramo',
+    'gender': 'genere',
+    'age_band': 'age_band',
+    'region': 'regione',
+    'education': 'livello_istruzione',
+}
+
+def build_mp_cube(mps, labels):
+    """Counts of the MPs in each cell, built in one np.bincount over their flattened cell index."""
+    codes = []
+    for axis in AXES:
+        axis_codes = pd.Categorical(mps[AXIS_COLUMNS[axis]], categories=labels[axis]).codes.astype(np.int64)
+        # Missing and unexpected values go to the trailing 'unknown' position
+        codes.append(np.where(axis_codes < 0, len(labels[axis]), axis_codes))
+    shape = tuple(len(labels[axis]) + 1 for axis in AXES)
+    cells = np.ravel_multi_index(codes, shape)
+    return Cube(AXES, labels, np.bincount(cells, minlength=int(np.prod(shape))).reshape(shape))
+
+def build_population_cubes(population, regions, births, pop_education):
+    """Population cubes over the axis combinations the ISTAT tables cover."""
+    population = PopulationTable.of(population)
+    age_counts = np.stack([population.band_counts(np.add(AGE_BINS, 1), sex) for sex in GENDERS])
+
+    # Foreign-born residents, as in analyze_foreign_comparison
+    foreign = births[births['Paese di nascita'] != 'Italia'][['Maschi', 'Femmine']].sum().to_numpy()
+    region_counts = np.column_stack([
+        np.append(regions['Totale maschi'].to_numpy(), foreign[0]),
+        np.append(regions['Totale femmine'].to_numpy(), foreign[1]),
+    ])
+
+    shares = pop_education.set_index('massimo_titolo_studio').loc[EDUCATION_LEVELS, 'pop_percentage'].to_numpy()
+    # Tried in order, so the smallest cube covering a selection answers it
+    return [
+        Cube(['gender'], {'gender': GENDERS}, [population.total(sex) for sex in GENDERS]),
+        Cube(['gender', 'age_band'], {'gender': GENDERS, 'age_band': AGE_LABELS}, age_counts),
+        Cube(['region', 'gender'], {'region': region_labels(regions), 'gender': GENDERS}, region_counts),
+        Cube(['education'], {'education': EDUCATION_LEVELS}, shares),
+    ]
+
+class RepresentationCube:
+    """The MP cube of a legislature with the population cubes to compare it against."""
+
+    def __init__(self, mps, population):
+        self.mps = mps
+        self.population = population
+
+    @classmethod
+    def build(cls, legislature=19, data_dir=store.DATA_DIR):
+        regions = pd.read_csv(os.path.join(data_dir, 'pop_residente_1gen2025_regioni.csv'), dtype={'Codice regione': str})
+        population = build_population_cubes(
+            PopulationTable.from_csv(os.path.join(data_dir, 'pop_residente_1gen2025.csv')),
+            regions,
+            pd.read_csv(os.path.join(data_dir, 'pop_birth_foreign_countries_1gen2024.csv')),
+            pd.read_csv(os.path.join(data_dir, 'pop_general_education.csv')),
+        )
+        labels = {
+            'chamber': CHAMBERS,
+            'gender': GENDERS,
+            'age_band': AGE_LABELS,
+            'region': region_labels(regions),
+            'education': EDUCATION_LEVELS,
+        }
+        mps = store.read_table(f'leg{legislature}_clean_with_regions', data_dir=data_dir)
+        return cls(build_mp_cube(mp_dimensions(mps, legislature), labels), population)
+
+    def population_cube(self, axes):
+        """The population cube covering all the given axes."""
+        for cube in self.population:
+            if cube.covers(axes):
+                return cube
+        raise ValueError(f"No population data across {sorted(axes)}")
+
+    def representation_index(self, within=None, **selection):
+        """MP share of the selection over the population share of the same selection.
+
+        Chamber is an MP-only axis: conditioning on it leaves the population side unchanged.
+        """
+        within = dict(within or {})
+        population_within = {axis: value for axis, value in within.items() if axis != 'chamber'}
+        population = self.population_cube([*selection, *population_within])
+        return self.mps.share(within, **selection) / population.share(population_within, **selection)
+
+    def save(self, path):
+        """Writes all the cubes to one .npz file."""
+        cubes = [self.mps, *self.population]
+        arrays = {f'counts_{i}': cube.counts for i, cube in enumerate(cubes)}
+        meta = [{'axes': cube.axes, 'labels': cube.labels} for cube in cubes]
+        np.savez_compressed(path, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as npz:
+            meta = json.loads(str(npz['meta']))
+            cubes = [Cube(m['axes'], m['labels'], npz[f'counts_{i}']) for i, m in enumerate(meta)]
+        return cls(cubes[0], cubes[1:])
+
+def parse_selection(terms, region_areas):
+    """Parses 'axis=value' terms, with '|' between alternatives and area names for regions."""
+    selection = {}
+    for term in terms:
+        axis, _, values = term.partition('=')
+        values = values.split('|')
+        if axis == 'region':
+            values = [region for value in values for region in region_areas.get(value, [value])]
+        selection[axis] = values
+    return selection
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the intersectional MP cube and query it.')
+    parser.add_argument('selection', nargs='*',
+                        help="e.g. gender=F 'age_band=18-25|26-35' region=Sud education=Laurea")
+    parser.add_argument('--legislature', type=int, default=19)
+    parser.add_argument('--within', action='append', default=[], help="condition on e.g. chamber=senato")
+    store.add_directory_arguments(parser, results=False)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cube = RepresentationCube.build(args.legislature, args.data_dir)
+    print(f"Built a {' x '.join(map(str, cube.mps.counts.shape))} cube of {cube.mps.counts.sum()} MPs "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    path = os.path.join(args.data_dir, CUBE_FILE.format(legislature=args.legislature))
+    cube.save(path)
+    print(f"Cube saved to {path}")
+
+    if not args.selection:
+        return
+    region_areas = areas(pd.read_csv(os.path.join(args.data_dir, 'pop_residente_1gen2025_regioni.csv'), dtype={'Codice regione': str}))
+    selection = parse_selection(args.selection, region_areas)
+    within = parse_selection(args.within, region_areas)
+
+    start = time.perf_counter()
+    count = cube.mps.count(**selection, **within)
+    share = cube.mps.share(within, **selection)
+    elapsed = time.perf_counter() - start
+    print(f"\nMPs: {count} ({share:.2%} of those with known {', '.join(selection)}) in {elapsed * 1e6:.0f} µs")
+    try:
+        print(f"Representation index: {cube.representation_index(within, **selection):.3f}")
+    except ValueError as e:
+        print(f"Representation index: n/a ({e})")
+
+if __name__ == "__main__":
+    main()
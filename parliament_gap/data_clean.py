@@ -0,0 +1,207 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import education
+from . import instrument
+from . import store
+from .vectorize import per_unique
+
+# Every cleaning step below works on a whole column at a time with pandas
+# string/regex operations, so the cost no longer grows with a Python-level
+# call per row. The SPARQL exports repeat the same names, places and dates
+# many times over, so each step also runs only once per distinct value.
+
+@per_unique
+def extract_id(urls):
+    return urls.str.replace(r'^.*/', '', regex=True)
+
+def chamber_of(ids):
+    """'camera' for Camera persona ids (p309220), 'senato' for Senato ones (32578)."""
+    return pd.Series(np.where(ids.astype(str).str.match(r'^p\d+$'), 'camera', 'senato'), index=ids.index)
+
+@per_unique
+def clean_capitalized_data(data):
+    return data.str.title()
+
+def clean_genere(genere):
+    return genere.replace({'male': 'M', 'female': 'F'})
+
+@per_unique
+def wrangle_data_nascita(data_nascita):
+    """Normalise birth dates to YYYY-MM-DD, accepting YYYYMMDD integers or strings."""
+    if pd.api.types.is_numeric_dtype(data_nascita):
+        data_nascita = data_nascita.astype('int64').astype(str)
+    return data_nascita.str.replace(r'^(\d{4})(\d{2})(\d{2})$', r'\1-\2-\3', regex=True)
+
+@per_unique
+def extract_titolo_professione(descrizione):
+    """
+    Extract titolo di studio and professione from the descrizione field.
+    If there's a semicolon, split into titolo and professione.
+    If there's no semicolon, assume the entire string is titolo di studio.
+    """
+    parts = descrizione.str.split(';', n=1, expand=True).reindex(columns=[0, 1])
+    titolo = parts[0].str.strip()
+    professione = parts[1].str.strip()
+    return titolo, professione
+
+def create_tipo_mandato(tipo_mandato):
+    return tipo_mandato.fillna('elettivo')
+
+@per_unique
+def wrangle_provincia_nascita(nato):
+    return nato.str.split(',').str[1].str.strip().str.title()
+
+# The Camera query returns one row per deputy x commissione x group membership.
+# These columns are folded into per-deputy sets during ingestion.
+CAMERA_MEMBERSHIP_COLUMNS = {
+    'commissione': 'commissioni',
+    'nomeGruppo': 'gruppi',
+}
+
+# dataNascita is a YYYYMMDD number in the Camera export; keep it as text
+CAMERA_DTYPES = {'dataNascita': str}
+# and so are the mandate dates in the Camera mandates export
+CAMERA_MANDATE_DTYPES = {'dataNascita': str, 'inizioMandato': str, 'fineMandato': str}
+
+def is_file_source(source):
+    return isinstance(source, (str, os.PathLike)) or hasattr(source, 'read')
+
+@instrument.stage
+def ingest_camera(source, chunksize=10_000):
+    """Streams a Camera export in chunks, keeping one row per deputy with their memberships as sets.
+
+    source is a CSV path or file, or an iterable of already parsed chunks
+    such as the result pages from sparql.chamber_pages.
+    """
+    people = []
+    seen = set()
+    memberships = {column: {} for column in CAMERA_MEMBERSHIP_COLUMNS}
+
+    chunks = pd.read_csv(source, chunksize=chunksize, dtype=CAMERA_DTYPES) if is_file_source(source) else source
+    for chunk in chunks:
+        for column, sets in memberships.items():
+            pairs = chunk[['persona', column]].dropna().drop_duplicates()
+            for persona, value in zip(pairs['persona'], pairs[column]):
+                sets.setdefault(persona, set()).add(value)
+
+        first_rows = chunk.drop_duplicates('persona')
+        first_rows = first_rows[[persona not in seen for persona in first_rows['persona']]]
+        seen.update(first_rows['persona'])
+        people.append(first_rows.drop(columns=[*CAMERA_MEMBERSHIP_COLUMNS, 'sigla']))
+
+    camera_df = pd.concat(people, ignore_index=True)
+    for column, name in CAMERA_MEMBERSHIP_COLUMNS.items():
+        sets = memberships[column]
+        camera_df[name] = [frozenset(sets.get(persona, ())) for persona in camera_df['persona']]
+    return camera_df
+
+@instrument.stage
+def clean_camera(camera_df):
+    """Renames and cleans the Camera SPARQL export."""
+    camera_df = camera_df.rename(columns={
+        'persona': 'url',
+        'dataNascita': 'data_nascita',
+        'luogoNascita': 'citta_nascita',
+        'descrizione': 'professione',
+    })
+
+    camera_df['id'] = extract_id(camera_df['url'])
+
+    camera_df['nome'] = clean_capitalized_data(camera_df['nome'])
+    camera_df['cognome'] = clean_capitalized_data(camera_df['cognome'])
+    camera_df['citta_nascita'] = clean_capitalized_data(camera_df['citta_nascita'])
+    camera_df['provincia_nascita'] = wrangle_provincia_nascita(camera_df['nato'])
+
+    titolo_studio, professione = extract_titolo_professione(camera_df['professione'])
+    camera_df['titolo_studio'] = clean_capitalized_data(titolo_studio)
+    camera_df['professione'] = clean_capitalized_data(professione)
+
+    camera_df['genere'] = clean_genere(camera_df['genere'])
+    camera_df['data_nascita'] = wrangle_data_nascita(camera_df['data_nascita'])
+    camera_df['tipo_mandato'] = 'elettivo'
+    return camera_df
+
+@instrument.stage
+def clean_senato(senato_df):
+    """Renames and cleans the Senato SPARQL export."""
+    senato_df = senato_df.rename(columns={
+        'senatore': 'url',
+        'dataNascita': 'data_nascita',
+        'cittaNascita': 'citta_nascita',
+        'provinciaNascita': 'provincia_nascita',
+        'Professione': 'professione'
+    })
+
+    senato_df['id'] = extract_id(senato_df['url'])
+    senato_df['genere'] = clean_genere(senato_df['genere'])
+    senato_df['data_nascita'] = wrangle_data_nascita(senato_df['data_nascita'])
+    senato_df['tipo_mandato'] = create_tipo_mandato(senato_df['tipoMandato'])
+    return senato_df
+
+@instrument.stage
+def combine_chambers(camera_df, senato_df, keys=()):
+    """Stacks the cleaned chambers into one row per MP with a list of professions.
+
+    keys are further columns that tell an MP's rows apart, e.g. the dates of
+    their mandates.
+    """
+    df = pd.concat([camera_df, senato_df])
+
+    df = df[['id', 'nome', 'cognome', 'genere', 'data_nascita', 'citta_nascita', 'provincia_nascita', 'titolo_studio', 'professione', 'tipo_mandato', *keys]]
+
+    df = df.drop_duplicates()
+    # Group by all columns except 'professione' and aggregate 'professione' into a list
+    df = df.groupby(['id', 'nome', 'cognome', 'genere', 'data_nascita', 'citta_nascita', 'provincia_nascita', 'titolo_studio', 'tipo_mandato', *keys], as_index=False, dropna=False).agg({
+        'professione': list  # Simply convert to list without filtering None values
+    })
+    return df
+
+def camera_export_path(legislature, data_dir=store.DATA_DIR):
+    return f'{data_dir}/Camera_Leg{legislature}.csv'
+
+def senato_export_path(legislature, data_dir=store.DATA_DIR):
+    return f'{data_dir}/Senato_Leg{legislature}.csv'
+
+def camera_mandates_path(legislature, data_dir=store.DATA_DIR):
+    return f'{data_dir}/Camera_Leg{legislature}_mandati.csv'
+
+def senato_mandates_path(legislature, data_dir=store.DATA_DIR):
+    return f'{data_dir}/Senato_Leg{legislature}_mandati.csv'
+
+@instrument.stage
+def read_senato(source):
+    """Reads a Senato export from a CSV path or file, or from an iterable of result pages."""
+    if is_file_source(source):
+        return pd.read_csv(source)
+    return pd.concat(source, ignore_index=True)
+
+@instrument.stage
+def clean_legislature(legislature, data_dir=store.DATA_DIR, export_csv=False, camera_source=None, senato_source=None):
+    """Cleans one legislature's exports and writes the leg<N>_clean table.
+
+    The sources default to the CSV exports in data_dir.
+    """
+    camera_df = ingest_camera(camera_source if camera_source is not None else camera_export_path(legislature, data_dir))
+    senato_df = read_senato(senato_source if senato_source is not None else senato_export_path(legislature, data_dir))
+
+    df = combine_chambers(clean_camera(camera_df), clean_senato(senato_df))
+    df = education.add_education_columns(df, data_dir)
+
+    store.write_table(df, f'leg{legislature}_clean', data_dir, csv=export_csv)
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description='Clean the Camera and Senato exports into the leg<N>_clean table.')
+    parser.add_argument('--legislature', type=int, default=19)
+    parser.add_argument('--csv', action='store_true', help='also export leg<N>_clean.csv')
+    store.add_directory_arguments(parser, results=False)
+    args = parser.parse_args()
+
+    clean_legislature(args.legislature, args.data_dir, export_csv=args.csv)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+
+import pandas as pd
+
+from . import store
+from .population import PopulationTable
+
+POPULATION_DTYPES = {
+    'Età': str,  # '100 e oltre' and 'Totale' are not numeric
+    'Totale maschi': 'int64',
+    'Totale femmine': 'int64',
+    'Totale': 'int64',
+}
+
+# MP tables read from the columnar store
+STORE_TABLES = {
+    'mp_clean': 'leg19_clean',
+    'mp_updated': 'leg19_clean_updated',
+    'mp_regions': 'leg19_clean_with_regions',
+}
+
+SOURCES = {
+    'population': ('pop_residente_1gen2025.csv', POPULATION_DTYPES),
+    'population_regions': ('pop_residente_1gen2025_regioni.csv', {'Codice regione': str, 'Regione': str, **POPULATION_DTYPES}),
+    'population_birth_countries': ('pop_birth_foreign_countries_1gen2024.csv', {'Paese di nascita': str}),
+    'population_education': ('pop_general_education.csv', {'massimo_titolo_studio': str}),
+    'population_graduates': ('laureati_pop2022.csv', {'gruppo_laurea': str}),
+}
+
+# Objects built once from a loaded source and shared from then on
+DERIVED = {
+    'population_table': ('population', PopulationTable),
+}
+
+class Datasets:
+    """Shared dataset context: each source file is parsed at most once per run.
+
+    The analyses modify the frames they are given, so every lookup returns a
+    copy of the cached frame rather than the frame itself.
+    """
+
+    def __init__(self, data_dir=store.DATA_DIR):
+        self.data_dir = data_dir
+        self._frames = {}
+
+    def load(self, name):
+        if name not in self._frames and name in DERIVED:
+            source, build = DERIVED[name]
+            self._frames[name] = build(self.load(source))
+        elif name not in self._frames and name in STORE_TABLES:
+            self._frames[name] = store.read_table(STORE_TABLES[name], data_dir=self.data_dir)
+        elif name not in self._frames:
+            filename, dtypes = SOURCES[name]
+            # dtypes for columns a file doesn't have are ignored by read_csv
+            self._frames[name] = pd.read_csv(os.path.join(self.data_dir, filename), dtype=dtypes)
+        return self._frames[name]
+
+    def __getitem__(self, name):
+        return self.load(name).copy()
@@ -0,0 +1,92 @@
+import functools
+import os
+import re
+
+import pandas as pd
+
+from . import store
+from .vectorize import first_match, per_unique, priority_pattern
+
+# Education level and degree group from the free-text titolo_studio, computed
+# once when a table is cleaned and stored as columns. Each distinct title is
+# classified once, by two compiled regexes. The few MPs whose degree group the
+# titles can't tell are listed by id in data/education_overrides.csv.
+
+LEVEL_COLUMN = 'livello_istruzione'
+GROUP_COLUMN = 'gruppo_laurea'
+OVERRIDES_FILE = 'education_overrides.csv'
+
+# Highest level first: a title mentioning a laurea is a laurea, whatever else it lists
+EDUCATION_LEVELS = {
+    'Laurea': ['laurea'],
+    'Diploma': ['diploma'],
+    'Licenza Media': ['licenza media'],
+    'Licenza Elementare': ['licenza elementare'],
+}
+
+# Degree groups as in laureati_pop2022.csv, keyed on the subject of the first
+# laurea in the title. Earlier groups win, e.g. "scienze politiche indirizzo
+# economico" is Economico and "biblioteconomia" is Letterario-umanistico.
+DEGREE_GROUPS = {
+    'Giuridico': ['giurisprudenza', 'giuridic'],
+    'Letterario-umanistico': ['lettere', 'filosof', 'stori', 'archivistic', 'biblioteconom', 'archeolog'],
+    'Economico': ['econom', 'aziendal', 'finanz', 'bancari', 'marketing', 'management', 'commercio'],
+    'Architettura e ingegneria civile': ['architettura', 'ingegneria civile', 'ingegneria edile', 'pianificazione territoriale', 'urbanistica'],
+    'Informatica e tecnologie ICT': ['informatic', "scienze dell'informazione"],
+    "Ingegneria industriale e dell'informazione": ['ingegneria', 'controllo qualit', 'trasporti'],
+    'Agrario-forestale e veterinario': ['agrari', 'forestal', 'veterinari'],
+    'Medico-sanitario e farmaceutico': ['medicina', 'chirurgia', 'farmac', 'odontoiatri', 'infermier', 'sanitari'],
+    'Psicologico': ['psicolog'],
+    'Educazione e formazione': ['pedagogi', 'educazione', 'formazione'],
+    'Linguistico': ['lingue', 'linguistic', 'germanistica', 'anglistica'],
+    'Scientifico': ['biolog', 'chimic', 'fisica', 'geolog', 'matematic', 'statistic'],
+    'Scienze motorie e sportive': ['motori', 'sportiv'],
+    'Arte e design': ['conservatorio', 'design', 'arte', 'musica', 'decorazione', 'beni culturali', 'spettacolo'],
+    'Politico-sociale e comunicazione': ['politic', 'internazional', 'comunicazione', 'media', 'sociolog', 'social',
+                                         'amministrazione', 'sicurezza', 'difesa', 'diplomatic'],
+}
+
+# The subject of the first laurea: what follows "laurea [magistrale|...] in", up
+# to a further degree, doctorate, master or specialization
+_SUBJECT = re.compile(
+    r'laurea(?: magistrale| triennale| specialistica| honoris causa)? in (.*?)'
+    r'(?=,? *(?:laurea|dottorato|master|specializzazione|scuola|corsi)\b|$)',
+    re.DOTALL,
+)
+
+_LEVEL_PATTERN = priority_pattern(EDUCATION_LEVELS)
+_GROUP_PATTERN = priority_pattern(DEGREE_GROUPS)
+
+@per_unique
+def classify_titles(titles):
+    """Education level and degree group for each title in a Series, classifying each distinct title once."""
+    text = titles.str.lower().str.strip()
+    level = first_match(text, _LEVEL_PATTERN, list(EDUCATION_LEVELS))
+    subject = text.str.extract(_SUBJECT)[0]
+    group = first_match(subject.fillna(''), _GROUP_PATTERN, list(DEGREE_GROUPS)).where(level == 'Laurea')
+    return level, group
+
+@functools.lru_cache(maxsize=None)
+def load_overrides(data_dir=store.DATA_DIR):
+    """Degree groups by MP id from the overrides file in data_dir; empty if there is none."""
+    path = os.path.join(data_dir, OVERRIDES_FILE)
+    if not os.path.exists(path):
+        return pd.Series(dtype=object)
+    overrides = pd.read_csv(path, dtype=str)
+    return overrides.set_index('id')[GROUP_COLUMN]
+
+def add_education_columns(df, data_dir=store.DATA_DIR):
+    """Adds livello_istruzione and gruppo_laurea columns classified from titolo_studio.
+
+    The degree groups of MPs with a laurea listed in the overrides file of
+    data_dir replace the classified ones.
+    """
+    # An all-missing column may have been read as floats
+    level, group = classify_titles(df['titolo_studio'].astype(object))
+    if 'id' in df.columns:
+        overrides = df['id'].map(load_overrides(data_dir))
+        group = overrides.where(overrides.notna() & (level == 'Laurea'), group)
+
+    df[LEVEL_COLUMN] = pd.Categorical(level, categories=list(EDUCATION_LEVELS))
+    df[GROUP_COLUMN] = pd.Categorical(group, categories=list(DEGREE_GROUPS))
+    return df
@@ -1,17 +1,32 @@
-import pandas as pd
+import argparse
 import os
 
-def analyze_general_education(df, pop_general_education, output_csv_path):
-    df['titolo_studio'] = df['titolo_studio'].replace('na', pd.NA).fillna('not specified').str.lower()
+import pandas as pd
+
+from . import education
+from . import instrument
+from . import store
+
+def education_columns(df):
+    """The MP table with livello_istruzione and gruppo_laurea, classifying titolo_studio if they're missing."""
+    if education.LEVEL_COLUMN in df.columns and education.GROUP_COLUMN in df.columns:
+        return df
+    return education.add_education_columns(df.copy())
+
+@instrument.stage
+def analyze_general_education(df, pop_general_education, output_csv_path, legislature=None):
+    df = education_columns(df)
 
-    null_count = df[df.titolo_studio=='not specified']['titolo_studio'].count()
+    null_count = df[education.LEVEL_COLUMN].isna().sum()
     if null_count > 0:
         print(f"Note: {null_count} MPs have missing education data and will be excluded from the analysis")
 
-    licenza_elementare = df['titolo_studio'].str.contains('licenza elementare').sum()
-    licenza_media = df['titolo_studio'].str.contains('licenza media').sum()
-    diploma = df['titolo_studio'].str.contains('diploma').sum()
-    laurea = df['titolo_studio'].str.contains('laurea').sum()
+    # Each MP counts once, at their highest level
+    levels = df[education.LEVEL_COLUMN].value_counts()
+    licenza_elementare = levels.get('Licenza Elementare', 0)
+    licenza_media = levels.get('Licenza Media', 0)
+    diploma = levels.get('Diploma', 0)
+    laurea = levels.get('Laurea', 0)
     total = len(df) - null_count
 
     general_education = pd.DataFrame({
@@ -23,27 +38,27 @@ def analyze_general_education(df, pop_general_education, output_csv_path):
     comparison = pd.merge(general_education, pop_general_education, on='massimo_titolo_studio', how='outer')
     comparison['representation_index'] = comparison['mp_percentage'] / comparison['pop_percentage']
 
-    os.makedirs('results', exist_ok=True)
+    if legislature is not None:
+        comparison.insert(0, 'legislature', legislature)
+
     comparison.to_csv(output_csv_path, index=False)
     print(f"Distribution data saved to " + output_csv_path)
+    return comparison
 
+@instrument.stage
 def analyze_university_education(df, general_education, laureati_pop2022, output_csv_path):
-    df['titolo_studio'] = df['titolo_studio'].replace('na', pd.NA).fillna('not specified').str.lower()
-    null_count = df[df.titolo_studio=='not specified']['titolo_studio'].count()
-    if null_count > 0:
-        print(f"Note: {null_count} MPs have missing education data and will be excluded from the analysis")
+    df = education_columns(df)
 
-    excluded_values = ['not specified', 'diploma', 'licenza elementare', 'licenza media']
-    df_laureati = df[~df['titolo_studio'].str.contains('|'.join(excluded_values), case=False, na=False)]
+    df_laureati = df[df[education.LEVEL_COLUMN] == 'Laurea']
 
-    mp_counts = df_laureati['gruppo_laurea'].value_counts()
+    mp_counts = df_laureati[education.GROUP_COLUMN].value_counts()
+    mp_counts = mp_counts[mp_counts > 0]
     total_laureati = len(df_laureati)
-    total_mp = len(df) - null_count
 
     laurea_mp_percentage = general_education[general_education['massimo_titolo_studio'] == 'Laurea']['mp_percentage'].iloc[0]
     
     mp_education = pd.DataFrame({
-        'gruppo_laurea': mp_counts.index,
+        'gruppo_laurea': mp_counts.index.astype(str),
         'mp_count': mp_counts.values,
         'mp_percentage': mp_counts.values / total_laureati,
         'mp_percentage_total': (mp_counts.values / total_laureati) * laurea_mp_percentage
@@ -62,20 +77,28 @@ def analyze_university_education(df, general_education, laureati_pop2022, output
 
     comparison = comparison.sort_values('mp_count', ascending=False)
 
-    os.makedirs('results', exist_ok=True)
     comparison.to_csv(output_csv_path, index=False)
     print(f"University education distribution data saved to {output_csv_path}")
+    return comparison
 
 def main():
-    df = pd.read_csv('data/leg19_clean_updated.csv')
+    parser = argparse.ArgumentParser(description='Analyze the education of MPs against the population.')
+    store.add_directory_arguments(parser)
+    args = parser.parse_args()
+
+    # A table written before the education columns existed is classified here
+    df = education_columns(store.read_table('leg19_clean_with_regions', data_dir=args.data_dir))
 
-    pop_general_education = pd.read_csv('data/pop_general_education.csv')
-    laureati_pop2022 = pd.read_csv('data/laureati_pop2022.csv')
+    pop_general_education = pd.read_csv(os.path.join(args.data_dir, 'pop_general_education.csv'))
+    laureati_pop2022 = pd.read_csv(os.path.join(args.data_dir, 'laureati_pop2022.csv'))
 
-    analyze_general_education(df, pop_general_education,'results/general_education_analysis.csv')
+    os.makedirs(args.results_dir, exist_ok=True)
+    general_education_path = os.path.join(args.results_dir, 'general_education_analysis.csv')
+    analyze_general_education(df, pop_general_education, general_education_path)
 
-    general_education = pd.read_csv('results/general_education_analysis.csv')
-    analyze_university_education(df, general_education, laureati_pop2022, 'results/university_education_analysis.csv')
+    general_education = pd.read_csv(general_education_path)
+    analyze_university_education(df, general_education, laureati_pop2022,
+                                 os.path.join(args.results_dir, 'university_education_analysis.csv'))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,90 @@
+import difflib
+import functools
+import os
+import re
+import unicodedata
+
+import pandas as pd
+
+from . import store
+from .vectorize import per_unique
+
+# Place gazetteer for birthplace strings. data/gazetteer_province.csv has one
+# row per spelling of an ISTAT province (current and historical ones, with
+# their ISTAT province and region codes); country names from the ISTAT
+# births-abroad table are added as 'Estero'. Names are indexed by a
+# normalized key, so case, accents, apostrophes and hyphens don't need a
+# row of their own.
+
+GAZETTEER_FILE = 'gazetteer_province.csv'
+COUNTRIES_FILE = 'pop_birth_foreign_countries_1gen2024.csv'
+
+FOREIGN_REGION = 'Estero'
+FUZZY_CUTOFF = 0.85
+
+GAZETTEER_COLUMNS = ['codice_provincia', 'provincia', 'sigla', 'codice_regione', 'regione', 'storica']
+
+# An apostrophe used in place of an accent, as in "Forli'"
+_ACCENT_APOSTROPHE = re.compile(r"(?<=[aeiou])'(?![a-z])")
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+def _normalize(name):
+    name = unicodedata.normalize('NFKD', name.lower().replace('’', "'"))
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    name = _ACCENT_APOSTROPHE.sub('', name)
+    return _NON_ALNUM.sub(' ', name).strip()
+
+@per_unique
+def normalize(names):
+    """Case- and accent-folded keys for a Series of names, with punctuation as spaces."""
+    return names.map(_normalize)
+
+@functools.lru_cache(maxsize=None)
+def load_index(data_dir=store.DATA_DIR):
+    """The gazetteer indexed by normalized name, built once per data directory."""
+    provinces = pd.read_csv(os.path.join(data_dir, GAZETTEER_FILE), dtype=str, keep_default_na=False)
+    provinces['storica'] = provinces['storica'] == '1'
+
+    countries = pd.read_csv(os.path.join(data_dir, COUNTRIES_FILE), usecols=['Paese di nascita'], dtype=str)
+    countries = countries.rename(columns={'Paese di nascita': 'nome'})
+    countries = countries[countries['nome'] != 'Totale'].assign(regione=FOREIGN_REGION, storica=False)
+
+    index = pd.concat([provinces, countries], ignore_index=True)
+    index['chiave'] = normalize(index['nome'])
+    index = index.drop_duplicates('chiave').set_index('chiave')
+    return index[GAZETTEER_COLUMNS].replace('', None)
+
+def fuzzy_keys(keys, index_keys, cutoff=FUZZY_CUTOFF):
+    """Closest gazetteer key for each unmatched key, or None below the cutoff."""
+    matches = {}
+    for key in keys:
+        close = difflib.get_close_matches(key, index_keys, n=1, cutoff=cutoff)
+        matches[key] = close[0] if close else None
+    return matches
+
+@per_unique
+def _lookup(names, fuzzy, data_dir):
+    index = load_index(data_dir)
+    keys = normalize(names)
+
+    unmatched = keys[~keys.isin(index.index)]
+    if fuzzy and len(unmatched):
+        matches = fuzzy_keys(unmatched.unique(), index.index.tolist())
+        keys = keys.where(keys.isin(index.index), unmatched.map(matches))
+
+    return index.reindex(keys).reset_index(drop=True)
+
+def lookup(names, fuzzy=True, data_dir=store.DATA_DIR):
+    """Gazetteer columns for a Series of place names, aligned with its index.
+
+    Every distinct name is normalized once and joined against the index;
+    only names with no exact key fall back to fuzzy matching. Names that
+    match nothing get empty columns rather than a guess.
+    """
+    rows = _lookup(names, fuzzy, data_dir)
+    rows['storica'] = rows['storica'].astype('boolean')
+    return rows
+
+def region_of(names, fuzzy=True, data_dir=store.DATA_DIR):
+    """Region name for each place name, or None when the gazetteer has no match."""
+    return lookup(names, fuzzy, data_dir)['regione']
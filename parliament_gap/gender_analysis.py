@@ -1,8 +1,13 @@
-import pandas as pd
+import argparse
 import os
 
-df = pd.read_csv('data/leg19_clean_updated.csv')
+import pandas as pd
+
+from . import instrument
+from . import store
+from .population import PopulationTable
 
+@instrument.stage
 def analyze_gender(dataframe, output_csv_path):
     """Calculates gender counts and percentages and saves to CSV."""
     gender_counts = dataframe['genere'].value_counts().reset_index()
@@ -19,8 +24,10 @@ def analyze_gender(dataframe, output_csv_path):
 
     gender_summary.to_csv(output_csv_path, index=False)
     print(f"Gender analysis saved to {output_csv_path}")
+    return gender_summary
 
-def analyze_gender_comparison(mp_df, pop_df, output_csv_path):
+@instrument.stage
+def analyze_gender_comparison(mp_df, pop_df, output_csv_path, legislature=None):
     """Compares gender distribution between MPs and general population."""
     # Process MP data
     mp_gender = mp_df['genere'].value_counts().reset_index()
@@ -29,8 +36,9 @@ def analyze_gender_comparison(mp_df, pop_df, output_csv_path):
     mp_gender['mp_percentage'] = mp_gender['mp_count'] / total_mps
     
     # Process population data
-    total_males = pop_df['Totale maschi'].sum()
-    total_females = pop_df['Totale femmine'].sum()
+    population = PopulationTable.of(pop_df)
+    total_males = population.total('M')
+    total_females = population.total('F')
     total_population = total_males + total_females
     
     pop_gender = pd.DataFrame({
@@ -45,19 +53,27 @@ def analyze_gender_comparison(mp_df, pop_df, output_csv_path):
     # Calculate representation index
     comparison['representation_index'] = comparison['mp_percentage'] / comparison['pop_percentage']
     
+    if legislature is not None:
+        comparison.insert(0, 'legislature', legislature)
+
     # Save results
     comparison.to_csv(output_csv_path, index=False)
     print(f"Gender comparison analysis saved to {output_csv_path}")
+    return comparison
 
 
 def main():
-    mp_df = pd.read_csv('data/leg19_clean_updated.csv')
-    pop_df = pd.read_csv('data/pop_residente_1gen2025.csv')
+    parser = argparse.ArgumentParser(description='Analyze the gender of MPs against the population.')
+    store.add_directory_arguments(parser)
+    args = parser.parse_args()
+
+    mp_df = store.read_table('leg19_clean_updated', columns=['genere'], data_dir=args.data_dir)
+    pop_df = pd.read_csv(os.path.join(args.data_dir, 'pop_residente_1gen2025.csv'))
 
-    os.makedirs('results', exist_ok=True)
+    os.makedirs(args.results_dir, exist_ok=True)
 
-    analyze_gender(df, 'results/gender_analysis_summary.csv')
-    analyze_gender_comparison(mp_df, pop_df, 'results/gender_comparison_analysis.csv')
+    analyze_gender(mp_df, os.path.join(args.results_dir, 'gender_analysis_summary.csv'))
+    analyze_gender_comparison(mp_df, pop_df, os.path.join(args.results_dir, 'gender_comparison_analysis.csv'))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,127 @@
+import cProfile
+import datetime
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Opt-in stage metrics. Functions decorated with @stage run untouched unless
+# PIPELINE_METRICS names a JSON-lines file; then every call appends one record
+# with its wall and CPU time, the process's peak RSS, rows in and out, and any
+# counters (cache hits, ...) reported through count() while it ran. Setting
+# PIPELINE_PROFILE_DIR as well dumps a cProfile file for each outermost call.
+
+METRICS_ENV = 'PIPELINE_METRICS'
+PROFILE_ENV = 'PIPELINE_PROFILE_DIR'
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_profile_counter = iter(range(1, 1 << 62))
+
+def enabled():
+    return bool(os.environ.get(METRICS_ENV))
+
+def _active_stages():
+    if not hasattr(_local, 'stages'):
+        _local.stages = []
+    return _local.stages
+
+def count(counter, n=1):
+    """Adds n to a counter of the stage currently running in this thread, if any."""
+    stages = _active_stages()
+    if stages:
+        counters = stages[-1]
+        counters[counter] = counters.get(counter, 0) + n
+
+def row_count(value):
+    """Number of rows in a DataFrame, Series or the first of a tuple of them; None otherwise."""
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    if hasattr(value, 'shape') and getattr(value, 'ndim', 0) >= 1:
+        return value.shape[0]
+    return None
+
+def peak_rss_mb():
+    """The process's peak RSS in MB, or None where the resource module is unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == 'darwin' else 2**10), 1)
+
+def write_record(record, path=None):
+    path = path or os.environ[METRICS_ENV]
+    line = json.dumps(record, default=str)
+    with _write_lock, open(path, 'a') as f:
+        f.write(line + '\n')
+
+def stage(func=None, *, name=None):
+    """Decorator recording a metrics line for each call when PIPELINE_METRICS is set.
+
+    Use as @stage or @stage(name='...'); the default name is module.function.
+    CPU time is the whole process's, so stages running in parallel threads
+    each see the others' work as well.
+    """
+    if func is None:
+        return functools.partial(stage, name=name)
+    # Stages are named after their module without the package, e.g. data_clean.clean_camera
+    module = func.__module__.rpartition('.')[2]
+    if module == '__main__':
+        # A module run directly: name its stages after the file, as when it is imported
+        module = os.path.splitext(os.path.basename(getattr(sys.modules['__main__'], '__file__', module)))[0]
+    stage_name = name or f'{module}.{func.__qualname__}'
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not enabled():
+            return func(*args, **kwargs)
+
+        stages = _active_stages()
+        profile_dir = os.environ.get(PROFILE_ENV)
+        # Only one profiler can be active per thread, so nested stages show up inside the outer dump
+        profiler = cProfile.Profile() if profile_dir and not stages else None
+
+        counters = {}
+        stages.append(counters)
+        error = None
+        result = None
+        started = datetime.datetime.now().isoformat(timespec='milliseconds')
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            if profiler is not None:
+                result = profiler.runcall(func, *args, **kwargs)
+            else:
+                result = func(*args, **kwargs)
+            return result
+        except BaseException as e:
+            error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+            stages.pop()
+
+            record = {
+                'stage': stage_name,
+                'started': started,
+                'wall_s': round(wall, 6),
+                'cpu_s': round(cpu, 6),
+                'peak_rss_mb': peak_rss_mb(),
+                'rows_in': next((rows for rows in map(row_count, args) if rows is not None), None),
+                'rows_out': row_count(result),
+                'counters': counters,
+                'pid': os.getpid(),
+                'thread': threading.current_thread().name,
+            }
+            if error is not None:
+                record['error'] = error
+            if profiler is not None:
+                os.makedirs(profile_dir, exist_ok=True)
+                profile_path = os.path.join(profile_dir, f'{stage_name}-{os.getpid()}-{next(_profile_counter)}.prof')
+                profiler.dump_stats(profile_path)
+                record['profile'] = profile_path
+            write_record(record)
+    return wrapper
@@ -0,0 +1,13 @@
+# Legislature lists as given on the command line. Kept free of pandas and the
+# pipeline modules so that any script or the CLI can parse them cheaply.
+
+def parse_legislatures(spec):
+    """Parses '1-19' or '17,18,19' style legislature lists."""
+    legislatures = []
+    for part in spec.split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            legislatures.extend(range(int(first), int(last) + 1))
+        else:
+            legislatures.append(int(part))
+    return legislatures
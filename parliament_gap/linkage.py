@@ -0,0 +1,240 @@
+import argparse
+import difflib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import data_clean
+from . import gazetteer
+from . import instrument
+from . import store
+from .legislatures import parse_legislatures
+from .vectorize import per_unique
+
+# Record linkage of people across the Camera and Senato exports, legislatures
+# and the Wikipedia results. Records are only compared within blocks that
+# share a blocking key, so the work grows with the block sizes rather than
+# with the square of the number of records, and each candidate pair is scored
+# with per-field weights computed column-wise over all pairs at once. Linked
+# records get a common person_id, kept in the crosswalk table from one run
+# to the next.
+
+CROSSWALK_TABLE = 'crosswalk'
+WIKIPEDIA_RESULTS = 'wikipedia_education.csv'
+
+RECORD_COLUMNS = ['source', 'source_id', 'nome', 'cognome', 'data_nascita', 'citta_nascita']
+
+# Candidate pairs share all the fields of at least one key, so a typo in one
+# field is still caught by a block on the others
+BLOCKING_KEYS = [
+    ('cognome_key',),
+    ('nome_key', 'data_nascita'),
+    ('data_nascita', 'citta_key'),
+    ('nome_key', 'citta_key'),
+]
+
+# (agreement, disagreement) weight of each field; a field missing on either
+# side weighs nothing. Names agree partially, in proportion to their similarity.
+FIELD_WEIGHTS = {
+    'cognome_key': (4.0, -4.0),
+    'nome_key': (3.0, -3.0),
+    'data_nascita': (6.0, -6.0),
+    'citta_key': (2.0, -1.0),
+}
+NAME_FIELDS = ['cognome_key', 'nome_key']
+
+# Share of the attainable weight a pair needs to be linked
+MATCH_THRESHOLD = 0.85
+
+def mp_records(df):
+    """Linkage records for a leg<N>_clean table, one per chamber id."""
+    records = df.assign(source=data_clean.chamber_of(df['id']), source_id=df['id'])
+    return records[RECORD_COLUMNS].drop_duplicates(['source', 'source_id'])
+
+def wikipedia_records(df):
+    """Linkage records for the Wikipedia results, which only carry a name."""
+    records = df[['nome', 'cognome']].drop_duplicates().assign(source='wikipedia')
+    records['source_id'] = records['nome'] + ' ' + records['cognome']
+    return records[['source', 'source_id', 'nome', 'cognome']]
+
+def prepare(records):
+    """Adds the normalized keys the blocking and scoring work on."""
+    records = records.reset_index(drop=True)
+    records['data_nascita'] = pd.to_datetime(records['data_nascita'], errors='coerce')
+    records['cognome_key'] = gazetteer.normalize(records['cognome'])
+    records['nome_key'] = gazetteer.normalize(records['nome'])
+    records['citta_key'] = gazetteer.normalize(records['citta_nascita'])
+    return records
+
+def candidate_pairs(records, blocking_keys=BLOCKING_KEYS):
+    """Positions (left < right) of the records from different sources that share a blocking key."""
+    sources = records['source'].to_numpy()
+    frames = []
+    for keys in blocking_keys:
+        keys = list(keys)
+        blocks = records[keys].dropna()
+        block = pd.DataFrame({
+            'block': blocks.groupby(keys, sort=False).ngroup().to_numpy(),
+            'position': blocks.index.to_numpy(),
+        })
+        pairs = block.merge(block, on='block', suffixes=('_left', '_right'))
+        frames.append(pairs.loc[pairs['position_left'] < pairs['position_right'], ['position_left', 'position_right']])
+
+    pairs = pd.concat(frames).drop_duplicates()
+    pairs.columns = ['left', 'right']
+    pairs = pairs[sources[pairs['left']] != sources[pairs['right']]]
+    return pairs.reset_index(drop=True)
+
+def _name_similarity(a, b):
+    # "Maria Elisabetta" and "Maria" are likely the same name, just shortened
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    if tokens_a <= tokens_b or tokens_b <= tokens_a:
+        return 1.0 if tokens_a == tokens_b else 0.9
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+@per_unique
+def _pair_similarity(pairs):
+    return pairs.map(lambda pair: _name_similarity(*pair.split('\x1f')))
+
+def name_similarity(left, right):
+    """Similarity in [0, 1] of aligned arrays of name keys, NaN where either is missing.
+
+    Each distinct pair of names is compared once.
+    """
+    left, right = pd.Series(left, dtype=object), pd.Series(right, dtype=object)
+    missing = (left.isna() | right.isna()).to_numpy()
+    pairs = pd.Series(np.where(missing, None, left.fillna('') + '\x1f' + right.fillna('')), dtype=object)
+    # Missing pairs come back as None, which is NaN as a float
+    return _pair_similarity(pairs).to_numpy(dtype=float)
+
+def exact_agreement(left, right):
+    """1.0 where aligned arrays are equal, 0.0 where they differ, NaN where either is missing."""
+    left, right = pd.Series(left), pd.Series(right)
+    return np.where(left.isna() | right.isna(), np.nan, (left.to_numpy() == right.to_numpy()).astype(float))
+
+@instrument.stage
+def score_pairs(records, pairs):
+    """Adds to each candidate pair its score: the weight it gets as a share of the weight it could get."""
+    weight = np.zeros(len(pairs))
+    attainable = np.zeros(len(pairs))
+    for field, (agree, disagree) in FIELD_WEIGHTS.items():
+        left = records[field].to_numpy()[pairs['left']]
+        right = records[field].to_numpy()[pairs['right']]
+        agreement = name_similarity(left, right) if field in NAME_FIELDS else exact_agreement(left, right)
+        compared = ~np.isnan(agreement)
+        weight += np.where(compared, disagree + (agree - disagree) * np.nan_to_num(agreement), 0)
+        attainable += np.where(compared, agree, 0)
+    return pairs.assign(score=weight / attainable)
+
+def unambiguous(links, records):
+    """Drops the links of a record whose best candidates in some source are tied, e.g. two homonyms."""
+    sources = records['source'].to_numpy()
+    ends = pd.concat([
+        pd.DataFrame({'record': links['left'], 'other': sources[links['right']], 'score': links['score'], 'link': links.index}),
+        pd.DataFrame({'record': links['right'], 'other': sources[links['left']], 'score': links['score'], 'link': links.index}),
+    ])
+    best = ends[ends['score'] == ends.groupby(['record', 'other'])['score'].transform('max')]
+    tied = best[best.duplicated(['record', 'other'], keep=False)]
+    return links.drop(tied['link'].unique())
+
+def cluster(records, links):
+    """Component of each record, merging links from the best down.
+
+    Two components are only merged if they have no source in common, since
+    a person has a single id in each source.
+    """
+    parent = list(range(len(records)))
+    sources = {i: {source} for i, source in enumerate(records['source'])}
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for left, right in links.sort_values('score', ascending=False, kind='stable')[['left', 'right']].itertuples(index=False):
+        left, right = find(left), find(right)
+        if left != right and not sources[left] & sources[right]:
+            parent[right] = left
+            sources[left] |= sources.pop(right)
+    return np.array([find(i) for i in range(len(records))])
+
+@instrument.stage
+def link(records, threshold=MATCH_THRESHOLD):
+    """Component of each record after blocking, scoring and clustering; records need prepare()'s keys."""
+    pairs = candidate_pairs(records)
+    instrument.count('candidate_pairs', len(pairs))
+    scored = score_pairs(records, pairs)
+    links = unambiguous(scored[scored['score'] >= threshold], records)
+    instrument.count('links', len(links))
+    return cluster(records, links)
+
+def assign_person_ids(records, components, crosswalk=None):
+    """person_id of each record, keeping the ids of records already in the crosswalk.
+
+    A component takes the smallest id known for any of its records; new
+    components get new ids.
+    """
+    known = pd.Series(np.nan, index=records.index)
+    if crosswalk is not None and not crosswalk.empty:
+        ids = crosswalk.set_index(['source', 'source_id'])['person_id']
+        known = pd.Series(pd.MultiIndex.from_frame(records[['source', 'source_id']]).map(ids), index=records.index, dtype=float)
+
+    person_ids = known.groupby(components).transform('min')
+    new = person_ids.isna()
+    first_new_id = int(np.nanmax([known.max(), 0])) + 1
+    person_ids[new] = first_new_id + pd.factorize(components[new.to_numpy()])[0]
+    return person_ids.astype('int64')
+
+def update_crosswalk(records, crosswalk=None, threshold=MATCH_THRESHOLD):
+    """Links new records together with those already in the crosswalk and returns the new crosswalk."""
+    if crosswalk is not None and not crosswalk.empty:
+        # Newer records replace older versions of themselves
+        records = pd.concat([records, crosswalk[RECORD_COLUMNS]]).drop_duplicates(['source', 'source_id'])
+    records = prepare(records)
+    components = link(records, threshold)
+    records['person_id'] = assign_person_ids(records, components, crosswalk)
+    return records[['person_id', *RECORD_COLUMNS]].sort_values(['person_id', 'source', 'source_id'], ignore_index=True)
+
+def person_ids(crosswalk, source, source_ids):
+    """person_id of each id of a source, NaN for ids not in the crosswalk."""
+    ids = crosswalk[crosswalk['source'] == source].set_index('source_id')['person_id']
+    return pd.Series(source_ids).map(ids)
+
+def main():
+    parser = argparse.ArgumentParser(description='Link the same people across chambers, legislatures and Wikipedia results.')
+    parser.add_argument('--legislatures', default='19', help="legislatures to link, e.g. '19' or '17-19'")
+    parser.add_argument('--wikipedia', help='Wikipedia results to link, if present (default: <results-dir>/wikipedia_education.csv)')
+    parser.add_argument('--threshold', type=float, default=MATCH_THRESHOLD)
+    parser.add_argument('--rebuild', action='store_true', help='ignore the existing crosswalk and number people afresh')
+    parser.add_argument('--csv', action='store_true', help='also export crosswalk.csv')
+    store.add_directory_arguments(parser)
+    args = parser.parse_args()
+    wikipedia = args.wikipedia or os.path.join(args.results_dir, WIKIPEDIA_RESULTS)
+
+    frames = [mp_records(store.read_table(f'leg{legislature}_clean', data_dir=args.data_dir))
+              for legislature in parse_legislatures(args.legislatures)]
+    if os.path.exists(wikipedia):
+        frames.append(wikipedia_records(pd.read_csv(wikipedia, dtype=str)))
+    records = pd.concat(frames, ignore_index=True).reindex(columns=RECORD_COLUMNS)
+
+    crosswalk = None
+    if not args.rebuild and store.table_exists(CROSSWALK_TABLE, args.data_dir):
+        crosswalk = store.read_table(CROSSWALK_TABLE, data_dir=args.data_dir)
+
+    start = time.perf_counter()
+    crosswalk = update_crosswalk(records, crosswalk, args.threshold)
+    elapsed = time.perf_counter() - start
+
+    sources = crosswalk.groupby('person_id')['source'].nunique()
+    print(f"Linked {len(crosswalk):,} records into {len(sources):,} people in {elapsed:.2f}s")
+    print(f"{(sources > 1).sum():,} people appear in more than one source")
+    print(crosswalk['source'].value_counts().to_string())
+
+    store.write_table(crosswalk, CROSSWALK_TABLE, args.data_dir, csv=args.csv)
+    print(f"\nCrosswalk saved to '{store.table_path(CROSSWALK_TABLE, args.data_dir)}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import os
+
+import pandas as pd
+
+from . import instrument
+from . import store
+
+MISSING_PROFESSION_VALUES = {None, '', 'Professione Non Rilevata'}
+
+def has_missing_profession(professions):
+    return all(pd.isna(prof) or prof in MISSING_PROFESSION_VALUES for prof in professions)
+
+@instrument.stage
+def analyze_missing_profession(df, output_csv_path):
+    """Lists the MPs whose profession is missing and saves their names to CSV."""
+    # Find MPs with missing profession (empty list, None, or "Professione Non Rilevata")
+    missing_profession = df[df['professione'].map(has_missing_profession)]
+
+    # Create a DataFrame with just the names of MPs with missing profession
+    missing_profession_names = missing_profession[['nome', 'cognome']]
+
+    # Sort by last name, then first name
+    missing_profession_names = missing_profession_names.sort_values(['cognome', 'nome'])
+
+    # Print the results
+    print(f"Number of MPs with missing profession: {len(missing_profession_names)}")
+    print("\nList of MPs with missing profession:")
+    print(missing_profession_names.to_string(index=False))
+
+    # Save to CSV
+    missing_profession_names.to_csv(output_csv_path, index=False)
+    print(f"\nResults saved to {output_csv_path}")
+    return missing_profession_names
+
+def main():
+    parser = argparse.ArgumentParser(description='List the MPs with no profession on record.')
+    store.add_directory_arguments(parser)
+    args = parser.parse_args()
+
+    # Read the data
+    df = store.read_table('leg19_clean', columns=['nome', 'cognome', 'professione'], data_dir=args.data_dir)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    analyze_missing_profession(df, os.path.join(args.results_dir, 'missing_profession_mp.csv'))
+
+if __name__ == "__main__":
+    main()
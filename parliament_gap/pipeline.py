@@ -0,0 +1,237 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+STATE_PATH = '.pipeline_state.json'
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def imported_modules(path):
+    """Names of the package modules a source file imports relatively, including imports inside functions."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.level == 1:
+            if node.module:
+                # from .store import read_table
+                names.add(node.module.split('.')[0])
+            else:
+                # from . import store
+                names.update(alias.name for alias in node.names)
+    return names
+
+def local_modules(script):
+    """The script and every module next to it that it imports, directly or through another one."""
+    directory = os.path.dirname(script)
+    found, pending = set(), [script]
+    while pending:
+        path = pending.pop()
+        if path in found or not os.path.exists(path):
+            continue
+        found.add(path)
+        pending.extend(os.path.join(directory, f'{name}.py') for name in imported_modules(path))
+    return sorted(found)
+
+class Stage:
+    """One pipeline module, run with python -m, with the files it reads and writes.
+
+    Its code is the module and the package modules it imports, found from the
+    import statements when the stage is fingerprinted, so that editing any
+    of them invalidates the stage just like editing the module itself.
+    """
+
+    def __init__(self, name, module, inputs, outputs, default=True):
+        self.name = name
+        self.module = module
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.default = default
+
+    @property
+    def script(self):
+        return os.path.join(PACKAGE_DIR, f'{self.module}.py')
+
+    @property
+    def code(self):
+        return local_modules(self.script)
+
+STAGES = [
+    Stage('clean', 'data_clean',
+          inputs=['data/Camera_Leg19.csv', 'data/Senato_Leg19.csv', 'data/education_overrides.csv'],
+          outputs=['data/leg19_clean.parquet']),
+    # leg19_clean_updated.csv is completed by hand from leg19_clean, so it is a source here
+    Stage('regions', 'add_region',
+          inputs=['data/leg19_clean_updated.csv', 'data/education_overrides.csv', 'data/gazetteer_province.csv',
+                  'data/pop_birth_foreign_countries_1gen2024.csv'],
+          outputs=['data/leg19_clean_with_regions.parquet']),
+    Stage('wikipedia', 'wikipedia_education',
+          inputs=['data/leg19_clean.parquet'],
+          outputs=['results/wikipedia_education.csv'],
+          default=False),  # hits the network, run it explicitly
+    # Links results/wikipedia_education.csv as well when it is there; not an input, so
+    # that running this stage doesn't pull in the network-bound wikipedia stage
+    Stage('linkage', 'linkage',
+          inputs=['data/leg19_clean.parquet'],
+          outputs=['data/crosswalk.parquet']),
+    Stage('age', 'age_analysis',
+          inputs=['data/leg19_clean_updated.csv', 'data/pop_residente_1gen2025.csv'],
+          outputs=['results/age_analysis_summary.csv', 'results/age_comparison_analysis.csv']),
+    Stage('gender', 'gender_analysis',
+          inputs=['data/leg19_clean_updated.csv', 'data/pop_residente_1gen2025.csv'],
+          outputs=['results/gender_analysis_summary.csv', 'results/gender_comparison_analysis.csv']),
+    Stage('education', 'education_analysis',
+          inputs=['data/leg19_clean_with_regions.parquet', 'data/pop_general_education.csv', 'data/laureati_pop2022.csv'],
+          outputs=['results/general_education_analysis.csv', 'results/university_education_analysis.csv']),
+    Stage('region', 'region_analysis',
+          inputs=['data/leg19_clean_with_regions.parquet', 'data/pop_residente_1gen2025_regioni.csv',
+                  'data/pop_birth_foreign_countries_1gen2024.csv'],
+          outputs=['results/region_comparison_analysis.csv', 'results/foreign_comparison_analysis.csv']),
+    Stage('cube', 'cube',
+          inputs=['data/leg19_clean_with_regions.parquet', 'data/pop_residente_1gen2025.csv',
+                  'data/pop_residente_1gen2025_regioni.csv', 'data/pop_birth_foreign_countries_1gen2024.csv',
+                  'data/pop_general_education.csv'],
+          outputs=['data/leg19_cube.npz']),
+    Stage('intervals', 'bootstrap',
+          inputs=['results/gender_comparison_analysis.csv', 'results/age_comparison_analysis.csv',
+                  'results/region_comparison_analysis.csv', 'results/general_education_analysis.csv'],
+          outputs=['results/representation_index_intervals.csv']),
+    Stage('population', 'pop_analysis',
+          inputs=['data/pop_residente_1gen2025.csv', 'data/pop_residente_1gen2025_regioni.csv',
+                  'data/pop_birth_foreign_countries_1gen2024.csv'],
+          outputs=['results/population_gender_analysis_summary.csv', 'results/population_age_analysis_summary.csv',
+                   'results/population_regions_analysis_summary.csv', 'results/population_birth_place_analysis_summary.csv']),
+    Stage('profession', 'profession_analysis',
+          inputs=['data/leg19_clean.parquet'],
+          outputs=['results/profession_analysis.csv', 'results/profession_category_analysis.csv']),
+    Stage('missing_profession', 'missing_profession',
+          inputs=['data/leg19_clean.parquet'],
+          outputs=['results/missing_profession_mp.csv']),
+    Stage('bundles', 'bundles',
+          inputs=['results/gender_comparison_analysis.csv', 'results/gender_analysis_summary.csv',
+                  'results/population_gender_analysis_summary.csv', 'results/age_comparison_analysis.csv',
+                  'results/age_analysis_summary.csv', 'results/population_age_analysis_summary.csv',
+                  'results/region_comparison_analysis.csv', 'results/foreign_comparison_analysis.csv',
+                  'results/region_analysis_summary.csv', 'results/population_regions_analysis_summary.csv',
+                  'results/population_birth_place_analysis_summary.csv', 'results/general_education_analysis.csv',
+                  'results/university_education_analysis.csv', 'results/profession_category_analysis.csv',
+                  'results/profession_analysis.csv', 'results/representation_index_intervals.csv'],
+          outputs=['public/data/manifest.json']),
+]
+
+def file_digest(path):
+    """SHA-256 of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def fingerprint(stage):
+    """Content hash over a stage's inputs and code; changes whenever either does."""
+    digest = hashlib.sha256()
+    for path in sorted(set(stage.inputs + stage.code)):
+        digest.update(path.encode())
+        digest.update(file_digest(path).encode() if os.path.exists(path) else b'missing')
+    return digest.hexdigest()
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(state, path=STATE_PATH):
+    with open(path, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+def select_stages(names=None, stages=STAGES):
+    """The requested stages (or all default ones) plus everything upstream of them."""
+    by_name = {stage.name: stage for stage in stages}
+    producers = {output: stage for stage in stages for output in stage.outputs}
+    wanted = [by_name[name] for name in names] if names else [stage for stage in stages if stage.default]
+
+    selected = {}
+    todo = list(wanted)
+    while todo:
+        stage = todo.pop()
+        if stage.name in selected:
+            continue
+        selected[stage.name] = stage
+        todo.extend(producers[path] for path in stage.inputs if path in producers)
+    return [stage for stage in stages if stage.name in selected]
+
+def run_pipeline(names=None, force=False, jobs=None, state_path=STATE_PATH, stages=STAGES):
+    """Runs the selected stages in dependency order, skipping those that are up to date.
+
+    Stages whose upstream stages are done run concurrently, each in its own
+    interpreter. Returns the names of the stages that were actually run.
+    """
+    stages = select_stages(names, stages)
+    producers = {output: stage.name for stage in stages for output in stage.outputs}
+    upstream = {stage.name: {producers[path] for path in stage.inputs if path in producers} for stage in stages}
+
+    state = load_state(state_path)
+    state_lock = threading.Lock()
+
+    def run_stage(stage):
+        # Inputs are hashed only once the upstream stages have written them
+        stage_fingerprint = fingerprint(stage)
+        outputs_exist = all(os.path.exists(path) for path in stage.outputs)
+        if not force and outputs_exist and state.get(stage.name) == stage_fingerprint:
+            print(f"[{stage.name}] up to date")
+            return False
+
+        print(f"[{stage.name}] running {stage.module}")
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m', f'{__package__}.{stage.module}'], check=True, stdout=subprocess.DEVNULL)
+        print(f"[{stage.name}] done in {time.perf_counter() - start:.2f}s")
+
+        with state_lock:
+            state[stage.name] = stage_fingerprint
+            save_state(state, state_path)
+        return True
+
+    pending = {stage.name: stage for stage in stages}
+    finished, ran = set(), []
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        running = {}
+        while pending or running:
+            for name in [name for name in pending if upstream[name] <= finished]:
+                running[executor.submit(run_stage, pending.pop(name))] = name
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                if future.result():
+                    ran.append(name)
+                finished.add(name)
+    return ran
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the pipeline, skipping stages whose inputs and code are unchanged.')
+    parser.add_argument('stages', nargs='*', help='stages to bring up to date (default: all default stages)')
+    parser.add_argument('--force', action='store_true', help='rerun stages even if they are up to date')
+    parser.add_argument('--jobs', type=int, default=None, help='maximum number of stages running at once')
+    parser.add_argument('--list', action='store_true', help='list the stages and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        for stage in STAGES:
+            print(f"{stage.name:20} {stage.module:25} {'' if stage.default else '(not run by default)'}")
+        return
+
+    start = time.perf_counter()
+    ran = run_pipeline(args.stages, force=args.force, jobs=args.jobs)
+    print(f"\nRan {len(ran)} stage(s) in {time.perf_counter() - start:.2f}s: {', '.join(ran) or 'nothing to do'}")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,19 @@
+import argparse
+import os
+
 import pandas as pd
 
-df = pd.read_csv('data/pop_residente_1gen2025.csv')
-df_regions = pd.read_csv('data/pop_residente_1gen2025_regioni.csv')
-df_birth_countries = pd.read_csv('data/pop_birth_foreign_countries_1gen2024.csv')
+from . import instrument
+from . import store
+from .population import PopulationTable
 
+@instrument.stage
 def analyze_gender(dataframe, output_csv_path):
     """Calculates gender counts and percentages and saves to CSV."""
     # Get total counts for males and females
-    total_males = dataframe['Totale maschi'].sum()
-    total_females = dataframe['Totale femmine'].sum()
+    population = PopulationTable.of(dataframe)
+    total_males = population.total('M')
+    total_females = population.total('F')
     total_population = total_males + total_females
 
     # Calculate percentages
@@ -27,23 +32,17 @@ def analyze_gender(dataframe, output_csv_path):
 
     gender_summary.to_csv(output_csv_path, index=False)
     print(f"Gender analysis saved to {output_csv_path}")
+    return gender_summary
 
+@instrument.stage
 def analyze_age(dataframe, output_csv_path):
     """Calculates counts and percentages of people under 35 and over 70 years old and saves to CSV."""
-    # Convert 'Età' to numeric, handling '100 e oltre' and 'Totale'
-    dataframe['Età'] = dataframe['Età'].replace('100 e oltre', 100)
-    # Remove the 'Totale' row before converting to numeric
-    dataframe = dataframe[dataframe['Età'] != 'Totale']
-    dataframe['Età'] = pd.to_numeric(dataframe['Età'])
-
-    # Define age groups
-    under_35 = dataframe[dataframe['Età'] < 35]
-    over_70 = dataframe[dataframe['Età'] > 70]
-
-    # Calculate counts
-    under_35_count = under_35['Totale'].sum()
-    over_70_count = over_70['Totale'].sum()
-    total_population = dataframe['Totale'].sum()
+    population = PopulationTable.of(dataframe)
+
+    # Under 35 and over 70 in whole years; the open-ended '100 e oltre' counts as over 70
+    under_35_count = population.count(0, 35)
+    over_70_count = population.count(71)
+    total_population = population.total()
 
     # Calculate percentages
     under_35_percentage = (under_35_count / total_population) * 100
@@ -61,7 +60,9 @@ def analyze_age(dataframe, output_csv_path):
 
     age_summary.to_csv(output_csv_path, index=False)
     print(f"Age analysis saved to {output_csv_path}")
+    return age_summary
 
+@instrument.stage
 def analyze_regions(dataframe, output_csv_path):
     """Calculates regional population counts and percentages and saves to CSV."""
     # Process regional data
@@ -86,7 +87,9 @@ def analyze_regions(dataframe, output_csv_path):
     # Save to CSV
     region_analysis.to_csv(output_csv_path, index=False)
     print(f"Region analysis saved to {output_csv_path}")
+    return region_analysis
 
+@instrument.stage
 def analyze_birth_place(dataframe, output_csv_path):
     """Calculates population counts by birth place (Italy vs. foreign) and saves to CSV."""
     # Get count for people born in Italy
@@ -110,9 +113,25 @@ def analyze_birth_place(dataframe, output_csv_path):
     # Save to CSV
     birth_place_summary.to_csv(output_csv_path, index=False)
     print(f"Birth place analysis saved to {output_csv_path}")
+    return birth_place_summary
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize the resident population.')
+    store.add_directory_arguments(parser)
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(args.data_dir, 'pop_residente_1gen2025.csv'))
+    df_regions = pd.read_csv(os.path.join(args.data_dir, 'pop_residente_1gen2025_regioni.csv'))
+    df_birth_countries = pd.read_csv(os.path.join(args.data_dir, 'pop_birth_foreign_countries_1gen2024.csv'))
+
+    os.makedirs(args.results_dir, exist_ok=True)
+
+    # Run the analyses
+    analyze_gender(df, os.path.join(args.results_dir, 'population_gender_analysis_summary.csv'))
+    analyze_age(df, os.path.join(args.results_dir, 'population_age_analysis_summary.csv'))
+    analyze_regions(df_regions, os.path.join(args.results_dir, 'population_regions_analysis_summary.csv'))
+    analyze_birth_place(df_birth_countries, os.path.join(args.results_dir, 'population_birth_place_analysis_summary.csv'))
+
+if __name__ == "__main__":
+    main()
 
-# Run the analyses
-analyze_gender(df, 'results/population_gender_analysis_summary.csv')
-analyze_age(df, 'results/population_age_analysis_summary.csv')
-analyze_regions(df_regions, 'results/population_regions_analysis_summary.csv')
-analyze_birth_place(df_birth_countries, 'results/population_birth_place_analysis_summary.csv')
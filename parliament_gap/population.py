@@ -0,0 +1,90 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Resident population by single year of age (ISTAT, pop_residente_*.csv),
+# normalized once into cumulative sums so that the population of any age
+# band, for either sex or both, is a difference of two array lookups.
+
+AGE_COLUMN = 'Età'
+SEX_COLUMNS = {
+    'M': 'Totale maschi',
+    'F': 'Totale femmine',
+    'total': 'Totale',
+}
+
+# The last age class is open-ended, e.g. '100 e oltre'
+_OPEN_AGE = re.compile(r'^(\d+) e oltre$')
+
+class PopulationTable:
+    """Validated single-year-of-age population with O(1) age-band counts by sex.
+
+    Ages run from 0 to top_age, where top_age stands for "top_age and over".
+    """
+
+    def __init__(self, df):
+        missing = [column for column in [AGE_COLUMN, *SEX_COLUMNS.values()] if column not in df.columns]
+        if missing:
+            raise ValueError(f"Population table is missing columns: {missing}")
+
+        df = df[df[AGE_COLUMN].astype(str).str.strip() != 'Totale']
+        labels = df[AGE_COLUMN].astype(str).str.strip()
+        open_ended = labels.str.extract(_OPEN_AGE)[0]
+        ages = pd.to_numeric(open_ended.fillna(labels), errors='coerce')
+        if ages.isna().any():
+            raise ValueError(f"Unrecognized ages in population table: {labels[ages.isna()].tolist()}")
+        if open_ended.notna().to_numpy()[:-1].any():
+            raise ValueError("Only the last age class of a population table can be open-ended")
+
+        ages = ages.astype(int).to_numpy()
+        if not np.array_equal(ages, np.arange(len(ages))):
+            raise ValueError("Population table must list every single year of age from 0, in order")
+
+        counts = {}
+        for sex, column in SEX_COLUMNS.items():
+            values = pd.to_numeric(df[column], errors='coerce')
+            if values.isna().any() or (values < 0).any():
+                raise ValueError(f"Population counts in '{column}' must be non-negative numbers")
+            counts[sex] = values.to_numpy(dtype=np.int64)
+        if not np.array_equal(counts['M'] + counts['F'], counts['total']):
+            raise ValueError("Male and female counts don't add up to the totals")
+
+        self.top_age = len(ages) - 1
+        # _cumulative[sex][a] is the number of people younger than a
+        self._cumulative = {sex: np.concatenate([[0], np.cumsum(values)]) for sex, values in counts.items()}
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(pd.read_csv(path, dtype={AGE_COLUMN: str}))
+
+    @classmethod
+    def of(cls, population):
+        """The argument itself if it already is a PopulationTable, else one built from the frame."""
+        return population if isinstance(population, cls) else cls(population)
+
+    def copy(self):
+        # Immutable, so it can be shared like the cached frames in Datasets
+        return self
+
+    def _positions(self, ages):
+        ages = np.asarray(ages, dtype=float)
+        return np.clip(np.where(np.isfinite(ages), ages, self.top_age + 1), 0, self.top_age + 1).astype(np.int64)
+
+    def count(self, lower=0, upper=None, sex='total'):
+        """People aged lower <= age < upper (upper=None: no upper bound)."""
+        cumulative = self._cumulative[sex]
+        upper = self.top_age + 1 if upper is None else upper
+        return int(cumulative[self._positions(upper)] - cumulative[self._positions(lower)])
+
+    def band_counts(self, edges, sex='total'):
+        """People in each band edges[i] <= age < edges[i + 1]; np.inf closes the last band."""
+        at_most = self._cumulative[sex][self._positions(edges)]
+        return np.diff(at_most)
+
+    def total(self, sex='total'):
+        return int(self._cumulative[sex][-1])
+
+    def share(self, lower=0, upper=None, sex='total'):
+        """Fraction of the population of that sex aged lower <= age < upper."""
+        return self.count(lower, upper, sex) / self.total(sex)
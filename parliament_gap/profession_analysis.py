@@ -0,0 +1,137 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+from . import store
+from .vectorize import first_match, per_unique, priority_pattern
+
+@instrument.stage
+def analyze_professions(df, output_csv_path):
+    """Counts how often each declared profession appears and saves to CSV."""
+    # Count total number of MPs
+    total_mps = len(df)
+    print(f"Total number of MPs: {total_mps}")
+
+    # Get all unique professions
+    all_professions = []
+    for prof_list in df['professione']:
+        all_professions.extend(prof_list)
+    unique_professions = set(all_professions)
+    print(f"\nNumber of unique professions: {len(unique_professions)}")
+
+    # Count frequency of each profession
+    profession_counts = pd.Series(all_professions).value_counts()
+    print("\nTop 10 most common professions:")
+    print(profession_counts.head(10))
+
+    # Save detailed profession analysis to CSV
+    profession_analysis = pd.DataFrame({
+        'profession': profession_counts.index,
+        'count': profession_counts.values,
+        'percentage': (profession_counts.values / total_mps * 100)
+    })
+    profession_analysis.to_csv(output_csv_path, index=False)
+
+    # Create a histogram of number of professions per MP
+    prof_count_per_mp = df['professione'].map(len)
+    print("\nDistribution of number of professions per MP:")
+    print(prof_count_per_mp.value_counts().sort_index())
+    return profession_analysis
+
+# Profession categories with their keywords, in priority order: a profession
+# goes to the first category with a keyword it contains.
+PROFESSION_CATEGORIES = {
+    'lawyer': ['avvocato', 'giurista', 'penalista', 'civilista', 'amministrativista', 'diritto'],
+    'professor': ['professor', 'docente', 'insegnante', 'ricercatore', 'accadem'],
+    'entrepreneur': ['imprendit', 'industriale'],
+    'manager': ['manager', 'dirigente', 'direttore', 'amministratore'],
+    'doctor': ['medico', 'chirurgo', 'odontoiatra', 'sanitario'],
+    'public_employee': ['funzionario', 'dipendente pubblic', 'dipendente di azienda pubblica', 'impiegato pubblic'],
+    'private_employee': ['dipendente di azienda privata', 'impiegato', 'dipendente'],
+    'consultant': ['consulente'],
+    'journalist': ['giornalista'],
+    'engineer': ['ingegner'],
+    'accountant': ['commercialista', 'ragioniere', 'revisore', 'contabil'],
+    'politician': ['sindac', 'consigliere', 'parlamentare', 'assessore', 'politico', 'amministratore locale'],
+    'banker': ['bancario', 'banc'],
+    'union_member': ['sindacalista'],
+    'economist': ['econom'],
+    'law_enforcement': ['polizia', 'forze dell\'ordine', 'sicurezza'],
+    'architect': ['architetto'],
+    'farmer': ['agricol', 'agrar'],
+    'artist': ['artist', 'musici', 'attore']
+}
+
+class ProfessionCategorizer:
+    """Maps profession strings to PROFESSION_CATEGORIES, remembering every string it has seen.
+
+    The keyword table is compiled into a single regex with one lookahead
+    branch per category. Branches are tried in order, so the first category
+    with a keyword anywhere in the text wins, as with a loop over the table.
+    """
+
+    def __init__(self, categories=PROFESSION_CATEGORIES):
+        self.categories = list(categories)
+        self.pattern = priority_pattern(categories)
+        self.memo = {}
+
+    def _categorize_new(self, professions):
+        return first_match(professions.str.lower(), self.pattern, self.categories).fillna('Other')
+
+    def _categorize_distinct(self, professions):
+        new = [profession for profession in professions if profession not in self.memo]
+        if new:
+            self.memo.update(zip(new, self._categorize_new(pd.Series(new, dtype=object))))
+        return professions.map(self.memo)
+
+    def categorize(self, professions):
+        """Category of each profession in a Series; "Unknown" for missing ones."""
+        return per_unique(self._categorize_distinct)(professions).fillna('Unknown')
+
+_categorizer = ProfessionCategorizer()
+
+def categorize_profession(profession_text):
+    if not isinstance(profession_text, str):
+        return "Unknown"
+    return _categorizer.categorize(pd.Series([profession_text]))[0]
+
+@instrument.stage
+def analyze_profession_categories(df, output_csv_path):
+    """Groups professions into standardized categories and saves their distribution to CSV."""
+    total_mps = len(df)
+
+    # Categorize all professions in one pass over the exploded column
+    lengths = df['professione'].map(len).to_numpy()
+    categories = _categorizer.categorize(pd.Series([prof for profs in df['professione'] for prof in profs], dtype=object))
+    df['profession_category'] = [list(cats) for cats in np.split(categories.to_numpy(), np.cumsum(lengths)[:-1])]
+
+    # Count frequency of each profession category
+    profession_category_counts = categories.value_counts()
+    print("\nDistribution of profession categories:")
+    print(profession_category_counts)
+
+    # Save profession category analysis to CSV
+    profession_category_analysis = pd.DataFrame({
+        'profession_category': profession_category_counts.index,
+        'count': profession_category_counts.values,
+        'percentage': (profession_category_counts.values / total_mps * 100)
+    })
+    profession_category_analysis.to_csv(output_csv_path, index=False)
+    return profession_category_analysis
+
+def main():
+    parser = argparse.ArgumentParser(description='Count and categorize the professions of MPs.')
+    store.add_directory_arguments(parser)
+    args = parser.parse_args()
+
+    df = store.read_table('leg19_clean', columns=['professione'], data_dir=args.data_dir)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    analyze_professions(df, os.path.join(args.results_dir, 'profession_analysis.csv'))
+    analyze_profession_categories(df, os.path.join(args.results_dir, 'profession_category_analysis.csv'))
+
+if __name__ == "__main__":
+    main()
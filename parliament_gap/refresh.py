@@ -0,0 +1,256 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import add_region
+from . import data_clean
+from . import education
+from . import instrument
+from . import pipeline
+from . import store
+
+# Incremental refresh of a legislature's cleaned tables. The Camera export
+# carries each deputy's last-modified time (aggiornamento); the highest one
+# seen is kept as a high-water mark, and the next refresh only cleans the
+# deputies modified since. The Senato export has no such timestamp, so each
+# senator's rows are digested instead and only senators whose digest changed
+# are cleaned. The cleaned rows are upserted by id into leg<N>_clean (and
+# leg<N>_clean_with_regions), and only the pipeline stages reading a column
+# that actually changed are run again.
+
+STATE_FILE = 'leg{legislature}_refresh.json'
+
+# The columns of the MP tables each pipeline stage depends on; stages not
+# listed here depend on all of them
+STAGE_COLUMNS = {
+    'age': ['data_nascita'],
+    'gender': ['genere'],
+    'education': ['titolo_studio', 'livello_istruzione', 'gruppo_laurea'],
+    'region': ['provincia_nascita', 'regione_nascita'],
+    'linkage': ['nome', 'cognome', 'data_nascita', 'citta_nascita'],
+    'profession': ['professione'],
+    'missing_profession': ['nome', 'cognome', 'professione'],
+}
+
+def state_path(legislature, data_dir=store.DATA_DIR):
+    return os.path.join(data_dir, STATE_FILE.format(legislature=legislature))
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(state, path):
+    with open(path, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+def modified_since(camera_df, mark):
+    """The rows of the deputies modified at or after the mark, and those with no timestamp.
+
+    Rows at the mark itself are taken again, since other deputies may have
+    been modified within the same second after the last refresh.
+    """
+    if mark is None:
+        return camera_df
+    modified = pd.to_datetime(camera_df['aggiornamento'], errors='coerce')
+    return camera_df[modified.isna() | (modified >= pd.Timestamp(mark))]
+
+def high_water_mark(camera_df, mark=None):
+    """The latest aggiornamento among the rows and the previous mark."""
+    modified = pd.to_datetime(camera_df['aggiornamento'], errors='coerce').max()
+    if mark is not None and (pd.isna(modified) or modified < pd.Timestamp(mark)):
+        return mark
+    return None if pd.isna(modified) else modified.strftime('%Y-%m-%d %H:%M:%S')
+
+def senato_digests(senato_df):
+    """A digest of each senator's rows, by id, independent of the row order."""
+    row_hashes = pd.util.hash_pandas_object(senato_df.astype(str), index=False).to_numpy()
+    ids = data_clean.extract_id(senato_df['senatore'])
+    return {
+        senator: hashlib.sha256(np.sort(row_hashes[positions]).tobytes()).hexdigest()[:16]
+        for senator, positions in ids.groupby(ids).indices.items()
+    }
+
+@instrument.stage
+def clean_changes(camera_rows, senato_rows, data_dir=store.DATA_DIR):
+    """The changed rows cleaned as data_clean.clean_legislature cleans the whole exports."""
+    camera_df = senato_df = None
+    if len(camera_rows):
+        camera_df = data_clean.clean_camera(data_clean.ingest_camera([camera_rows]))
+    if len(senato_rows):
+        senato_df = data_clean.clean_senato(senato_rows.copy())
+    return education.add_education_columns(data_clean.combine_chambers(camera_df, senato_df), data_dir)
+
+def as_stored(df):
+    """A frame with the column types it gets back from the store, so rows compare equal."""
+    return store.to_arrow(df).to_pandas(date_as_object=False)
+
+def _comparable(value):
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(value)
+    return None if pd.isna(value) else value
+
+def row_key(row):
+    return tuple(_comparable(value) for value in row)
+
+def changed_columns(old, new):
+    """Columns whose value differs between rows with the same id in old and new."""
+    both = old.merge(new, on='id', suffixes=('_old', '_new'))
+    changed = set()
+    for column in new.columns.drop('id'):
+        if column not in old.columns:
+            continue
+        before = both[f'{column}_old'].astype(object).map(_comparable)
+        after = both[f'{column}_new'].astype(object).map(_comparable)
+        if (before != after).any():
+            changed.add(column)
+    return changed
+
+def upsert(df, changes, removed=()):
+    """df with the rows of changes replacing those with the same id, and the removed ids dropped."""
+    kept = df[~df['id'].isin(set(changes['id']) | set(removed))]
+    return pd.concat([kept, changes], ignore_index=True).sort_values('id', kind='stable', ignore_index=True)
+
+def affected_stages(tables, columns, rows_changed, stages=pipeline.STAGES):
+    """Default pipeline stages reading one of the tables and depending on a changed column."""
+    paths = {os.path.normpath(path) for path in tables}
+    affected = []
+    for stage in stages:
+        if not stage.default or not paths & {os.path.normpath(path) for path in stage.inputs}:
+            continue
+        if rows_changed or stage.name not in STAGE_COLUMNS or columns & set(STAGE_COLUMNS[stage.name]):
+            affected.append(stage.name)
+    return affected
+
+@instrument.stage
+def refresh_legislature(legislature, data_dir=store.DATA_DIR, camera_rows=None, senato_rows=None,
+                        camera_complete=True, export_csv=False):
+    """Upserts the MPs changed since the last refresh into the cleaned tables.
+
+    camera_rows and senato_rows default to the exports in data_dir. The
+    Senato rows must always be the full export; camera_complete says whether
+    the Camera rows are too (rather than only those modified since the
+    mark), in which case deputies no longer in them are removed. Returns the
+    written table paths, the changed columns and whether MPs were added or
+    removed.
+    """
+    path = state_path(legislature, data_dir)
+    state = load_state(path)
+    mark = state.get('camera_modified')
+
+    if camera_rows is None:
+        camera_rows = pd.read_csv(data_clean.camera_export_path(legislature, data_dir), dtype=data_clean.CAMERA_DTYPES)
+    if senato_rows is None:
+        senato_rows = data_clean.read_senato(data_clean.senato_export_path(legislature, data_dir))
+
+    table = f'leg{legislature}_clean'
+    current = None
+    if store.table_exists(table, data_dir):
+        current = as_stored(store.read_table(table, data_dir=data_dir))
+    known = pd.Series(dtype=object) if current is None else current['id']
+    known_chambers = data_clean.chamber_of(known)
+
+    digests = senato_digests(senato_rows)
+    previous_digests = state.get('senato', {})
+    changed_senators = {senator for senator, digest in digests.items() if previous_digests.get(senator) != digest}
+    senato_changes = senato_rows[data_clean.extract_id(senato_rows['senatore']).isin(changed_senators).to_numpy()]
+    camera_changes = modified_since(camera_rows, mark)
+    instrument.count('changed_deputies', camera_changes['persona'].nunique())
+    instrument.count('changed_senators', len(changed_senators))
+
+    removed = set(known[known_chambers == 'senato']) - set(digests)
+    if camera_complete:
+        removed |= set(known[known_chambers == 'camera']) - set(data_clean.extract_id(camera_rows['persona']))
+
+    changes = pd.DataFrame(columns=['id']) if current is None else current.iloc[:0]
+    if len(camera_changes) or len(senato_changes):
+        changes = as_stored(clean_changes(camera_changes, senato_changes, data_dir))
+    if current is not None and len(changes):
+        # Rows read again without having changed are left alone
+        changes = changes[current.columns]
+        stored = {row_key(row) for row in current[current['id'].isin(changes['id'])].itertuples(index=False)}
+        changes = changes[[row_key(row) not in stored for row in changes.itertuples(index=False)]]
+
+    columns = set() if current is None else changed_columns(current, changes)
+    rows_changed = bool(removed) or not set(changes['id']) <= set(known)
+
+    written = []
+    if len(changes) or removed:
+        df = changes if current is None else upsert(current, changes, removed)
+        store.write_table(df, table, data_dir, csv=export_csv)
+        written.append(store.table_path(table, data_dir))
+        written += refresh_regions(legislature, data_dir, changes, removed, export_csv)
+        print(f"{len(changes)} MPs upserted and {len(removed)} removed in '{store.table_path(table, data_dir)}'")
+    else:
+        print(f"No changes to '{store.table_path(table, data_dir)}'")
+
+    state['camera_modified'] = high_water_mark(camera_rows, mark)
+    state['senato'] = digests
+    save_state(state, path)
+    return written, columns, rows_changed
+
+def refresh_regions(legislature, data_dir, changes, removed, export_csv=False):
+    """Upserts the changed MPs into leg<N>_clean_with_regions when it is built from leg<N>_clean."""
+    table = f'leg{legislature}_clean_with_regions'
+    source = add_region.source_table(legislature, data_dir)
+    if not store.table_exists(table, data_dir):
+        return []
+    if source != f'leg{legislature}_clean':
+        # The hand-completed table has to be brought up to date by hand first
+        print(f"Note: '{table}' is built from {source}; update it for the changed MPs, then run python -m parliament_gap.add_region")
+        return []
+
+    enriched = add_region.add_regions(changes.copy(), data_dir) if len(changes) else changes
+    df = upsert(as_stored(store.read_table(table, data_dir=data_dir)), as_stored(enriched), removed)
+    store.write_table(df, table, data_dir, csv=export_csv)
+    return [store.table_path(table, data_dir)]
+
+def pull_changes(legislature, since, workers=4, record_dir=None):
+    """Fetches the Camera rows modified since the mark and the full Senato export from the endpoints."""
+    from . import sparql
+
+    clients = sparql.make_clients(workers, record_dir=record_dir)
+    camera_pages = list(clients['camera'].pages(sparql.camera_query(legislature, since), sparql.DTYPES['camera']))
+    camera_rows = pd.concat(camera_pages, ignore_index=True) if camera_pages else pd.DataFrame(columns=['persona', 'aggiornamento'])
+    senato_rows = data_clean.read_senato(sparql.chamber_pages(clients, 'senato', legislature))
+    return camera_rows, senato_rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Upsert the MPs changed since the last refresh and rerun only the affected stages.')
+    parser.add_argument('--legislature', type=int, default=19)
+    parser.add_argument('--pull', action='store_true',
+                        help='fetch only the modified deputies from the endpoints instead of reading the exports')
+    parser.add_argument('--workers', type=int, default=4, help='pages fetched concurrently per chamber')
+    parser.add_argument('--no-stages', action='store_true', help="don't rerun the affected pipeline stages")
+    parser.add_argument('--csv', action='store_true', help='also export the updated tables as CSV')
+    store.add_directory_arguments(parser, results=False)
+    args = parser.parse_args()
+
+    camera_rows = senato_rows = None
+    if args.pull:
+        mark = load_state(state_path(args.legislature, args.data_dir)).get('camera_modified')
+        camera_rows, senato_rows = pull_changes(args.legislature, mark, args.workers)
+        print(f"Fetched {len(camera_rows):,} Camera rows modified since {mark or 'the start'}")
+
+    start = time.perf_counter()
+    written, columns, rows_changed = refresh_legislature(
+        args.legislature, args.data_dir, camera_rows=camera_rows, senato_rows=senato_rows,
+        camera_complete=not args.pull, export_csv=args.csv)
+    print(f"Refreshed in {time.perf_counter() - start:.2f}s; changed columns: {', '.join(sorted(columns)) or 'none'}")
+
+    stages = affected_stages(written, columns, rows_changed)
+    if stages and not args.no_stages and args.data_dir != store.DATA_DIR:
+        # The pipeline stages read and write the default directories only
+        print(f"Not rerunning the affected stages outside {store.DATA_DIR}: {', '.join(stages)}")
+    elif stages and not args.no_stages:
+        ran = pipeline.run_pipeline(stages)
+        print(f"Ran {len(ran)} affected stage(s): {', '.join(ran) or 'all up to date'}")
+
+if __name__ == "__main__":
+    main()
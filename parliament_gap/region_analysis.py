@@ -1,6 +1,12 @@
-import pandas as pd
+import argparse
 import os
 
+import pandas as pd
+
+from . import instrument
+from . import store
+
+@instrument.stage
 def analyze_regions(df, output_csv_path):    
     null_count = df['regione_nascita'].isna().sum()
     if null_count > 0:
@@ -16,8 +22,10 @@ def analyze_regions(df, output_csv_path):
     
     region_counts.to_csv(output_csv_path, index=False)
     print(f"Distribution data saved to {output_csv_path}")
+    return region_counts
 
-def analyze_region_comparison(mp_df, pop_df, pop_foreign_df, output_csv_path):
+@instrument.stage
+def analyze_region_comparison(mp_df, pop_df, pop_foreign_df, output_csv_path, legislature=None):
     """Compares regional distribution between MPs and general population."""
 
     mp_df['regione'] = mp_df['regione_nascita'].apply(clean_region_name)
@@ -41,8 +49,12 @@ def analyze_region_comparison(mp_df, pop_df, pop_foreign_df, output_csv_path):
     
     comparison = comparison.sort_values('representation_index', ascending=False)
     
+    if legislature is not None:
+        comparison.insert(0, 'legislature', legislature)
+
     comparison.to_csv(output_csv_path, index=False)
     print(f"Region comparison analysis saved to {output_csv_path}")
+    return comparison
 
 def clean_region_name(region_name):
     """Clean region names to match between datasets"""
@@ -53,6 +65,7 @@ def clean_region_name(region_name):
     }
     return region_map.get(region_name, region_name)
 
+@instrument.stage
 def analyze_foreign_comparison(mp_df, pop_foreign_df, output_csv_path):
     """Compares foreign distribution between MPs and general population."""
     foreign_total = pop_foreign_df[pop_foreign_df['Paese di nascita'] != 'Italia']['Totale'].sum()
@@ -74,19 +87,23 @@ def analyze_foreign_comparison(mp_df, pop_foreign_df, output_csv_path):
 
     comparison.to_csv(output_csv_path, index=False)
     print(f"Foreign comparison analysis saved to {output_csv_path}")    
+    return comparison
 
     
 
 def main():
-    mp_df = pd.read_csv('data/leg19_clean_with_regions.csv')
-    pop_df = pd.read_csv('data/pop_residente_1gen2025.csv')
-    pop_region_df = pd.read_csv('data/pop_residente_1gen2025_regioni.csv')
-    pop_foreign_df = pd.read_csv('data/pop_birth_foreign_countries_1gen2024.csv')
+    parser = argparse.ArgumentParser(description='Analyze the birth regions of MPs against the population.')
+    store.add_directory_arguments(parser)
+    args = parser.parse_args()
+
+    mp_df = store.read_table('leg19_clean_with_regions', columns=['regione_nascita'], data_dir=args.data_dir)
+    pop_region_df = pd.read_csv(os.path.join(args.data_dir, 'pop_residente_1gen2025_regioni.csv'))
+    pop_foreign_df = pd.read_csv(os.path.join(args.data_dir, 'pop_birth_foreign_countries_1gen2024.csv'))
     
-    os.makedirs('results', exist_ok=True)
+    os.makedirs(args.results_dir, exist_ok=True)
     
-    analyze_region_comparison(mp_df, pop_region_df, pop_foreign_df, 'results/region_comparison_analysis.csv')
-    analyze_foreign_comparison(mp_df, pop_foreign_df, 'results/foreign_comparison_analysis.csv')
+    analyze_region_comparison(mp_df, pop_region_df, pop_foreign_df, os.path.join(args.results_dir, 'region_comparison_analysis.csv'))
+    analyze_foreign_comparison(mp_df, pop_foreign_df, os.path.join(args.results_dir, 'foreign_comparison_analysis.csv'))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,86 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from . import age_analysis
+from . import education_analysis
+from . import gender_analysis
+from . import missing_profession
+from . import pop_analysis
+from . import profession_analysis
+from . import region_analysis
+from . import store
+from .datasets import Datasets
+
+# The standalone modules that together produce the report, for timing comparisons
+REPORT_MODULES = [
+    'age_analysis',
+    'gender_analysis',
+    'education_analysis',
+    'region_analysis',
+    'pop_analysis',
+    'profession_analysis',
+    'missing_profession',
+]
+
+def run_all(datasets=None, results_dir=store.RESULTS_DIR):
+    """Runs every report analysis in-process against one shared dataset context, writing into results_dir."""
+    if datasets is None:
+        datasets = Datasets()
+
+    os.makedirs(results_dir, exist_ok=True)
+
+    def output(filename):
+        return os.path.join(results_dir, filename)
+
+    age_analysis.analyze_age(datasets['mp_updated'], output('age_analysis_summary.csv'))
+    age_analysis.analyze_age_comparison(datasets['mp_updated'], datasets['population_table'], output('age_comparison_analysis.csv'))
+
+    gender_analysis.analyze_gender(datasets['mp_updated'], output('gender_analysis_summary.csv'))
+    gender_analysis.analyze_gender_comparison(datasets['mp_updated'], datasets['population_table'], output('gender_comparison_analysis.csv'))
+
+    general_education = education_analysis.analyze_general_education(
+        datasets['mp_regions'], datasets['population_education'], output('general_education_analysis.csv'))
+    education_analysis.analyze_university_education(
+        datasets['mp_regions'], general_education, datasets['population_graduates'], output('university_education_analysis.csv'))
+
+    mp_regions = datasets['mp_regions']
+    region_analysis.analyze_region_comparison(mp_regions, datasets['population_regions'], datasets['population_birth_countries'], output('region_comparison_analysis.csv'))
+    region_analysis.analyze_foreign_comparison(mp_regions, datasets['population_birth_countries'], output('foreign_comparison_analysis.csv'))
+
+    pop_analysis.analyze_gender(datasets['population_table'], output('population_gender_analysis_summary.csv'))
+    pop_analysis.analyze_age(datasets['population_table'], output('population_age_analysis_summary.csv'))
+    pop_analysis.analyze_regions(datasets['population_regions'], output('population_regions_analysis_summary.csv'))
+    pop_analysis.analyze_birth_place(datasets['population_birth_countries'], output('population_birth_place_analysis_summary.csv'))
+
+    profession_analysis.analyze_professions(datasets['mp_clean'], output('profession_analysis.csv'))
+    profession_analysis.analyze_profession_categories(datasets['mp_clean'], output('profession_category_analysis.csv'))
+    missing_profession.analyze_missing_profession(datasets['mp_clean'], output('missing_profession_mp.csv'))
+
+def time_separate_scripts(data_dir=store.DATA_DIR, results_dir=store.RESULTS_DIR):
+    """Wall time of running each report script in its own interpreter, as before."""
+    start = time.perf_counter()
+    for module in REPORT_MODULES:
+        subprocess.run([sys.executable, '-m', f'{__package__}.{module}', '--data-dir', data_dir, '--results-dir', results_dir],
+                       check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Run every report analysis with a shared dataset context.')
+    parser.add_argument('--compare', action='store_true', help='also time the standalone scripts run one by one')
+    store.add_directory_arguments(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    run_all(Datasets(args.data_dir), args.results_dir)
+    total = time.perf_counter() - start
+    print(f"\nrun_all finished in {total:.2f}s")
+
+    if args.compare:
+        separate = time_separate_scripts(args.data_dir, args.results_dir)
+        print(f"Standalone scripts took {separate:.2f}s ({separate / total:.1f}x run_all)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import data_clean
+from . import instrument
+from . import store
+
+# SPARQL queries behind the Camera and Senato exports in data/, parameterized
+# by legislature. The `notes` file has the original legislature 19 versions.
+# Both queries are fully ordered so that LIMIT/OFFSET pages are stable.
+
+ENDPOINTS = {
+    'camera': 'https://dati.camera.it/sparql',
+    'senato': 'https://dati.senato.it/sparql',
+}
+
+USER_AGENT = 'ItalianParliamentResearch/1.0 (https://github.com/francescacollu/italian_parliament_representativeness)'
+
+SENATO_QUERY = Template("""
+PREFIX osr: <http://dati.senato.it/osr/>
+PREFIX foaf: <http://xmlns.com/foaf/0.1/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+SELECT DISTINCT ?senatore ?nome ?cognome ?genere ?cittaNascita ?provinciaNascita ?nazioneNascita ?dataNascita 
+                ?cittaResidenza ?provinciaResidenza ?nazioneResidenza ?Professione ?inizioMandato 
+                ?legislatura ?tipoMandato
+WHERE {
+    ?senatore a osr:Senatore.
+    ?senatore foaf:firstName ?nome.
+    ?senatore foaf:lastName ?cognome.
+    ?senatore foaf:gender ?genere.
+    ?senatore osr:cittaNascita ?cittaNascita.
+    OPTIONAL { ?senatore osr:provinciaNascita ?provinciaNascita. }
+    ?senatore osr:nazioneNascita ?nazioneNascita.
+    ?senatore osr:dataNascita ?dataNascita.
+    OPTIONAL { ?senatore osr:cittaResidenza ?cittaResidenza. }
+    OPTIONAL { ?senatore osr:provinciaResidenza ?provinciaResidenza. }
+    OPTIONAL { ?senatore osr:nazioneResidenza ?nazioneResidenza. }
+
+    ?senatore osr:mandato ?mandato.
+    ?mandato osr:legislatura ?legislatura.
+    ?mandato osr:inizio ?inizioMandato.
+    ?mandato osr:tipoMandato ?tipoMandato.
+    OPTIONAL { ?mandato osr:fine ?df. }
+    FILTER(?legislatura = $legislature)
+    FILTER(!bound(?df))
+
+    OPTIONAL {
+        ?senatore osr:professione ?professione.
+        ?professione rdfs:label ?Professione.
+    }
+}
+ORDER BY ?cognome ?nome ?senatore ?Professione ?tipoMandato ?inizioMandato
+""")
+
+CAMERA_QUERY = Template("""
+PREFIX ocd: <http://dati.camera.it/ocd/>
+PREFIX foaf: <http://xmlns.com/foaf/0.1/>
+PREFIX dc: <http://purl.org/dc/terms/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+SELECT DISTINCT ?persona ?cognome ?nome ?dataNascita ?nato ?luogoNascita ?genere
+                ?collegio ?nomeGruppo ?sigla ?commissione ?aggiornamento ?descrizione
+WHERE {
+  ?persona ocd:rif_mandatoCamera ?mandato;
+           a foaf:Person.
+
+  ## deputato
+  ?d a ocd:deputato;
+     ocd:aderisce ?aderisce;
+     ocd:rif_leg <http://dati.camera.it/ocd/legislatura.rdf/repubblica_$legislature>;
+     ocd:rif_mandatoCamera ?mandato.
+
+  ## anagrafica
+  ?d foaf:surname ?cognome;
+     foaf:gender ?genere;
+     foaf:firstName ?nome.
+
+  OPTIONAL {
+    ?persona <http://purl.org/vocab/bio/0.1/Birth> ?nascita.
+    ?nascita <http://purl.org/vocab/bio/0.1/date> ?dataNascita;
+             rdfs:label ?nato;
+             ocd:rif_luogo ?luogoNascitaUri.
+    ?luogoNascitaUri dc:title ?luogoNascita.
+  }
+
+  ## aggiornamento del sistema
+  OPTIONAL { ?d <http://lod.xdams.org/ontologies/ods/modified> ?aggiornamento. }$modified_filter
+
+  ## mandato
+  ?mandato ocd:rif_elezione ?elezione.
+  MINUS { ?mandato ocd:endDate ?fineMandato. }
+
+  ## elezione
+  ?elezione dc:coverage ?collegio.
+
+  ## adesione a gruppo
+  OPTIONAL {
+    ?aderisce ocd:rif_gruppoParlamentare ?gruppo.
+    ?gruppo dc:alternative ?sigla;
+            dc:title ?nomeGruppo.
+  }
+  MINUS { ?aderisce ocd:endDate ?fineAdesione. }
+
+  ## organo
+  OPTIONAL {
+    ?d ocd:membro ?membro.
+    ?membro ocd:rif_organo ?organo.
+    ?organo dc:title ?commissione.
+  }
+  MINUS { ?membro ocd:endDate ?fineMembership. }
+
+  ## descrizione
+  OPTIONAL { ?d dc:description ?descrizione. }
+}
+ORDER BY ?persona ?collegio ?nomeGruppo ?sigla ?commissione ?aggiornamento ?descrizione
+""")
+
+# Variants of the queries above that keep ended mandates, with their start and
+# end dates, for the mandate timeline. They leave out groups and commissioni,
+# which would multiply the rows of every past mandate.
+SENATO_MANDATES_QUERY = Template("""
+PREFIX osr: <http://dati.senato.it/osr/>
+PREFIX foaf: <http://xmlns.com/foaf/0.1/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+SELECT DISTINCT ?senatore ?nome ?cognome ?genere ?cittaNascita ?provinciaNascita ?nazioneNascita ?dataNascita
+                ?Professione ?inizioMandato ?fineMandato ?legislatura ?tipoMandato
+WHERE {
+    ?senatore a osr:Senatore.
+    ?senatore foaf:firstName ?nome.
+    ?senatore foaf:lastName ?cognome.
+    ?senatore foaf:gender ?genere.
+    ?senatore osr:cittaNascita ?cittaNascita.
+    OPTIONAL { ?senatore osr:provinciaNascita ?provinciaNascita. }
+    ?senatore osr:nazioneNascita ?nazioneNascita.
+    ?senatore osr:dataNascita ?dataNascita.
+
+    ?senatore osr:mandato ?mandato.
+    ?mandato osr:legislatura ?legislatura.
+    ?mandato osr:inizio ?inizioMandato.
+    ?mandato osr:tipoMandato ?tipoMandato.
+    OPTIONAL { ?mandato osr:fine ?fineMandato. }
+    FILTER(?legislatura = $legislature)
+
+    OPTIONAL {
+        ?senatore osr:professione ?professione.
+        ?professione rdfs:label ?Professione.
+    }
+}
+ORDER BY ?cognome ?nome ?senatore ?Professione ?tipoMandato ?inizioMandato ?fineMandato
+""")
+
+CAMERA_MANDATES_QUERY = Template("""
+PREFIX ocd: <http://dati.camera.it/ocd/>
+PREFIX foaf: <http://xmlns.com/foaf/0.1/>
+PREFIX dc: <http://purl.org/dc/terms/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+SELECT DISTINCT ?persona ?cognome ?nome ?dataNascita ?nato ?luogoNascita ?genere
+                ?inizioMandato ?fineMandato ?descrizione
+WHERE {
+  ?persona ocd:rif_mandatoCamera ?mandato;
+           a foaf:Person.
+
+  ## deputato
+  ?d a ocd:deputato;
+     ocd:rif_leg <http://dati.camera.it/ocd/legislatura.rdf/repubblica_$legislature>;
+     ocd:rif_mandatoCamera ?mandato.
+
+  ## anagrafica
+  ?d foaf:surname ?cognome;
+     foaf:gender ?genere;
+     foaf:firstName ?nome.
+
+  OPTIONAL {
+    ?persona <http://purl.org/vocab/bio/0.1/Birth> ?nascita.
+    ?nascita <http://purl.org/vocab/bio/0.1/date> ?dataNascita;
+             rdfs:label ?nato;
+             ocd:rif_luogo ?luogoNascitaUri.
+    ?luogoNascitaUri dc:title ?luogoNascita.
+  }
+
+  ## mandato, anche se concluso
+  ?mandato ocd:startDate ?inizioMandato.
+  OPTIONAL { ?mandato ocd:endDate ?fineMandato. }
+
+  ## descrizione
+  OPTIONAL { ?d dc:description ?descrizione. }
+}
+ORDER BY ?persona ?inizioMandato ?fineMandato ?descrizione
+""")
+
+def senato_query(legislature):
+    return SENATO_QUERY.substitute(legislature=int(legislature))
+
+# Restricts the Camera query to deputies modified on or after a day; compared as
+# text on the date alone, so the format of the time part doesn't matter
+MODIFIED_FILTER = Template("""
+  FILTER(!BOUND(?aggiornamento) || STR(?aggiornamento) >= "$day")""")
+
+def camera_query(legislature, modified_since=None):
+    """The Camera query, only for the deputies modified since a timestamp if one is given."""
+    modified_filter = ''
+    if modified_since is not None:
+        modified_filter = MODIFIED_FILTER.substitute(day=pd.Timestamp(modified_since).strftime('%Y-%m-%d'))
+    return CAMERA_QUERY.substitute(legislature=int(legislature), modified_filter=modified_filter)
+
+def senato_mandates_query(legislature):
+    return SENATO_MANDATES_QUERY.substitute(legislature=int(legislature))
+
+def camera_mandates_query(legislature):
+    return CAMERA_MANDATES_QUERY.substitute(legislature=int(legislature))
+
+QUERIES = {
+    'camera': camera_query,
+    'senato': senato_query,
+}
+
+MANDATE_QUERIES = {
+    'camera': camera_mandates_query,
+    'senato': senato_mandates_query,
+}
+
+# Column types to parse each chamber's results with, as for the CSV exports
+DTYPES = {
+    'camera': data_clean.CAMERA_DTYPES,
+    'senato': None,
+}
+
+MANDATE_DTYPES = {
+    'camera': data_clean.CAMERA_MANDATE_DTYPES,
+    'senato': None,
+}
+
+def paged(query, limit, offset):
+    return f"{query}LIMIT {limit}\nOFFSET {offset}\n"
+
+def page_key(query):
+    """File name under which a page's results are recorded and replayed."""
+    return hashlib.sha256(query.encode()).hexdigest()[:20] + '.csv'
+
+class SparqlClient:
+    """Runs SELECT queries page by page against one endpoint, fetching several pages at a time.
+
+    With record_dir set, every page fetched is also saved there; with
+    replay=True pages are read back from record_dir instead of the network,
+    so a refresh can be rerun offline.
+    """
+
+    def __init__(self, endpoint, session=None, workers=4, page_size=10_000,
+                 retries=3, record_dir=None, replay=False):
+        self.endpoint = endpoint
+        self.session = session or make_session(workers)
+        self.workers = workers
+        self.page_size = page_size
+        self.retries = retries
+        self.record_dir = record_dir
+        self.replay = replay
+        if record_dir and not replay:
+            os.makedirs(record_dir, exist_ok=True)
+
+    def _download(self, query, dtype):
+        params = {'query': query, 'format': 'text/csv'}
+        with self.session.get(self.endpoint, params=params, stream=True, timeout=120) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            if not self.record_dir:
+                return read_page(response.raw, dtype)
+            # Stream the body to disk as it arrives, then parse the recorded copy
+            path = os.path.join(self.record_dir, page_key(query))
+            with open(path + '.part', 'wb') as f:
+                for block in response.iter_content(1 << 16):
+                    f.write(block)
+            os.replace(path + '.part', path)
+            return read_page(path, dtype)
+
+    def fetch_page(self, query, offset, dtype=None):
+        """One page of results as a DataFrame, retrying failed requests with backoff."""
+        query = paged(query, self.page_size, offset)
+        if self.replay:
+            instrument.count('replayed_pages')
+            return read_page(os.path.join(self.record_dir, page_key(query)), dtype)
+
+        for attempt in range(self.retries + 1):
+            try:
+                page = self._download(query, dtype)
+                instrument.count('fetched_pages')
+                return page
+            except (requests.RequestException, pd.errors.ParserError):
+                if attempt == self.retries:
+                    raise
+                instrument.count('retries')
+                time.sleep(2 ** attempt)
+
+    def pages(self, query, dtype=None):
+        """Yields the result pages in order, fetching up to `workers` of them concurrently.
+
+        Pages are requested in waves of `workers` consecutive offsets; the
+        first short page marks the end of the results. Only one wave is held
+        in memory at a time, and a failing page is retried by its own worker
+        while the others carry on.
+        """
+        offset = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                offsets = [offset + i * self.page_size for i in range(self.workers)]
+                futures = [executor.submit(self.fetch_page, query, page_offset, dtype) for page_offset in offsets]
+                for future in futures:
+                    page = future.result()
+                    if len(page):
+                        yield page
+                    if len(page) < self.page_size:
+                        for pending in futures:
+                            pending.cancel()
+                        return
+                offset += self.workers * self.page_size
+
+def read_page(source, dtype=None):
+    try:
+        return pd.read_csv(source, dtype=dtype)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+
+def make_session(pool_size=4):
+    """A session with a connection pool sized for the concurrent page fetches."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT, 'Accept': 'text/csv'})
+    return session
+
+def make_clients(workers=4, page_size=10_000, record_dir=None, replay=False, endpoints=ENDPOINTS):
+    """One client per chamber, sharing a connection pool and a record/replay directory."""
+    session = make_session(workers * len(endpoints))
+    return {
+        chamber: SparqlClient(endpoint, session, workers, page_size, record_dir=record_dir, replay=replay)
+        for chamber, endpoint in endpoints.items()
+    }
+
+def chamber_pages(clients, chamber, legislature, mandates=False):
+    """The result pages of a chamber's query for one legislature, or of its mandates variant."""
+    if mandates:
+        return clients[chamber].pages(MANDATE_QUERIES[chamber](legislature), MANDATE_DTYPES[chamber])
+    return clients[chamber].pages(QUERIES[chamber](legislature), DTYPES[chamber])
+
+@instrument.stage
+def export_chamber(clients, chamber, legislature, path, mandates=False):
+    """Streams a chamber's results to a CSV export page by page; returns the number of rows."""
+    rows = 0
+    for page in chamber_pages(clients, chamber, legislature, mandates):
+        page.to_csv(path, mode='w' if rows == 0 else 'a', header=rows == 0, index=False)
+        rows += len(page)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch the Camera and Senato exports from their SPARQL endpoints.')
+    parser.add_argument('--legislature', type=int, default=19)
+    parser.add_argument('--chamber', choices=sorted(ENDPOINTS), nargs='+', default=sorted(ENDPOINTS))
+    parser.add_argument('--workers', type=int, default=4, help='pages fetched concurrently per chamber')
+    parser.add_argument('--page-size', type=int, default=10_000)
+    parser.add_argument('--record', metavar='DIR', help='also save every fetched page to DIR')
+    parser.add_argument('--replay', metavar='DIR', help='read the pages saved in DIR instead of querying the endpoints')
+    parser.add_argument('--camera-endpoint', default=ENDPOINTS['camera'])
+    parser.add_argument('--senato-endpoint', default=ENDPOINTS['senato'])
+    store.add_directory_arguments(parser, results=False)
+    parser.add_argument('--clean', action='store_true',
+                        help='stream the results straight into data_clean instead of writing the CSV exports')
+    parser.add_argument('--mandates', action='store_true',
+                        help='export every mandate of the legislature, ended ones included, for timeline.py')
+    args = parser.parse_args()
+
+    endpoints = {'camera': args.camera_endpoint, 'senato': args.senato_endpoint}
+    clients = make_clients(args.workers, args.page_size, record_dir=args.replay or args.record,
+                           replay=args.replay is not None, endpoints=endpoints)
+
+    if args.clean:
+        start = time.perf_counter()
+        df = data_clean.clean_legislature(
+            args.legislature, args.data_dir,
+            camera_source=chamber_pages(clients, 'camera', args.legislature),
+            senato_source=chamber_pages(clients, 'senato', args.legislature))
+        print(f"Cleaned {len(df):,} MPs from the endpoints in {time.perf_counter() - start:.2f}s")
+        return
+
+    export_paths = {'camera': data_clean.camera_export_path, 'senato': data_clean.senato_export_path}
+    if args.mandates:
+        export_paths = {'camera': data_clean.camera_mandates_path, 'senato': data_clean.senato_mandates_path}
+    for chamber in args.chamber:
+        path = export_paths[chamber](args.legislature, args.data_dir)
+        start = time.perf_counter()
+        rows = export_chamber(clients, chamber, args.legislature, path, args.mandates)
+        print(f"{chamber}: {rows:,} rows written to {path} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import ast
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Typed columnar store for the MP tables passed between pipeline stages.
+# Each table is a Parquet file with a real list<string> professione column,
+# dictionary-encoded categoricals and a date-typed data_nascita, so readers
+# can memory-map it and project just the columns they need. The legacy CSVs
+# are still readable and can be written as an optional final export.
+
+DATA_DIR = 'data'
+RESULTS_DIR = 'results'
+
+CATEGORICAL_COLUMNS = ['genere', 'tipo_mandato', 'regione_nascita', 'livello_istruzione', 'gruppo_laurea']
+DATE_COLUMNS = ['data_nascita', 'inizio_mandato', 'fine_mandato']
+LIST_COLUMNS = ['professione']
+
+# A bare nan inside a list repr, as written by pandas for missing Senato professions
+_BARE_NAN = re.compile(r'(?<=[\[\s,])nan(?=[,\]])')
+
+def add_directory_arguments(parser, results=True):
+    """Adds the --data-dir (and --results-dir) options of the stage scripts to an argument parser."""
+    parser.add_argument('--data-dir', default=DATA_DIR, help='input tables and population data')
+    if results:
+        parser.add_argument('--results-dir', default=RESULTS_DIR, help='where the results are written')
+
+def table_path(name, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f'{name}.parquet')
+
+def csv_path(name, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f'{name}.csv')
+
+def table_exists(name, data_dir=DATA_DIR):
+    """Whether a table is available, either in the store or as a legacy CSV."""
+    return os.path.exists(table_path(name, data_dir)) or os.path.exists(csv_path(name, data_dir))
+
+def parse_list_repr(value):
+    """Parses a list repr such as "['Avvocato', None]" back into a list."""
+    if pd.isna(value):
+        return []
+    return ast.literal_eval(_BARE_NAN.sub('None', value))
+
+def _arrow_type(series):
+    if series.name in DATE_COLUMNS:
+        return pa.date32()
+    if series.name in CATEGORICAL_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    if series.name in LIST_COLUMNS:
+        return pa.list_(pa.string())
+    if series.dtype == object or pd.api.types.is_string_dtype(series):
+        return pa.string()
+    return pa.from_numpy_dtype(series.dtype)
+
+def to_arrow(df):
+    """Converts an MP frame to an Arrow table with typed columns."""
+    df = df.copy()
+    for column in df.columns:
+        if column in DATE_COLUMNS:
+            df[column] = pd.to_datetime(df[column], format='%Y-%m-%d', errors='coerce')
+        elif column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype('category')
+        elif column in LIST_COLUMNS:
+            df[column] = [[None if pd.isna(item) else item for item in items] for items in df[column]]
+    schema = pa.schema([pa.field(column, _arrow_type(df[column])) for column in df.columns])
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+def read_csv_table(path, columns=None):
+    """Reads one of the legacy leg19_clean*.csv files into the store's column types."""
+    df = pd.read_csv(path, usecols=columns, dtype=str)
+    for column in df.columns:
+        if column in LIST_COLUMNS:
+            df[column] = df[column].map(parse_list_repr)
+        elif column in DATE_COLUMNS:
+            df[column] = pd.to_datetime(df[column], format='%Y-%m-%d', errors='coerce')
+        elif column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype('category')
+    return df
+
+def read_table(name, columns=None, data_dir=DATA_DIR):
+    """Reads a stored table, memory-mapped and projected to the requested columns.
+
+    Falls back to the legacy CSV of the same name when the table hasn't been
+    written to the store yet, e.g. the hand-edited leg19_clean_updated.csv.
+    """
+    path = table_path(name, data_dir)
+    if not os.path.exists(path):
+        return read_csv_table(csv_path(name, data_dir), columns)
+    table = pq.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas(date_as_object=False)
+
+def write_csv(df, path):
+    """Exports a table in the legacy CSV layout, with professione as a list repr."""
+    df = df.copy()
+    for column in df.columns:
+        if column in DATE_COLUMNS and pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime('%Y-%m-%d')
+        elif column in LIST_COLUMNS:
+            df[column] = [str(list(items)) for items in df[column]]
+    df.to_csv(path, index=False)
+
+def write_table(df, name, data_dir=DATA_DIR, csv=False):
+    """Writes a table to the store, and to the legacy CSV as well if requested."""
+    pq.write_table(to_arrow(df), table_path(name, data_dir))
+    if csv:
+        write_csv(df, csv_path(name, data_dir))
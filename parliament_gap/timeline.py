@@ -0,0 +1,209 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import add_region
+from . import ages
+from . import data_clean
+from . import education
+from . import instrument
+from . import store
+from .age_analysis import AGE_BINS, AGE_LABELS
+from .cube import AXIS_COLUMNS, CHAMBERS, EDUCATION_LEVELS, GENDERS, mp_dimensions
+
+# Parliament composition on any date, from every mandate of a legislature
+# with its start and end. Dates are YYYYMMDD integer keys, as in ages.py.
+# Each category (women, senators, MPs born in Sicily, ...) keeps its mandates
+# as two sorted arrays of start and end keys, so the number of members on a
+# date is two searchsorted calls. Age bands change on birthdays, so each
+# mandate is split at the birthdays where its MP changes band, and every
+# piece counts for one band. A daily series over a whole legislature comes
+# from a single sweep: every start and end is binned to its day and the
+# counts are a cumulative sum.
+
+MANDATES_TABLE = 'leg{legislature}_mandates'
+MANDATE_COLUMNS = ['inizio_mandato', 'fine_mandato']
+
+# Mandates are half-open, [inizio_mandato, fine_mandato): an MP whose mandate
+# ends on a day is no longer a member on it. Open mandates end here.
+OPEN_END = 99991231
+
+AXES = ['chamber', 'gender', 'age_band', 'region', 'education']
+
+def date_keys(dates, missing):
+    """YYYYMMDD integer keys aligned with dates; missing dates get the missing key."""
+    dates = pd.to_datetime(pd.Series(dates), errors='coerce')
+    keys = dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day
+    return keys.fillna(missing).to_numpy(dtype=np.int64)
+
+class Intervals:
+    """Half-open [start, end) intervals as two independently sorted endpoint arrays."""
+
+    def __init__(self, starts, ends):
+        starts, ends = np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
+        nonempty = starts < ends
+        self.starts = np.sort(starts[nonempty])
+        self.ends = np.sort(ends[nonempty])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def count(self, keys):
+        """Number of intervals containing each key: those started on or before it and not yet ended."""
+        return np.searchsorted(self.starts, keys, side='right') - np.searchsorted(self.ends, keys, side='right')
+
+def age_band_pieces(starts, ends, birth_keys):
+    """The mandates cut at the birthdays where their MP moves to another age band.
+
+    Returns (band position, start, end) arrays; MPs with no birth date are
+    left out. An age in (AGE_BINS[i], AGE_BINS[i + 1]] is reached on the
+    birthday of AGE_BINS[i] + 1, whose key is the birth key plus that many
+    10000s (a 29 February birthday falls on 1 March in common years, as it
+    does for ages.calendar_age).
+    """
+    known = birth_keys > 0
+    starts, ends, birth_keys = starts[known], ends[known], birth_keys[known]
+    bands, band_starts, band_ends = [], [], []
+    for position in range(len(AGE_LABELS)):
+        band_starts.append(np.maximum(starts, birth_keys + (AGE_BINS[position] + 1) * 10000))
+        band_ends.append(np.minimum(ends, birth_keys + (AGE_BINS[position + 1] + 1) * 10000))
+        bands.append(np.full(len(starts), position))
+    return np.concatenate(bands), np.concatenate(band_starts), np.concatenate(band_ends)
+
+class MandateTimeline:
+    """The mandates of a legislature, indexed to answer who sat in parliament on any date."""
+
+    def __init__(self, mandates):
+        self.mandates = mandates.reset_index(drop=True)
+        # A missing start counts from the beginning of the legislature's data
+        self.starts = date_keys(self.mandates['inizio_mandato'], 0)
+        self.ends = date_keys(self.mandates['fine_mandato'], OPEN_END)
+        self.all = Intervals(self.starts, self.ends)
+
+        dimensions = mp_dimensions(self.mandates)
+        self.labels = {
+            'chamber': CHAMBERS,
+            'gender': GENDERS,
+            'age_band': AGE_LABELS,
+            'region': sorted(dimensions['regione'].dropna().unique()),
+            'education': EDUCATION_LEVELS,
+        }
+
+        # Per axis, the category position and interval of every mandate (or age band piece)
+        self.pieces = {}
+        for axis in AXES:
+            if axis == 'age_band':
+                self.pieces[axis] = age_band_pieces(self.starts, self.ends, date_keys(self.mandates['data_nascita'], 0))
+                continue
+            codes = pd.Categorical(dimensions[AXIS_COLUMNS[axis]], categories=self.labels[axis]).codes
+            known = codes >= 0
+            self.pieces[axis] = (codes[known].astype(np.int64), self.starts[known], self.ends[known])
+
+        self.intervals = {
+            axis: [Intervals(starts[codes == position], ends[codes == position]) for position in range(len(self.labels[axis]))]
+            for axis, (codes, starts, ends) in self.pieces.items()
+        }
+
+    def count(self, date, axis=None):
+        """Members on a date: the total, or a Series of counts by category of an axis."""
+        key = date_keys([date], 0)[0]
+        if axis is None:
+            return int(self.all.count(key))
+        return pd.Series([intervals.count(key) for intervals in self.intervals[axis]],
+                         index=pd.Index(self.labels[axis], name=axis), name='mp_count')
+
+    def members(self, date):
+        """The mandate rows of the MPs sitting on a date, to run any of the analyze_* functions on."""
+        key = date_keys([date], 0)[0]
+        return self.mandates[(self.starts <= key) & (key < self.ends)].reset_index(drop=True)
+
+    def daily(self, first, last, axis=None):
+        """Members on every day from first to last, by category of an axis, in one sweep."""
+        days = pd.date_range(first, last, freq='D')
+        day_keys = date_keys(days, 0)
+        if axis is None:
+            codes, starts, ends = np.zeros(len(self.starts), dtype=np.int64), self.starts, self.ends
+            labels = ['mp_count']
+        else:
+            (codes, starts, ends), labels = self.pieces[axis], self.labels[axis]
+        nonempty = starts < ends
+        codes, starts, ends = codes[nonempty], starts[nonempty], ends[nonempty]
+
+        # Each start adds one on its day and each end removes one; events before
+        # the first day land on it, events after the last day fall off the end
+        width = len(days) + 1
+        size = len(labels) * width
+        changes = (np.bincount(codes * width + np.searchsorted(day_keys, starts), minlength=size)
+                   - np.bincount(codes * width + np.searchsorted(day_keys, ends), minlength=size))
+        counts = changes.reshape(len(labels), width).cumsum(axis=1)[:, :-1]
+        return pd.DataFrame(counts.T, index=pd.Index(days, name='date'), columns=labels)
+
+@instrument.stage
+def clean_mandates(camera_df, senato_df, data_dir=store.DATA_DIR):
+    """Cleans the mandates exports as data_clean does the current ones, with the mandate dates."""
+    camera_df = data_clean.clean_camera(camera_df)
+    senato_df = data_clean.clean_senato(senato_df)
+    for df in (camera_df, senato_df):
+        df['inizio_mandato'] = data_clean.wrangle_data_nascita(df['inizioMandato'])
+        df['fine_mandato'] = data_clean.wrangle_data_nascita(df['fineMandato'])
+
+    df = data_clean.combine_chambers(camera_df, senato_df, keys=MANDATE_COLUMNS)
+    return add_region.add_regions(education.add_education_columns(df, data_dir), data_dir)
+
+def current_mandates(legislature, data_dir=store.DATA_DIR):
+    """Mandates of today's members only, for when there is no mandates export.
+
+    Senators start on their inizioMandato; the Camera export has no mandate
+    dates, so deputies start on election day.
+    """
+    df = store.read_table(f'leg{legislature}_clean_with_regions', data_dir=data_dir)
+    senato = pd.read_csv(data_clean.senato_export_path(legislature, data_dir), usecols=['senatore', 'inizioMandato'])
+    starts = senato.groupby(data_clean.extract_id(senato['senatore']))['inizioMandato'].min()
+    df['inizio_mandato'] = df['id'].map(starts).fillna(ages.ELECTION_DATES.get(legislature))
+    df['fine_mandato'] = None
+    return df
+
+def load_mandates(legislature, data_dir=store.DATA_DIR):
+    """Every mandate of a legislature, cleaned from the mandates exports into leg<N>_mandates if they exist."""
+    camera_path = data_clean.camera_mandates_path(legislature, data_dir)
+    senato_path = data_clean.senato_mandates_path(legislature, data_dir)
+    if not (os.path.exists(camera_path) and os.path.exists(senato_path)):
+        print("No mandates exports (run python -m parliament_gap.sparql --mandates); using today's members only")
+        return current_mandates(legislature, data_dir)
+
+    table = MANDATES_TABLE.format(legislature=legislature)
+    df = clean_mandates(pd.read_csv(camera_path, dtype=data_clean.CAMERA_MANDATE_DTYPES), pd.read_csv(senato_path), data_dir)
+    store.write_table(df, table, data_dir)
+    return store.read_table(table, data_dir=data_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description='Parliament composition on any date of a legislature.')
+    parser.add_argument('--legislature', type=int, default=19)
+    parser.add_argument('--date', default=None, help='date to show the composition on (default: today)')
+    parser.add_argument('--axis', choices=AXES, default='gender')
+    parser.add_argument('--daily', metavar='CSV', help='write the daily counts by axis since election day to CSV')
+    store.add_directory_arguments(parser, results=False)
+    args = parser.parse_args()
+
+    timeline = MandateTimeline(load_mandates(args.legislature, args.data_dir))
+    date = pd.Timestamp(args.date or 'today').normalize()
+
+    start = time.perf_counter()
+    counts = timeline.count(date, args.axis)
+    elapsed = time.perf_counter() - start
+    print(f"\n{timeline.count(date)} members on {date:%Y-%m-%d} ({len(timeline.mandates)} mandates), "
+          f"counted by {args.axis} in {elapsed * 1e6:.0f} µs:")
+    print(counts.to_string())
+
+    if args.daily:
+        start = time.perf_counter()
+        daily = timeline.daily(ages.ELECTION_DATES.get(args.legislature, date), date, args.axis)
+        print(f"\n{len(daily)} days by {args.axis} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        daily.to_csv(args.daily)
+        print(f"Daily counts saved to {args.daily}")
+
+if __name__ == "__main__":
+    main()
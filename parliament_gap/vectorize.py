@@ -0,0 +1,54 @@
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+# Column-at-a-time helpers shared across the pipeline. The MP tables repeat
+# the same names, places and titles many times over, so transforms run once
+# per distinct value and are broadcast back. Keyword tables (categories with
+# their keywords, in priority order) are compiled into a single regex, so a
+# whole column is classified by one str.extract.
+
+def per_unique(transform):
+    """Apply a column transform to the distinct values only and broadcast the result back.
+
+    The transform gets the distinct values as a Series, plus any further
+    arguments, and returns a Series, a tuple of Series or a DataFrame
+    aligned with them. The results are indexed like the input, with None
+    for missing inputs.
+    """
+    @functools.wraps(transform)
+    def wrapper(values, *args, **kwargs):
+        codes, uniques = pd.factorize(values)
+        results = transform(pd.Series(uniques), *args, **kwargs)
+
+        def broadcast(result):
+            # Missing inputs have code -1, which picks the trailing None.
+            lookup = np.append(result.astype(object).where(result.notna(), None).to_numpy(), None)
+            return pd.Series(lookup[codes], index=values.index, dtype=object)
+
+        if isinstance(results, tuple):
+            return tuple(broadcast(result) for result in results)
+        if isinstance(results, pd.DataFrame):
+            return pd.DataFrame({column: broadcast(results[column]) for column in results.columns}, index=values.index)
+        return broadcast(results)
+    return wrapper
+
+def priority_pattern(table):
+    """One regex with a lookahead branch per entry of a keyword table; group i marks entry i.
+
+    Branches are tried in order, so only the group of the first entry with
+    a keyword anywhere in the text is set, as with a loop over the table.
+    """
+    branches = [
+        f"(?=.*?(?:{'|'.join(re.escape(keyword) for keyword in keywords)}))(?P<c{i}>)"
+        for i, keywords in enumerate(table.values())
+    ]
+    return re.compile('^(?:' + '|'.join(branches) + ')', re.DOTALL)
+
+def first_match(texts, pattern, labels):
+    """Label of the table entry a priority_pattern matches for each text in a Series, NaN where none does."""
+    matches = texts.str.extract(pattern).notna()
+    first = matches.idxmax(axis=1).where(matches.any(axis=1))
+    return first.map(dict(zip(matches.columns, labels)))
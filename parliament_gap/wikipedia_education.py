@@ -0,0 +1,467 @@
+import argparse
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+from typing import Dict, Iterable, Optional, Set
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import instrument
+from . import store
+
+USER_AGENT = 'ItalianParliamentResearch/1.0 (https://github.com/francescacollu/italian_parliament_representativeness)'
+WIKIPEDIA_API_URL = 'https://{language}.wikipedia.org/w/api.php'
+WIKIDATA_SPARQL_URL = 'https://query.wikidata.org/sparql'
+CACHE_FILE = 'wikipedia_cache.sqlite'
+
+# The MediaWiki API takes up to 50 titles per query
+TITLES_PER_REQUEST = 50
+# Keys per Wikidata query, small enough for the query service's time limit
+KEYS_PER_QUERY = 200
+
+# Education patterns in Italian and English, each listed with the keywords that
+# any of its matches must contain. The keywords let EducationExtractor skip the
+# parts of an article that cannot match a pattern at all.
+EDUCATION_PATTERNS = [
+    # Complete degree statements
+    (r'(?i)(?:si è laureato|si è laureata|graduated|has graduated)\s+(?:in|in|as|with)\s+([a-zA-ZÀ-ù\s]+?)(?:\s+(?:presso|at|from)\s+[a-zA-ZÀ-ù\s]+)?\b',
+     ['laureat', 'graduated']),
+    (r'(?i)(?:laureato|laureata|graduated)\s+(?:in|in|as|with)\s+([a-zA-ZÀ-ù\s]+?)(?:\s+(?:presso|at|from)\s+[a-zA-ZÀ-ù\s]+)?\b',
+     ['laureat', 'graduated']),
+    (r'(?i)(?:dottorato|dottorata|doctorate)\s+(?:in|in|as|with)\s+([a-zA-ZÀ-ù\s]+?)(?:\s+(?:presso|at|from)\s+[a-zA-ZÀ-ù\s]+)?\b',
+     ['dottorat', 'doctorate']),
+    (r'(?i)(?:dottorato|dottorata|doctorate)\s+di\s+ricerca\s+(?:in|in|as|with)\s+([a-zA-ZÀ-ù\s]+?)(?:\s+(?:presso|at|from)\s+[a-zA-ZÀ-ù\s]+)?\b',
+     ['dottorat', 'doctorate']),
+    (r'(?i)(?:diploma|diplomato|diplomata|diploma)\s+(?:in|in|as|with)\s+([a-zA-ZÀ-ù\s]+?)(?:\s+(?:presso|at|from)\s+[a-zA-ZÀ-ù\s]+)?\b',
+     ['diplom']),
+    (r'(?i)(?:maturità|maturità classica|maturità scientifica|high school|classical high school|scientific high school)\s+(?:in|in|as|with)\s+([a-zA-ZÀ-ù\s]+?)(?:\s+(?:presso|at|from)\s+[a-zA-ZÀ-ù\s]+)?\b',
+     ['maturità', 'high school']),
+
+    # University patterns with field of study
+    (r'(?i)(?:presso|at|from)\s+([a-zA-ZÀ-ù\s]+?(?:University|Università|College|Istituto|Institute))\s+(?:in|in|as|with)\s+([a-zA-ZÀ-ù\s]+?)\b',
+     ['university', 'università', 'college', 'istituto', 'institute']),
+
+    # Field of study patterns
+    (r'(?i)(?:in|di|of)\s+([a-zA-ZÀ-ù\s]+?(?:studies|scienze|lettere|economia|giurisprudenza|medicina|ingegneria))\b',
+     ['studies', 'scienze', 'lettere', 'economia', 'giurisprudenza', 'medicina', 'ingegneria']),
+]
+
+class EducationExtractor:
+    """Extracts education mentions from article text with patterns compiled once.
+
+    A match never spans a full stop, so the text is split into sentences. The
+    keyword index locates the sentences that contain a keyword, and only the
+    patterns those keywords belong to are run on them.
+    """
+
+    def __init__(self, patterns=EDUCATION_PATTERNS):
+        self.patterns = [re.compile(pattern) for pattern, _ in patterns]
+        self.keyword_patterns = {}
+        for index, (_, keywords) in enumerate(patterns):
+            for keyword in keywords:
+                self.keyword_patterns.setdefault(keyword, set()).add(index)
+
+    def candidate_sentences(self, text: str) -> dict:
+        """Maps (start, end) of every sentence containing a keyword to the patterns worth running on it."""
+        sentences = {}
+        for keyword, pattern_indexes in self.keyword_patterns.items():
+            position = text.find(keyword)
+            while position != -1:
+                start = text.rfind('.', 0, position) + 1
+                end = text.find('.', position)
+                if end == -1:
+                    end = len(text)
+                sentences.setdefault((start, end), set()).update(pattern_indexes)
+                # Skip ahead to the next sentence, it is the only place left to look
+                position = text.find(keyword, end)
+        return sentences
+
+    def extract(self, text: str) -> Set[str]:
+        education = set()
+        text = text.lower()
+
+        for (start, end), pattern_indexes in self.candidate_sentences(text).items():
+            for index in sorted(pattern_indexes):
+                for match in self.patterns[index].finditer(text, start, end):
+                    # If we have multiple groups, combine them
+                    if len(match.groups()) > 1:
+                        edu = ' '.join(group for group in match.groups() if group)
+                    else:
+                        edu = match.group(1)
+
+                    if edu is None:
+                        continue
+
+                    edu = edu.strip()
+
+                    # Skip if too short or contains numbers
+                    if len(edu) < 4 or any(c.isdigit() for c in edu):
+                        continue
+
+                    # Skip if it starts with common words that don't indicate education
+                    if edu.startswith(('il ', 'la ', 'lo ', 'the ', 'a ', 'an ', 'di ', 'del ', 'della ')):
+                        continue
+
+                    education.add(edu)
+
+        return education
+
+_extractor = EducationExtractor()
+
+def extract_education_from_text(text: str) -> Set[str]:
+    return _extractor.extract(text)
+
+def make_session(pool_size: int = 16) -> requests.Session:
+    """Creates a requests session whose connection pool can be shared across worker threads."""
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=3)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class WikipediaPage:
+    def __init__(self, title: str, language: str, revision: Optional[int], url: Optional[str], text: Optional[str],
+                 item: Optional[str] = None):
+        self.title = title
+        self.language = language
+        self.revision = revision
+        self.fullurl = url
+        self.text = text
+        self.item = item  # the page's Wikidata item, e.g. Q123
+
+    def exists(self) -> bool:
+        return self.revision is not None
+
+class PageCache:
+    """On-disk cache of page texts keyed by title, language and revision."""
+
+    def __init__(self, path: str = os.path.join(store.DATA_DIR, CACHE_FILE)):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            'language TEXT, title TEXT, revision INTEGER, url TEXT, text TEXT, '
+            'PRIMARY KEY (language, title, revision))'
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, language: str, title: str, revision: int) -> Optional[WikipediaPage]:
+        with self._lock:
+            row = self._db.execute(
+                'SELECT url, text FROM pages WHERE language = ? AND title = ? AND revision = ?',
+                (language, title, revision),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                instrument.count('cache_misses')
+                return None
+            self.hits += 1
+            instrument.count('cache_hits')
+        return WikipediaPage(title, language, revision, row[0], row[1])
+
+    def put(self, page: WikipediaPage) -> None:
+        with self._lock:
+            # Older revisions of the same page are never read again.
+            self._db.execute('DELETE FROM pages WHERE language = ? AND title = ?', (page.language, page.title))
+            self._db.execute(
+                'INSERT INTO pages VALUES (?, ?, ?, ?, ?)',
+                (page.language, page.title, page.revision, page.fullurl, page.text),
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+class WikipediaClient:
+    """Thin MediaWiki API client for one language edition, meant to be shared between threads."""
+
+    def __init__(self, language: str, session: Optional[requests.Session] = None,
+                 api_url: str = WIKIPEDIA_API_URL, cache: Optional[PageCache] = None):
+        self.language = language
+        self.api_url = api_url.format(language=language)
+        self.session = session or make_session()
+        self.cache = cache
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def _request(self, **params) -> dict:
+        params.update(action='query', format='json', formatversion=2, redirects=1)
+        response = self.session.get(self.api_url, params=params, timeout=30)
+        response.raise_for_status()
+        with self._lock:
+            self.requests += 1
+        return response.json()['query']
+
+    def _query(self, **params) -> dict:
+        return self._request(**params)['pages'][0]
+
+    def page(self, title: str) -> WikipediaPage:
+        """Fetches a page's plain text, reusing the cached copy when the revision hasn't changed."""
+        if self.cache is not None:
+            info = self._query(titles=title, prop='info')
+            if info.get('missing') or info.get('invalid'):
+                return WikipediaPage(title, self.language, None, None, '')
+            cached = self.cache.get(self.language, title, info['lastrevid'])
+            if cached is not None:
+                return cached
+
+        data = self._query(titles=title, prop='extracts|info', inprop='url', explaintext=1)
+        if data.get('missing') or data.get('invalid'):
+            return WikipediaPage(title, self.language, None, None, '')
+        page = WikipediaPage(title, self.language, data['lastrevid'], data.get('fullurl'), data.get('extract', ''))
+        if self.cache is not None:
+            self.cache.put(page)
+        return page
+
+    def resolve(self, titles: Iterable[str]) -> Dict[str, WikipediaPage]:
+        """Revision, URL and Wikidata item of many titles, TITLES_PER_REQUEST to a request, without their text.
+
+        Pages are keyed by the title asked for, following normalization and
+        redirects; titles with no page get a page that doesn't exist.
+        """
+        titles = list(dict.fromkeys(titles))
+        pages = {}
+        for start in range(0, len(titles), TITLES_PER_REQUEST):
+            batch = titles[start:start + TITLES_PER_REQUEST]
+            query = self._request(titles='|'.join(batch), prop='info|pageprops', inprop='url', ppprop='wikibase_item')
+
+            targets = {title: title for title in batch}
+            for step in ('normalized', 'redirects'):
+                moves = {move['from']: move['to'] for move in query.get(step, [])}
+                targets = {title: moves.get(target, target) for title, target in targets.items()}
+
+            by_title = {data['title']: data for data in query.get('pages', [])}
+            for title, target in targets.items():
+                data = by_title.get(target, {})
+                if 'lastrevid' not in data or data.get('missing') or data.get('invalid'):
+                    pages[title] = WikipediaPage(title, self.language, None, None, '')
+                else:
+                    pages[title] = WikipediaPage(title, self.language, data['lastrevid'], data.get('fullurl'), None,
+                                                 data.get('pageprops', {}).get('wikibase_item'))
+        return pages
+
+    def text(self, page: WikipediaPage) -> str:
+        """The plain text of a page from resolve(), from the cache when its revision is there."""
+        if page.text is not None:
+            return page.text
+        if self.cache is not None:
+            cached = self.cache.get(self.language, page.title, page.revision)
+            if cached is not None:
+                page.text = cached.text
+                return page.text
+
+        # Extracts of whole pages can only be had one page per request
+        page.text = self._query(titles=page.title, prop='extracts', explaintext=1).get('extract', '')
+        if self.cache is not None:
+            self.cache.put(page)
+        return page.text
+
+class WikidataClient:
+    """Bulk "educated at" (P69) and "academic degree" (P512) claims from the Wikidata query service."""
+
+    CLAIMS_QUERY = Template("""
+SELECT ?key ?educatedLabel ?degreeLabel WHERE {
+  $match
+  OPTIONAL { ?item wdt:P69 ?educated. }
+  OPTIONAL { ?item wdt:P512 ?degree. }
+  SERVICE wikibase:label { bd:serviceParam wikibase:language "it,en". }
+}
+""")
+    PROPERTY_MATCH = Template('VALUES ?key { $keys }\n  ?item wdt:$property ?key.')
+    ITEM_MATCH = Template('VALUES ?item { $items }\n  BIND(STRAFTER(STR(?item), "/entity/") AS ?key)')
+
+    def __init__(self, session: Optional[requests.Session] = None, endpoint: str = WIKIDATA_SPARQL_URL):
+        self.session = session or make_session()
+        self.endpoint = endpoint
+        self.requests = 0
+
+    def _claims(self, match: str) -> Dict[str, Set[str]]:
+        response = self.session.post(self.endpoint, data={'query': self.CLAIMS_QUERY.substitute(match=match)},
+                                     headers={'Accept': 'application/sparql-results+json'}, timeout=60)
+        response.raise_for_status()
+        self.requests += 1
+        instrument.count('wikidata_queries')
+
+        claims = {}
+        for binding in response.json()['results']['bindings']:
+            labels = claims.setdefault(binding['key']['value'], set())
+            for column in ('educatedLabel', 'degreeLabel'):
+                label = binding.get(column, {}).get('value')
+                # The label service falls back to the bare item id when there is no label
+                if label and not re.fullmatch(r'Q\d+', label):
+                    labels.add(label)
+        return {key: labels for key, labels in claims.items() if labels}
+
+    def by_property(self, identifier: str, keys: Iterable[str]) -> Dict[str, Set[str]]:
+        """Claims of the items with one of the keys as their value of an identifier property."""
+        keys = sorted(set(keys))
+        claims = {}
+        for start in range(0, len(keys), KEYS_PER_QUERY):
+            values = ' '.join(f'"{key}"' for key in keys[start:start + KEYS_PER_QUERY])
+            claims.update(self._claims(self.PROPERTY_MATCH.substitute(keys=values, property=identifier)))
+        return claims
+
+    def by_item(self, items: Iterable[str]) -> Dict[str, Set[str]]:
+        """Claims of items given by id, e.g. Q123."""
+        items = sorted(set(items))
+        claims = {}
+        for start in range(0, len(items), KEYS_PER_QUERY):
+            values = ' '.join(f'wd:{item}' for item in items[start:start + KEYS_PER_QUERY])
+            claims.update(self._claims(self.ITEM_MATCH.substitute(items=values)))
+        return claims
+
+# Wikidata identifier properties of the chamber ids in the MP tables. Camera
+# ids are stored there without their leading 'p'; Senato ids are looked up
+# both bare and zero-padded to eight digits, as on senato.it.
+CAMERA_ID_PROPERTY = 'P1341'
+SENATO_ID_PROPERTY = 'P2549'
+
+def person_id_claims(wikidata: WikidataClient, ids: Iterable[str]) -> Dict[str, Set[str]]:
+    """Wikidata education claims by MP id, for the Camera (p309220) and Senato (32578) ids given."""
+    camera, senato = {}, {}
+    for mp_id in ids:
+        if re.fullmatch(r'p\d+', mp_id):
+            camera[mp_id[1:]] = mp_id
+        elif mp_id.isdigit():
+            senato[str(int(mp_id))] = mp_id
+            senato[f'{int(mp_id):08d}'] = mp_id
+
+    claims = {}
+    for identifier, keys in ((CAMERA_ID_PROPERTY, camera), (SENATO_ID_PROPERTY, senato)):
+        if keys:
+            for key, labels in wikidata.by_property(identifier, keys).items():
+                claims.setdefault(keys[key], set()).update(labels)
+    return claims
+
+def make_clients(api_url: str = WIKIPEDIA_API_URL, cache: Optional[PageCache] = None,
+                 pool_size: int = 16) -> dict:
+    """Creates one shared client per language, all drawing on the same connection pool."""
+    session = make_session(pool_size)
+    return {language: WikipediaClient(language, session, api_url, cache) for language in ('it', 'en')}
+
+@instrument.stage
+def search_wikipedia_education(name: str, surname: str, clients: Optional[dict] = None) -> Set[str]:
+    if clients is None:
+        clients = make_clients()
+
+    all_education = set()
+
+    # Try Italian, then English Wikipedia
+    for language in ('it', 'en'):
+        page = clients[language].page(f"{name} {surname}")
+        if page.exists():
+            education = extract_education_from_text(page.text)
+            print(f"{name} {surname}: {page.fullurl} -> {sorted(education)}")
+            all_education.update(education)
+
+    return all_education
+
+@instrument.stage
+def mine_page(client: WikipediaClient, page: WikipediaPage) -> Set[str]:
+    """Education terms in the text of a page from resolve(), read from the cache when its revision is there."""
+    return extract_education_from_text(client.text(page))
+
+@instrument.stage
+def lookup_missing_education(df, clients, workers=8, wikidata=None):
+    """Wikipedia education of the MPs in df without a titolo_studio, as a nome/cognome/titolo_studio frame.
+
+    Structured Wikidata claims come first: in bulk by Camera and Senato id,
+    then by the Wikidata items of the pages found for the MPs' names, whose
+    titles are resolved in batches. Only MPs with no claims at all get their
+    page texts fetched and mined with extract_education_from_text.
+    """
+    if wikidata is None:
+        wikidata = WikidataClient(next(iter(clients.values())).session)
+    null_education_df = df[df['titolo_studio'].isna()].reset_index(drop=True)
+    print(f"Found {len(null_education_df)} MPs with missing educational qualifications")
+
+    ids = null_education_df['id'] if 'id' in null_education_df.columns else pd.Series(None, index=null_education_df.index)
+    titles = (null_education_df['nome'] + ' ' + null_education_df['cognome']).tolist()
+    education = {}
+    by_id = person_id_claims(wikidata, ids.dropna())
+    for position, mp_id in ids.items():
+        if mp_id in by_id:
+            education[position] = by_id[mp_id]
+            print(f"{titles[position]}: Wikidata ({mp_id}) -> {sorted(by_id[mp_id])}")
+
+    # Italian, then English Wikipedia pages of everyone else
+    pending = [position for position in range(len(titles)) if position not in education]
+    pages = {language: clients[language].resolve(titles[position] for position in pending) for language in ('it', 'en')}
+    by_item = wikidata.by_item(page.item for language_pages in pages.values() for page in language_pages.values() if page.item)
+
+    fallback = []
+    for position in pending:
+        found = [pages[language][titles[position]] for language in ('it', 'en')]
+        claims = set().union(*(by_item.get(page.item, set()) for page in found))
+        if claims:
+            education[position] = claims
+            print(f"{titles[position]}: Wikidata -> {sorted(claims)}")
+        else:
+            fallback.extend((position, page) for page in found if page.exists())
+
+    # Mine the page texts concurrently; map keeps the results in input order. Each
+    # page is its own stage, so the cache counts of the worker threads are recorded
+    def mine(item):
+        position, page = item
+        return mine_page(clients[page.language], page)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for (position, page), found in zip(fallback, executor.map(mine, fallback)):
+            print(f"{titles[position]}: {page.fullurl} -> {sorted(found)}")
+            education.setdefault(position, set()).update(found)
+
+    results = [{
+        'nome': null_education_df['nome'][position],
+        'cognome': null_education_df['cognome'][position],
+        'titolo_studio': '; '.join(sorted(education[position]))
+    } for position in sorted(education) if education[position]]
+    return pd.DataFrame(results, columns=['nome', 'cognome', 'titolo_studio'])
+
+def enrich_education(legislature=19, data_dir=store.DATA_DIR, results_dir=store.RESULTS_DIR, workers=8,
+                     cache_path=None, api_url=WIKIPEDIA_API_URL, wikidata_url=WIKIDATA_SPARQL_URL):
+    """Looks up the missing education of a legislature's MPs and writes results_dir/wikipedia_education.csv."""
+    df = store.read_table(f'leg{legislature}_clean', columns=['id', 'nome', 'cognome', 'titolo_studio'], data_dir=data_dir)
+
+    cache = PageCache(cache_path or os.path.join(data_dir, CACHE_FILE))
+    try:
+        clients = make_clients(api_url, cache, pool_size=workers)
+        wikidata = WikidataClient(clients['it'].session, wikidata_url)
+        results_df = lookup_missing_education(df, clients, workers, wikidata)
+        requests_made = sum(client.requests for client in clients.values())
+        print(f"\n{requests_made} Wikipedia requests and {wikidata.requests} Wikidata queries; "
+              f"page cache: {cache.hits} hits, {cache.misses} misses")
+    finally:
+        cache.close()
+
+    # Save results
+    if not results_df.empty:
+        output_path = os.path.join(results_dir, 'wikipedia_education.csv')
+        os.makedirs(results_dir, exist_ok=True)
+        results_df.to_csv(output_path, index=False)
+        print(f"\nSaved {len(results_df)} results to {output_path}")
+    return results_df
+
+def main():
+    parser = argparse.ArgumentParser(description='Look up missing education data on Wikipedia.')
+    parser.add_argument('--legislature', type=int, default=19)
+    parser.add_argument('--workers', type=int, default=8, help='number of concurrent lookups')
+    parser.add_argument('--cache', help='on-disk page cache (default: <data-dir>/wikipedia_cache.sqlite)')
+    parser.add_argument('--api-url', default=WIKIPEDIA_API_URL,
+                        help='MediaWiki API URL template, e.g. a local stub at http://127.0.0.1:8000/{language}/api.php')
+    parser.add_argument('--wikidata-url', default=WIKIDATA_SPARQL_URL,
+                        help='Wikidata SPARQL endpoint, e.g. a local stub at http://127.0.0.1:8000/sparql')
+    store.add_directory_arguments(parser)
+    args = parser.parse_args()
+
+    enrich_education(args.legislature, args.data_dir, args.results_dir, workers=args.workers, cache_path=args.cache, api_url=args.api_url,
+                     wikidata_url=args.wikidata_url)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+@pytest.fixture
+def serve():
+    """Starts local HTTP servers for request handler classes; each call returns its base URL."""
+    servers = []
+
+    def start(handler):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_port}'
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from parliament_gap import age_analysis
+
+# Ten men and ten women of every age from 0 to 99
+POPULATION = pd.DataFrame({
+    'Età': [str(age) for age in range(100)],
+    'Totale maschi': 10,
+    'Totale femmine': 10,
+    'Totale': 20,
+})
+
+def test_ages_are_taken_on_election_day_by_default(tmp_path):
+    # On election day, 25 September 2022, the first MP is 24 and the others
+    # are 34 and 69; a year later they are 26, 36 and 71
+    mps = pd.DataFrame({'data_nascita': ['1997-09-26', '1987-09-26', '1952-09-26']})
+
+    comparison = age_analysis.analyze_age_comparison(mps, POPULATION, tmp_path / 'comparison.csv')
+    assert comparison['mp_count'].tolist() == [1, 1, 0, 0, 0, 1]
+    later = age_analysis.analyze_age_comparison(mps, POPULATION, tmp_path / 'later.csv', reference_date='2023-09-26')
+    assert later['mp_count'].tolist() == [0, 1, 1, 0, 0, 1]
+
+    summary = age_analysis.analyze_age(mps, tmp_path / 'summary.csv')
+    assert summary['absolute_count'].tolist() == [2, 0]
+    later = age_analysis.analyze_age(mps, tmp_path / 'later.csv', reference_date='2023-09-26')
+    assert later['absolute_count'].tolist() == [1, 1]
@@ -0,0 +1,24 @@
+import gzip
+import json
+
+import brotli
+
+from parliament_gap import bundles
+
+def test_every_bundle_has_gzip_and_brotli_variants(tmp_path):
+    source = tmp_path / 'gender_comparison_analysis.csv'
+    source.write_text('gender,representation_index\nMale,1.37\nFemale,0.63\n')
+    output_dir = tmp_path / 'public'
+    charts = {'gender': {'comparison': ('gender_comparison_analysis.csv', None)}}
+
+    manifest = bundles.export_bundles(charts, str(output_dir), results_dir=str(tmp_path))
+    files = manifest['gender']['files']
+    assert set(files) == {'json', 'gzip', 'br'}
+
+    body = (output_dir / files['json']).read_bytes()
+    assert gzip.decompress((output_dir / files['gzip']).read_bytes()) == body
+    assert brotli.decompress((output_dir / files['br']).read_bytes()) == body
+    assert json.loads(body)['tables']['comparison']['labels'] == {'gender': ['Male', 'Female']}
+
+    # Unchanged sources are not rewritten
+    assert bundles.export_bundles(charts, str(output_dir), results_dir=str(tmp_path)) == manifest
@@ -0,0 +1,37 @@
+import os
+
+import pandas as pd
+
+from parliament_gap import education
+from parliament_gap import store
+
+OVERRIDES = os.path.join(store.DATA_DIR, education.OVERRIDES_FILE)
+
+def test_overrides_are_true_exceptions_to_the_classifier():
+    overrides = pd.read_csv(OVERRIDES, dtype=str)
+    assert list(overrides.columns) == ['id', education.GROUP_COLUMN, 'note']
+    assert overrides['id'].is_unique
+    assert overrides[education.GROUP_COLUMN].isin(list(education.DEGREE_GROUPS)).all()
+    assert overrides['note'].notna().all()
+
+    # Every override is for an MP with a laurea whose group the titles alone get wrong
+    mps = pd.read_csv(os.path.join(store.DATA_DIR, 'leg19_clean_updated.csv'), dtype={'id': str}).set_index('id')
+    assert overrides['id'].isin(mps.index).all()
+    level, group = education.classify_titles(mps.loc[overrides['id'], 'titolo_studio'].reset_index(drop=True))
+    assert (level == 'Laurea').all()
+    assert (group != overrides[education.GROUP_COLUMN]).all()
+
+def test_overrides_replace_the_classified_degree_group(tmp_path):
+    pd.DataFrame({'id': ['p1', 'p2'], education.GROUP_COLUMN: ['Economico', 'Giuridico'], 'note': ['', '']}).to_csv(
+        tmp_path / education.OVERRIDES_FILE, index=False)
+    df = pd.DataFrame({
+        'id': ['p1', 'p2', 'p3'],
+        'titolo_studio': ['Laurea in Scienze Politiche, Dottorato in Economia', 'Diploma di Liceo Classico',
+                          'Laurea in Scienze Politiche'],
+    })
+
+    df = education.add_education_columns(df, str(tmp_path))
+    assert df[education.LEVEL_COLUMN].tolist() == ['Laurea', 'Diploma', 'Laurea']
+    # Only MPs with a laurea have a degree group to override
+    groups = df[education.GROUP_COLUMN]
+    assert groups[0] == 'Economico' and pd.isna(groups[1]) and groups[2] == 'Politico-sociale e comunicazione'
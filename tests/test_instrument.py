@@ -0,0 +1,32 @@
+import json
+import sys
+
+from parliament_gap import instrument
+
+@instrument.stage(name='test.counted')
+def counted(n):
+    instrument.count('items', n)
+    return n
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+def test_stage_records_its_counters(tmp_path, monkeypatch):
+    metrics = tmp_path / 'metrics.jsonl'
+    monkeypatch.setenv(instrument.METRICS_ENV, str(metrics))
+
+    assert counted(3) == 3
+    [record] = read_records(metrics)
+    assert record['stage'] == 'test.counted'
+    assert record['counters'] == {'items': 3}
+
+def test_peak_rss_is_left_empty_without_the_resource_module(tmp_path, monkeypatch):
+    metrics = tmp_path / 'metrics.jsonl'
+    monkeypatch.setenv(instrument.METRICS_ENV, str(metrics))
+    # As on Windows, where there is no resource module to import
+    monkeypatch.setitem(sys.modules, 'resource', None)
+
+    counted(1)
+    [record] = read_records(metrics)
+    assert record['peak_rss_mb'] is None
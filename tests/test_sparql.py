@@ -0,0 +1,94 @@
+import os
+import re
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+import requests
+
+from parliament_gap import sparql
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# The first rows of the Senato export, and the pages the client recorded
+# fetching them two at a time
+SAMPLE = os.path.join(FIXTURES, 'senato_leg19_sample.csv')
+RECORDED_PAGES = os.path.join(FIXTURES, 'sparql_pages')
+PAGE_SIZE = 2
+WORKERS = 2
+QUERY = sparql.senato_query(19)
+
+def endpoint_stub(failures=None):
+    """A handler class answering LIMIT/OFFSET queries with pages of the sample rows, as text/csv.
+
+    failures maps an offset to the number of times its page is answered with
+    503 Service Unavailable before it succeeds. Every offset asked for is kept.
+    """
+    with open(SAMPLE, encoding='utf-8') as f:
+        header, *rows = f.readlines()
+
+    class EndpointStub(BaseHTTPRequestHandler):
+        offsets = []
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            query = parse_qs(urlsplit(self.path).query)['query'][0]
+            limit = int(re.search(r'LIMIT (\d+)', query).group(1))
+            offset = int(re.search(r'OFFSET (\d+)', query).group(1))
+            self.offsets.append(offset)
+            if failures and failures.get(offset, 0) > 0:
+                failures[offset] -= 1
+                self.send_error(503)
+                return
+
+            body = (header + ''.join(rows[offset:offset + limit])).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return EndpointStub
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(sparql.time, 'sleep', lambda seconds: None)
+
+def test_replays_the_recorded_pages_offline():
+    # Nothing listens on the discard port: every page has to come from the recording
+    client = sparql.SparqlClient('http://127.0.0.1:9/sparql', workers=WORKERS, page_size=PAGE_SIZE,
+                                 record_dir=RECORDED_PAGES, replay=True)
+
+    pages = list(client.pages(QUERY))
+    assert [len(page) for page in pages] == [2, 2, 1]
+    pd.testing.assert_frame_equal(pd.concat(pages, ignore_index=True), pd.read_csv(SAMPLE))
+
+def test_records_every_page_it_fetches(serve, tmp_path):
+    client = sparql.SparqlClient(serve(endpoint_stub()) + '/sparql', workers=WORKERS, page_size=PAGE_SIZE,
+                                 record_dir=str(tmp_path))
+
+    rows = pd.concat(client.pages(QUERY), ignore_index=True)
+    pd.testing.assert_frame_equal(rows, pd.read_csv(SAMPLE))
+    for offset in (0, 2, 4):
+        name = sparql.page_key(sparql.paged(QUERY, PAGE_SIZE, offset))
+        with open(tmp_path / name, 'rb') as recorded, open(os.path.join(RECORDED_PAGES, name), 'rb') as expected:
+            assert recorded.read() == expected.read()
+
+def test_retries_a_page_while_the_endpoint_is_unavailable(serve):
+    handler = endpoint_stub(failures={2: 2})
+    client = sparql.SparqlClient(serve(handler) + '/sparql', workers=WORKERS, page_size=PAGE_SIZE, retries=2)
+
+    rows = pd.concat(client.pages(QUERY), ignore_index=True)
+    pd.testing.assert_frame_equal(rows, pd.read_csv(SAMPLE))
+    assert handler.offsets.count(2) == 3
+
+def test_gives_up_after_the_last_retry(serve):
+    handler = endpoint_stub(failures={0: 3})
+    client = sparql.SparqlClient(serve(handler) + '/sparql', workers=1, page_size=PAGE_SIZE, retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        list(client.pages(QUERY))
+    assert handler.offsets == [0, 0, 0]
@@ -0,0 +1,248 @@
+import json
+import os
+import re
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+
+from parliament_gap import instrument
+from parliament_gap import wikipedia_education
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Recorded pages of the MediaWiki API, with the title normalizations and
+# redirects it applied to them, and the Wikidata education claims of the
+# pages' items and of MPs' Camera (P1341) and Senato (P2549) ids
+with open(os.path.join(FIXTURES, 'wikipedia.json'), encoding='utf-8') as f:
+    WIKI = json.load(f)
+
+def send_json(handler, data):
+    body = json.dumps(data).encode()
+    handler.send_response(200)
+    handler.send_header('Content-Type', 'application/json')
+    handler.send_header('Content-Length', str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+def answer_query(language, params):
+    """The formatversion=2 reply of action=query for the recorded pages of a language edition."""
+    titles = params['titles'].split('|')
+    props = params.get('prop', '').split('|')
+    query = {'pages': []}
+
+    for step in ('normalized', 'redirects'):
+        moves = WIKI[step][language]
+        if any(title in moves for title in titles):
+            query[step] = [{'from': title, 'to': moves[title]} for title in titles if title in moves]
+        titles = [moves.get(title, title) for title in titles]
+
+    for title in dict.fromkeys(titles):
+        page = WIKI['pages'][language].get(title)
+        if page is None:
+            query['pages'].append({'title': title, 'missing': True})
+            continue
+        data = {'title': title, 'lastrevid': page['lastrevid']}
+        if 'url' in params.get('inprop', ''):
+            data['fullurl'] = page['fullurl']
+        if 'pageprops' in props:
+            data['pageprops'] = {'wikibase_item': page['wikibase_item']}
+        if 'extracts' in props:
+            data['extract'] = page['extract']
+        query['pages'].append(data)
+    return query
+
+def mediawiki_stub():
+    """A handler class replaying the recorded pages at /<language>/api.php, keeping every request's parameters."""
+
+    class MediaWikiStub(BaseHTTPRequestHandler):
+        requests = []
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            language = url.path.split('/')[1]
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            self.requests.append((language, params))
+            send_json(self, {'query': answer_query(language, params)})
+
+    return MediaWikiStub
+
+def claims_bindings(query):
+    """The result bindings of a WikidataClient claims query, from the recorded claims."""
+    bindings = []
+    match = re.search(r'wdt:(P1341|P2549) \?key', query)
+    if match:
+        keys = re.findall(r'"(\w+)"', query)
+        recorded = WIKI['wikidata'][match.group(1)]
+    else:
+        # Items without claims still come back, with their OPTIONAL columns unbound
+        keys = re.findall(r'wd:(Q\d+)', query)
+        recorded = {key: WIKI['wikidata']['items'].get(key, [{}]) for key in keys}
+    for key in keys:
+        for claim in recorded.get(key, []):
+            bindings.append({'key': {'value': key}, **{column: {'value': label} for column, label in claim.items()}})
+    return bindings
+
+def wikidata_stub():
+    """A handler class answering the POSTed claims queries, keeping every query."""
+
+    class WikidataStub(BaseHTTPRequestHandler):
+        queries = []
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            assert self.headers['Accept'] == 'application/sparql-results+json'
+            form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+            self.queries.append(form['query'][0])
+            send_json(self, {'results': {'bindings': claims_bindings(form['query'][0])}})
+
+    return WikidataStub
+
+@pytest.fixture
+def stub(serve):
+    handler = mediawiki_stub()
+    return handler, serve(handler) + '/{language}/api.php'
+
+@pytest.fixture
+def wikidata(serve):
+    handler = wikidata_stub()
+    return handler, wikipedia_education.WikidataClient(endpoint=serve(handler) + '/sparql')
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = wikipedia_education.PageCache(str(tmp_path / 'cache.sqlite'))
+    yield cache
+    cache.close()
+
+def test_page_reuses_the_cached_text_of_an_unchanged_revision(stub, cache):
+    handler, api_url = stub
+    client = wikipedia_education.WikipediaClient('it', api_url=api_url, cache=cache)
+
+    page = client.page('Mario Rossi')
+    assert page.exists()
+    assert page.revision == 130412275
+    assert page.fullurl == 'https://it.wikipedia.org/wiki/Mario_Rossi'
+    assert 'giurisprudenza' in page.text
+    assert client.requests == 2
+
+    # A second client on the same cache only asks for the revision
+    other = wikipedia_education.WikipediaClient('it', api_url=api_url, cache=cache)
+    cached = other.page('Mario Rossi')
+    assert cached.text == page.text
+    assert other.requests == 1
+    assert [params['prop'] for _, params in handler.requests] == ['info', 'extracts|info', 'info']
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_page_follows_redirects_and_reports_missing_pages(stub, cache):
+    _, api_url = stub
+    client = wikipedia_education.WikipediaClient('it', api_url=api_url, cache=cache)
+
+    page = client.page('Luca Verdi')
+    assert page.title == 'Luca Verdi'
+    assert page.fullurl == 'https://it.wikipedia.org/wiki/Luca_Verdi_(politico)'
+
+    missing = client.page('Paolo Gialli')
+    assert not missing.exists()
+    assert missing.text == ''
+
+def test_search_mines_the_italian_and_english_pages(stub, cache):
+    _, api_url = stub
+    clients = wikipedia_education.make_clients(api_url, cache, pool_size=2)
+
+    assert wikipedia_education.search_wikipedia_education('Mario', 'Rossi', clients) == {'giurisprudenza'}
+    assert wikipedia_education.search_wikipedia_education('Anna', 'Neri', clients) == {'medicine'}
+    assert wikipedia_education.search_wikipedia_education('Paolo', 'Gialli', clients) == set()
+
+def test_resolve_asks_for_the_titles_in_batches(stub, cache, monkeypatch):
+    monkeypatch.setattr(wikipedia_education, 'TITLES_PER_REQUEST', 2)
+    handler, api_url = stub
+    client = wikipedia_education.WikipediaClient('it', api_url=api_url, cache=cache)
+
+    pages = client.resolve(['Mario Rossi', 'giulia Bianchi', 'Luca Verdi', 'Paolo Gialli', 'Mario Rossi'])
+    assert [len(params['titles'].split('|')) for _, params in handler.requests] == [2, 2]
+    assert list(pages) == ['Mario Rossi', 'giulia Bianchi', 'Luca Verdi', 'Paolo Gialli']
+    assert {title: page.item for title, page in pages.items()} == {
+        'Mario Rossi': 'Q4001', 'giulia Bianchi': 'Q4002', 'Luca Verdi': 'Q4003', 'Paolo Gialli': None,
+    }
+    assert pages['Luca Verdi'].fullurl == 'https://it.wikipedia.org/wiki/Luca_Verdi_(politico)'
+    assert not pages['Paolo Gialli'].exists()
+    # Resolving fetches no text
+    assert all(page.text is None for page in pages.values() if page.exists())
+
+def test_text_is_fetched_once_per_revision(stub, cache):
+    handler, api_url = stub
+    client = wikipedia_education.WikipediaClient('it', api_url=api_url, cache=cache)
+    page = client.resolve(['Luca Verdi'])['Luca Verdi']
+
+    assert 'economia' in client.text(page)
+    other = wikipedia_education.WikipediaClient('it', api_url=api_url, cache=cache)
+    again = other.resolve(['Luca Verdi'])['Luca Verdi']
+    assert other.text(again) == page.text
+    assert [params['prop'] for _, params in handler.requests] == ['info|pageprops', 'extracts', 'info|pageprops']
+
+def test_person_id_claims_looks_up_camera_and_senato_ids(wikidata):
+    handler, client = wikidata
+
+    claims = wikipedia_education.person_id_claims(client, ['p300001', '30002', 'p300003'])
+    assert claims == {
+        'p300001': {'Sapienza Università di Roma', 'laurea in giurisprudenza'},
+        '30002': {'Università degli Studi di Torino'},
+    }
+    # One query per identifier property, with the Senato id both bare and zero-padded
+    assert client.requests == 2
+    assert re.findall(r'"(\w+)"', handler.queries[1]) == ['00030002', '30002']
+
+def test_by_item_drops_labels_that_are_bare_item_ids(wikidata):
+    _, client = wikidata
+    assert client.by_item(['Q4003', 'Q4002', 'Q4001']) == {'Q4003': {'Università degli Studi di Bari'}}
+
+def test_lookup_missing_education_takes_wikidata_first(stub, wikidata, cache):
+    handler, api_url = stub
+    wikidata_handler, wikidata_client = wikidata
+    clients = wikipedia_education.make_clients(api_url, cache, pool_size=2)
+    df = pd.DataFrame({
+        'id': ['p300001', '30002', 'p300003', 'p300004', 'p300005', 'p300006'],
+        'nome': ['Mario', 'Giulia', 'Luca', 'Anna', 'Paolo', 'Sara'],
+        'cognome': ['Rossi', 'Bianchi', 'Verdi', 'Neri', 'Gialli', 'Blu'],
+        'titolo_studio': [None, None, None, None, None, 'Laurea in Lettere'],
+    })
+
+    results = wikipedia_education.lookup_missing_education(df, clients, workers=2, wikidata=wikidata_client)
+    expected = pd.DataFrame({
+        'nome': ['Mario', 'Giulia', 'Luca', 'Anna'],
+        'cognome': ['Rossi', 'Bianchi', 'Verdi', 'Neri'],
+        'titolo_studio': ['Sapienza Università di Roma; laurea in giurisprudenza', 'Università degli Studi di Torino',
+                          'Università degli Studi di Bari', 'medicine'],
+    })
+    pd.testing.assert_frame_equal(results, expected)
+
+    # MPs with claims by id are never looked up on Wikipedia, and only Anna Neri's
+    # page, whose item has no claims, has its text fetched
+    resolved = [title for _, params in handler.requests if 'pageprops' in params['prop'] for title in params['titles'].split('|')]
+    assert sorted(resolved) == sorted(['Luca Verdi', 'Anna Neri', 'Paolo Gialli'] * 2)
+    extracts = [(language, params['titles']) for language, params in handler.requests if params['prop'] == 'extracts']
+    assert extracts == [('en', 'Anna Neri')]
+    assert wikidata_client.requests == 3
+
+def test_the_cache_counts_of_the_mining_workers_are_recorded(stub, wikidata, cache, tmp_path, monkeypatch):
+    metrics = tmp_path / 'metrics.jsonl'
+    monkeypatch.setenv(instrument.METRICS_ENV, str(metrics))
+    _, api_url = stub
+    _, wikidata_client = wikidata
+    df = pd.DataFrame({'id': ['p300004'], 'nome': ['Anna'], 'cognome': ['Neri'], 'titolo_studio': [None]})
+
+    # A cold cache, then a warm one
+    for _ in range(2):
+        clients = wikipedia_education.make_clients(api_url, cache, pool_size=2)
+        wikipedia_education.lookup_missing_education(df, clients, workers=2, wikidata=wikidata_client)
+
+    with open(metrics) as f:
+        records = [json.loads(line) for line in f]
+    mined = [record['counters'] for record in records if record['stage'] == 'wikipedia_education.mine_page']
+    assert mined == [{'cache_misses': 1}, {'cache_hits': 1}]